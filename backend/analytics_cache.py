@@ -0,0 +1,140 @@
+# Import necessary modules
+import os                               # Reads cache bounds from environment variables
+import threading                        # Lock protecting the cache across FastAPI worker threads
+import time                             # Monotonic clock for TTL expiry
+from collections import OrderedDict     # Keeps entries in least-recently-used order
+
+
+class RangeCache:
+    """
+    In-process LRU cache for results keyed by an inclusive (start_date, end_date) range.
+
+    Entries are bounded both by count ('max_entries', least recently used are
+    evicted first) and by age ('ttl' seconds). A write to a single date only
+    evicts the cached ranges that contain that date, so dashboards over past
+    months stay cached while the current month is being edited.
+
+    Args:
+        max_entries (int): Maximum number of cached ranges.
+        ttl (float): Seconds an entry stays valid (0 disables expiry).
+    """
+
+    def __init__(self, max_entries=256, ttl=300.0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._entries = OrderedDict()   # (start, end) -> (stored_at, value)
+        self._lock = threading.Lock()
+        self._generation = 0            # Bumped on every invalidation (see put())
+        self._counters = {
+            "hits": 0,
+            "misses": 0,
+            "evictions": 0,       # Dropped to respect 'max_entries'
+            "expirations": 0,     # Dropped because they outlived 'ttl'
+            "invalidations": 0,   # Dropped because a write touched their range
+        }
+
+    def get(self, start_date, end_date):
+        """
+        Looks up a cached value for a date range.
+
+        Args:
+            start_date (date): Start of the range (inclusive).
+            end_date (date): End of the range (inclusive).
+
+        Returns:
+            The cached value, or None on a miss.
+        """
+        key = (start_date, end_date)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and self.ttl and time.monotonic() - entry[0] > self.ttl:
+                del self._entries[key]
+                self._counters["expirations"] += 1
+                entry = None
+            if entry is None:
+                self._counters["misses"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._counters["hits"] += 1
+            return entry[1]
+
+    def generation(self):
+        """
+        Returns the current invalidation generation.
+        Take it before querying the DB and pass it to put() so a result computed
+        while a write was in flight is not cached after that write invalidated it.
+        """
+        with self._lock:
+            return self._generation
+
+    def put(self, start_date, end_date, value, generation=None):
+        """
+        Stores a value for a date range, evicting the least recently used entries if full.
+
+        Args:
+            start_date (date): Start of the range (inclusive).
+            end_date (date): End of the range (inclusive).
+            value: The result to cache (treated as read-only by callers).
+            generation (int): Value of generation() taken before the result was computed;
+                              if an invalidation happened since, the value is not stored.
+        """
+        key = (start_date, end_date)
+        with self._lock:
+            if generation is not None and generation != self._generation:
+                return
+            self._entries[key] = (time.monotonic(), value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._counters["evictions"] += 1
+
+    def invalidate_dates(self, *dates):
+        """
+        Evicts every cached range that overlaps any of the given dates.
+
+        Args:
+            *dates (date): Dates that were written.
+
+        Returns:
+            int: Number of entries evicted.
+        """
+        with self._lock:
+            stale = [
+                key for key in self._entries
+                if any(key[0] <= written <= key[1] for written in dates)
+            ]
+            for key in stale:
+                del self._entries[key]
+            self._generation += 1
+            self._counters["invalidations"] += len(stale)
+            return len(stale)
+
+    def clear(self):
+        """Drops every cached entry (counters are kept)."""
+        with self._lock:
+            self._entries.clear()
+            self._generation += 1
+
+    def stats(self):
+        """
+        Returns cache usage counters.
+
+        Returns:
+            dict: Current size and bounds plus hit/miss/eviction/expiration/invalidation counters.
+        """
+        with self._lock:
+            return {
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl,
+                **self._counters,
+            }
+
+
+# ------------------------- SHARED INSTANCE -------------------------
+# One cache per server process for POST /analytics/ results, shared by the
+# sync and async apps so writes through either path invalidate it.
+summary_cache = RangeCache(
+    max_entries = int(os.getenv("EXPENSE_ANALYTICS_CACHE_SIZE", "256")),
+    ttl         = float(os.getenv("EXPENSE_ANALYTICS_CACHE_TTL", "300")),
+)
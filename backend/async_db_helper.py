@@ -0,0 +1,304 @@
+# Import necessary modules
+import asyncio                              # Guards lazy creation of the async pool
+from contextlib import asynccontextmanager  # Used to create async context managers ('async with')
+import aiomysql                             # Asynchronous MySQL driver built on PyMySQL
+from logging_setup import setup_logger      # Custom logging setup module
+from metrics import timed_async_query       # Records per-function query durations for GET /metrics
+from db_helper import DB_CONFIG, POOL_CONFIG  # Same connection settings as the sync helper
+from db_helper import router                 # Read routing and pins shared with the sync helper
+from db_router import ROUTING_CONFIG         # Replica hosts
+from db_helper import (                      # Archive watermark cache shared with the sync helper
+    ARCHIVE_WATERMARK_SQL, ARCHIVE_WATERMARK_LOCK_SQL,
+    cached_archive_watermark, store_archive_watermark, raise_if_archived,
+)
+from db_helper import (                      # Statements shared with the sync helper
+    INSERT_EXPENSE_SQL, SELECT_BY_DATE_SQL, DELETE_BY_DATE_SQL,
+    ROLLUP_DELETE_SQL, ROLLUP_INSERT_SQL, SUMMARY_SQL,
+    BUMP_DATE_VERSION_SQL, DATE_VERSION_SQL, RANGE_VERSION_SQL,
+    MONTHLY_TOTAL_UPSERT_SQL, rollup_rows_sql, budget_check_sql, monthly_deltas, crossed_budgets,
+    notes_index_sql,
+)
+
+# Initialize a logger specific to this module for consistent logging
+logger = setup_logger('async_db_helper')
+
+# The async pools are created on first use (or explicitly at server startup)
+_pool = None
+_replica_pools = {}
+_pool_lock = asyncio.Lock()
+
+
+async def _create_pool(host, port):
+    return await aiomysql.create_pool(
+        host         = host,
+        port         = port,
+        user         = DB_CONFIG["user"],
+        password     = DB_CONFIG["password"],
+        db           = DB_CONFIG["database"],
+        minsize      = 1,
+        maxsize      = POOL_CONFIG["pool_size"] + POOL_CONFIG["max_overflow"],
+        pool_recycle = int(POOL_CONFIG["recycle"]),
+        autocommit   = True,
+    )
+
+
+async def get_pool(replica=None):
+    """
+    Returns the process-wide aiomysql pool of the primary (or of one replica),
+    creating it on first use.
+
+    Args:
+        replica (int): Index into EXPENSE_DB_REPLICA_HOSTS, or None for the primary.
+
+    Returns:
+        aiomysql.Pool: The pool shared by every coroutine in this module.
+    """
+    global _pool
+    if replica is not None:
+        if replica not in _replica_pools:
+            async with _pool_lock:
+                if replica not in _replica_pools:
+                    host, port = ROUTING_CONFIG["replica_hosts"][replica]
+                    _replica_pools[replica] = await _create_pool(host, port)
+        return _replica_pools[replica]
+    if _pool is None:
+        async with _pool_lock:
+            if _pool is None:
+                _pool = await _create_pool(DB_CONFIG["host"], DB_CONFIG["port"])
+    return _pool
+
+
+async def close_pool():
+    """Closes every pooled connection; called when the async server shuts down."""
+    global _pool
+    pools = list(_replica_pools.values()) + ([_pool] if _pool is not None else [])
+    _pool = None
+    _replica_pools.clear()
+    for pool in pools:
+        pool.close()
+        await pool.wait_closed()
+
+
+async def get_pool_stats():
+    """
+    Returns async pool usage statistics.
+
+    Returns:
+        dict: Open, idle and in-use connection counts plus the configured bounds.
+    """
+    await get_pool()
+    return current_pool_stats()
+
+
+def current_pool_stats():
+    """
+    Synchronous snapshot of the async pool statistics for the metrics gauges.
+
+    Returns:
+        dict: Same keys as get_pool_stats(), or an empty dict before the pool exists.
+    """
+    pool = _pool
+    if pool is None:
+        return {}
+    return {
+        "minsize": pool.minsize,
+        "maxsize": pool.maxsize,
+        "open": pool.size,
+        "idle": pool.freesize,
+        "in_use": pool.size - pool.freesize,
+    }
+
+
+async def _acquire(readonly):
+    """
+    Borrows a connection for the next statement block, like db_helper._acquire:
+    read-only blocks may go to a replica, and if that replica's pool cannot be
+    created or cannot hand out a connection, the read falls back to the primary.
+
+    Returns:
+        tuple[aiomysql.Pool, aiomysql.Connection]: The pool and the borrowed connection
+        (give it back with pool.release()).
+    """
+    replica = router.choose_replica() if readonly else None
+    if replica is not None:
+        try:
+            pool = await get_pool(replica)
+            return pool, await pool.acquire()
+        except Exception:
+            logger.warning("replica %s unavailable; reading from the primary", replica, exc_info=True)
+            router.note_fallback()
+    pool = await get_pool()
+    return pool, await pool.acquire()
+
+
+@asynccontextmanager
+async def get_db_cursor(commit=False, readonly=False):
+    """
+    Async context manager that provides an aiomysql dictionary cursor.
+    Mirrors db_helper.get_db_cursor: the connection comes from the pool and,
+    with 'commit=True', the statements run in one transaction that is rolled
+    back if an exception is raised. Read-only blocks may run on a replica.
+
+    Args:
+        commit (bool): If True, commits the transaction when exiting the context.
+        readonly (bool): If True (and not committing), the block may run on a replica.
+
+    Yields:
+        cursor (aiomysql.DictCursor): A dictionary-based cursor object.
+    """
+    pool, connection = await _acquire(readonly and not commit)
+    try:
+        if commit:
+            await connection.begin()
+        try:
+            async with connection.cursor(aiomysql.DictCursor) as cursor:
+                yield cursor
+            if commit:
+                await connection.commit()
+                router.note_write()
+        except Exception:
+            if commit:
+                await connection.rollback()
+            raise
+    finally:
+        pool.release(connection)
+
+
+async def check_writable(expense_dates):
+    """
+    Async version of db_helper.check_writable (same per-process watermark cache).
+
+    Args:
+        expense_dates (iterable): Dates about to be written.
+
+    Raises:
+        db_helper.ArchivedDateError: If any date lies before the archive watermark.
+    """
+    hit, watermark = cached_archive_watermark()
+    if not hit:
+        async with get_db_cursor() as cursor:
+            await cursor.execute(ARCHIVE_WATERMARK_SQL)
+            watermark = store_archive_watermark(await cursor.fetchone())
+    raise_if_archived(expense_dates, watermark)
+
+
+# ------------------------- CRUD OPERATION: READ -------------------------
+@timed_async_query
+async def retrieve_expenses_by_date(expense_date):
+    """
+    Retrieves all expense records for a specific date.
+
+    Args:
+        expense_date (str): Date to fetch expenses for (format: 'YYYY-MM-DD').
+
+    Returns:
+        list[dict]: A list of expense records as dictionaries.
+    """
+    logger.info("retrieve_expenses_by_date function called with date %s", expense_date)
+
+    async with get_db_cursor(readonly=True) as cursor:
+        await cursor.execute(SELECT_BY_DATE_SQL, (expense_date,))
+        return await cursor.fetchall()
+
+
+# ------------------------- BULK OPERATION: REPLACE -------------------------
+@timed_async_query
+async def replace_expenses_for_date(expense_date, expenses):
+    """
+    Replaces every expense record of a date with a new set in one transaction.
+
+    Args:
+        expense_date (str): Date whose expenses are replaced (format: 'YYYY-MM-DD').
+        expenses (list[dict]): New records, each with 'amount', 'category' and 'notes'.
+
+    Returns:
+        list[dict]: Budgets pushed over their monthly limit (see db_helper.crossed_budgets).
+    """
+    logger.info("replace_expenses_for_date function called with date %s and %s rows", expense_date, len(expenses))
+    await check_writable([expense_date])
+
+    async with get_db_cursor(commit=True) as cursor:
+        await cursor.execute(DELETE_BY_DATE_SQL, (expense_date,))
+        if expenses:
+            await cursor.executemany(
+                INSERT_EXPENSE_SQL,
+                [
+                    (expense_date, expense['amount'], expense['category'], expense['notes'])
+                    for expense in expenses
+                ]
+            )
+        # The cached check above can be stale: re-check under a shared lock (see db_helper.lock_writable)
+        await cursor.execute(ARCHIVE_WATERMARK_LOCK_SQL)
+        raise_if_archived([expense_date], store_archive_watermark(await cursor.fetchone()))
+        # Recompute the day's rollup rows, month totals and note index, and bump its version, in one transaction
+        await cursor.execute(rollup_rows_sql(1), (expense_date,))
+        old_rows = await cursor.fetchall()
+        await cursor.execute(ROLLUP_DELETE_SQL, (expense_date,))
+        await cursor.execute(ROLLUP_INSERT_SQL, (expense_date,))
+        await cursor.execute(rollup_rows_sql(1), (expense_date,))
+        alerts = await update_monthly_totals(cursor, monthly_deltas(old_rows, await cursor.fetchall()))
+        for sql in notes_index_sql(1):
+            await cursor.execute(sql, (expense_date,))
+        await cursor.execute(BUMP_DATE_VERSION_SQL, (expense_date,))
+    return alerts
+
+
+async def update_monthly_totals(cursor, deltas):
+    """Async version of db_helper.update_monthly_totals (same statements)."""
+    if not deltas:
+        return []
+    await cursor.executemany(
+        MONTHLY_TOTAL_UPSERT_SQL,
+        [(month, category, amount, count) for (month, category), (amount, count) in sorted(deltas.items())]
+    )
+    grown = [key for key, (amount, _) in sorted(deltas.items()) if amount > 0]
+    if not grown:
+        return []
+    await cursor.execute(budget_check_sql(len(grown)), [value for key in grown for value in key])
+    return crossed_budgets(deltas, await cursor.fetchall())
+
+
+# ---------------------- VERSION QUERIES: ETAGS ----------------------
+@timed_async_query
+async def fetch_date_version(expense_date):
+    """
+    Returns the current version of a date (0 if never written).
+    See db_helper.fetch_date_version.
+    """
+    async with get_db_cursor(readonly=True) as cursor:
+        await cursor.execute(DATE_VERSION_SQL, (expense_date,))
+        row = await cursor.fetchone()
+    return int(row['version']) if row else 0
+
+
+@timed_async_query
+async def fetch_range_version(start_date, end_date):
+    """
+    Returns (number of written dates, sum of their versions) within a range.
+    See db_helper.fetch_range_version.
+    """
+    async with get_db_cursor(readonly=True) as cursor:
+        await cursor.execute(RANGE_VERSION_SQL, (start_date, end_date))
+        row = await cursor.fetchone()
+    return int(row['dates']), int(row['version'])
+
+
+# ---------------------- AGGREGATE QUERY: SUMMARY ----------------------
+@timed_async_query
+async def fetch_expense_summary(start_date, end_date):
+    """
+    Retrieves the sum of expenses grouped by category within a date range,
+    reading the daily rollup maintained by the write path.
+
+    Args:
+        start_date (str): Start date of the range (format: 'YYYY-MM-DD').
+        end_date (str): End date of the range (format: 'YYYY-MM-DD').
+
+    Returns:
+        list[dict]: Each record contains a category and its total sum of expenses.
+    """
+    logger.info("fetch_expense_summary function called between dates %s - %s", start_date, end_date)
+
+    async with get_db_cursor(readonly=True) as cursor:
+        await cursor.execute(SUMMARY_SQL, (start_date, end_date))
+        return await cursor.fetchall()
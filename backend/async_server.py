@@ -0,0 +1,161 @@
+# Import necessary modules and dependencies
+from contextlib import asynccontextmanager  # Used to build the application lifespan handler
+from fastapi import FastAPI, HTTPException, Header, Response  # Core FastAPI class, HTTP errors, headers
+from datetime import date                   # For handling and validating date objects
+from typing import List, Optional           # For type hinting lists and optional headers in endpoints
+import async_db_helper                      # Async (aiomysql) versions of the database operations
+import db_helper                            # Shared exception types (ArchivedDateError)
+import metrics                              # Request/query histograms and pool/cache gauges
+import server                               # Sync app: shared models, helpers and remaining routes
+import snapshot                             # Columnar engine for long analytics ranges (sync, run in the threadpool)
+from starlette.concurrency import run_in_threadpool
+from server import Expense, StoredExpense, DateRange, build_analytics_breakdown
+from server import date_etag, range_etag, etag_matches, not_modified, finish_response, expense_rows
+from server import budget_alert_headers
+from fast_responses import FastJSONResponse, CompressionMiddleware, RESPONSE_CONFIG
+from db_router import ReadRoutingMiddleware
+from analytics_cache import summary_cache  # Shared with the sync app
+
+# -------------------------------------------------------------------------
+# Async variant of the API. It serves the same contract as server.py, but the
+# hot endpoints are coroutines backed by an aiomysql pool, so one worker can
+# keep hundreds of requests in flight without exhausting the threadpool.
+#
+# Select it at startup through main.py:
+#   EXPENSE_SERVER_MODE=async fastapi dev ./main.py
+# -------------------------------------------------------------------------
+
+
+@asynccontextmanager
+async def lifespan(app):
+    """Opens the async pool, the shared ingest flusher and snapshot refresher; drains and closes them on shutdown."""
+    await async_db_helper.get_pool()
+    server.ingest_buffer.start()
+    snapshot.start_refresher()
+    yield
+    snapshot.stop_refresher()
+    server.ingest_buffer.close()
+    await async_db_helper.close_pool()
+
+
+# Instantiate the FastAPI application
+app = FastAPI(lifespan=lifespan, default_response_class=FastJSONResponse)
+
+# Same compression and request timing as the sync app; the async pool gets its own gauges
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=RESPONSE_CONFIG["minimum_size"],
+    gzip_level=RESPONSE_CONFIG["gzip_level"],
+    brotli_quality=RESPONSE_CONFIG["brotli_quality"],
+)
+app.add_middleware(ReadRoutingMiddleware)
+app.add_middleware(metrics.RequestMetricsMiddleware)
+metrics.register_gauges("expense_async_db_pool", "Async database connection pool statistics",
+                        async_db_helper.current_pool_stats)
+
+
+# ----------------------------- API ENDPOINTS -----------------------------
+
+# Endpoint: Retrieve all expenses for a specific date
+@app.get("/expenses/{expenses_date}", response_model=List[StoredExpense])
+async def get_expenses(expenses_date: date, response: Response, if_none_match: Optional[str] = Header(None)):
+    """
+    Async GET endpoint that retrieves all expenses for a given date.
+    See server.get_expenses for the contract (including ETag / 304 handling).
+    """
+    etag = date_etag(expenses_date, await async_db_helper.fetch_date_version(expenses_date))
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+
+    expenses = await async_db_helper.retrieve_expenses_by_date(expenses_date)
+
+    if expenses is None:
+        raise HTTPException(status_code=500, detail="Failed to retrieve expenses from the DB")
+
+    return finish_response(expense_rows(expenses), response, etag)
+
+
+# Endpoint: Insert or update expenses for a given date
+@app.post("/expenses/{expenses_date}", response_model=List[Expense])
+async def add_or_update_expenses(expenses_date: date, expenses: List[Expense], response: Response):
+    """
+    Async POST endpoint that replaces the expenses of a date in one transaction.
+    See server.add_or_update_expenses for the contract.
+    """
+    try:
+        alerts = await async_db_helper.replace_expenses_for_date(expenses_date, [expense.model_dump() for expense in expenses])
+    except db_helper.ArchivedDateError as error:
+        raise HTTPException(status_code=409, detail=str(error))
+    summary_cache.invalidate_dates(expenses_date)
+
+    return finish_response([expense.model_dump() for expense in expenses], response,
+                           headers=budget_alert_headers(alerts))
+
+
+async def analytics_response(start_date, end_date, response, if_none_match=None):
+    """Async version of server.analytics_response (cache, ETag, then DB)."""
+    cached = summary_cache.get(start_date, end_date)
+    if cached is not None:
+        etag, breakdown = cached
+    else:
+        generation = summary_cache.generation()
+        etag = range_etag(start_date, end_date, await async_db_helper.fetch_range_version(start_date, end_date))
+        breakdown = None
+
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+
+    if breakdown is None:
+        if snapshot.use_snapshot(start_date, end_date):
+            # DuckDB is blocking: keep it off the event loop
+            data = await run_in_threadpool(snapshot.fetch_expense_summary, start_date, end_date)
+        else:
+            data = await async_db_helper.fetch_expense_summary(start_date, end_date)
+
+        if data is None:
+            raise HTTPException(status_code=500, detail="Failed to retrieve expense summary from the DB.")
+
+        breakdown = build_analytics_breakdown(data)
+        if db_helper.router.cache_safe():
+            summary_cache.put(start_date, end_date, (etag, breakdown), generation)
+
+    return finish_response(breakdown, response, etag)
+
+
+# Endpoint: Generate analytics (summary) for a given date range
+@app.post("/analytics/")
+async def get_analytics(date_range: DateRange, response: Response):
+    """
+    Async POST endpoint that generates an expense summary grouped by category.
+    See server.get_analytics for the contract.
+    """
+    return await analytics_response(date_range.start_date, date_range.end_date, response)
+
+
+# Endpoint: Same summary as a cacheable GET (supports If-None-Match)
+@app.get("/analytics/")
+async def get_analytics_conditional(start_date: date, end_date: date, response: Response,
+                                    if_none_match: Optional[str] = Header(None)):
+    """
+    Async GET variant of the analytics endpoint.
+    See server.get_analytics_conditional for the contract.
+    """
+    return await analytics_response(start_date, end_date, response, if_none_match)
+
+
+# Endpoint: Report async connection pool usage
+@app.get("/stats/pool")
+async def get_pool_stats():
+    """Async GET endpoint that exposes aiomysql pool statistics."""
+    return await async_db_helper.get_pool_stats()
+
+
+# ------------------------- SHARED (SYNC) ROUTES -------------------------
+# Every other route of the sync app is served unchanged (FastAPI runs sync
+# endpoints in its threadpool), so both modes expose the same API surface
+# (including the row-level PATCH /expenses/{date}).
+_async_routes = {(route.path, method) for route in app.routes for method in getattr(route, "methods", ())}
+for route in server.app.routes:
+    methods = getattr(route, "methods", None) or ()
+    if methods and not any((route.path, method) in _async_routes for method in methods):
+        app.router.routes.append(route)
@@ -0,0 +1,176 @@
+'''
+Bulk import of expenses from CSV (e.g. a bank statement history).
+
+The file is streamed and processed in chunks: each chunk is validated, written
+with one batched INSERT in a single transaction, and the daily rollup of the
+dates it touched is refreshed once. Invalid rows are skipped and reported with
+their line number; valid rows of the same chunk are still imported.
+
+Expected columns (header row required, extra columns such as 'id' are ignored):
+
+    expense_date,amount,category,notes
+    2024-08-01,12.50,Food,Lunch
+
+Run from the backend folder:
+
+    python bulk_import.py statement.csv [--chunk-size 2000]
+
+or upload the file to the API:  POST /import/expenses
+'''
+
+# Import necessary modules
+import argparse                        # Command-line parsing
+import csv                             # Streaming CSV reader
+import math                            # Rejects NaN/inf amounts
+from datetime import date              # Validates ISO dates
+import db_helper                       # Batched inserts and rollup refresh
+from logging_setup import setup_logger # Custom logging setup module
+
+# Initialize a logger specific to this module for consistent logging
+logger = setup_logger('bulk_import')
+
+REQUIRED_COLUMNS = ("expense_date", "amount", "category")
+DEFAULT_CHUNK_SIZE = 2000
+MAX_REPORTED_ERRORS = 1000   # Keeps the report bounded for badly formatted files
+
+
+class ImportAbortedError(Exception):
+    """
+    Raised when an import stops after it may have written chunks (e.g. an
+    undecodable byte halfway through the file, or a month archived meanwhile).
+    Committed chunks stay committed.
+
+    Attributes:
+        report (dict): The import report up to the failure (see import_csv),
+            with 'dates' holding the dates already written.
+        cause (Exception): The error that stopped the import.
+    """
+
+    def __init__(self, report, cause):
+        super().__init__(f"Import stopped after {report['rows_imported']} imported rows: {cause}")
+        self.report = report
+        self.cause = cause
+
+
+def parse_row(row):
+    """
+    Validates one CSV record and converts it to an insertable tuple.
+
+    Args:
+        row (dict): Record from csv.DictReader.
+
+    Returns:
+        tuple: (expense_date, amount, category, notes)
+
+    Raises:
+        ValueError: With a human-readable reason if the record is invalid.
+    """
+    raw_date = (row.get("expense_date") or "").strip()
+    try:
+        expense_date = date.fromisoformat(raw_date)
+    except ValueError:
+        raise ValueError(f"invalid expense_date {raw_date!r} (expected YYYY-MM-DD)")
+
+    raw_amount = (row.get("amount") or "").strip()
+    try:
+        amount = float(raw_amount)
+    except ValueError:
+        raise ValueError(f"invalid amount {raw_amount!r}")
+    if not math.isfinite(amount) or amount < 0:
+        raise ValueError(f"amount must be a non-negative number, got {raw_amount!r}")
+
+    category = (row.get("category") or "").strip()
+    if not category or len(category) > 255:
+        raise ValueError("category must be between 1 and 255 characters")
+
+    notes = (row.get("notes") or "").strip()
+    return (expense_date, amount, category, notes)
+
+
+def import_csv(text_stream, chunk_size=DEFAULT_CHUNK_SIZE, on_progress=None):
+    """
+    Streams a CSV file into the 'expenses' table chunk by chunk.
+
+    Args:
+        text_stream: A text file object positioned at the header row.
+        chunk_size (int): Number of data lines validated and written per transaction.
+        on_progress (callable): Optional callback receiving the report dict after each chunk.
+
+    Returns:
+        dict: Import report with 'rows_read', 'rows_imported', 'rows_rejected',
+              'chunks', 'dates' (sorted list of written dates) and 'errors'
+              (list of {'line', 'error'}, capped at MAX_REPORTED_ERRORS).
+
+    Raises:
+        ValueError: If the header is missing a required column (nothing was written).
+        ImportAbortedError: If the import fails once rows are being read; carries
+            the partial report of the chunks already committed.
+    """
+    reader = csv.DictReader(text_stream)
+    missing = [column for column in REQUIRED_COLUMNS if column not in (reader.fieldnames or [])]
+    if missing:
+        raise ValueError(f"CSV header is missing required column(s): {', '.join(missing)}")
+
+    report = {"rows_read": 0, "rows_imported": 0, "rows_rejected": 0, "chunks": 0, "errors": []}
+    watermark = db_helper.archive_watermark()
+    written_dates = set()
+
+    def flush(batch):
+        written_dates.update(db_helper.insert_expenses_batch(batch))
+        report["rows_imported"] += len(batch)
+        report["chunks"] += 1
+        if on_progress:
+            on_progress(report)
+
+    batch = []
+    try:
+        for row in reader:
+            report["rows_read"] += 1
+            try:
+                parsed = parse_row(row)
+                # Archived months are read-only; their rows are rejected like invalid ones
+                db_helper.raise_if_archived([parsed[0]], watermark)
+                batch.append(parsed)
+            except ValueError as error:
+                report["rows_rejected"] += 1
+                if len(report["errors"]) < MAX_REPORTED_ERRORS:
+                    # line_num counts physical lines, so it matches what an editor shows
+                    report["errors"].append({"line": reader.line_num, "error": str(error)})
+            if report["rows_read"] % chunk_size == 0 and batch:
+                flush(batch)
+                batch = []
+        if batch:
+            flush(batch)
+    except Exception as error:
+        # Earlier chunks are committed: report them (and their dates) with the failure
+        report["dates"] = sorted(written_dates)
+        logger.error("import_csv stopped after %s imported rows: %s", report['rows_imported'], error)
+        raise ImportAbortedError(report, error) from error
+
+    report["dates"] = sorted(written_dates)
+    logger.info("import_csv finished: %s imported, %s rejected", report['rows_imported'], report['rows_rejected'])
+    return report
+
+
+# ---------------------- MAIN BLOCK: COMMAND LINE ----------------------
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bulk import expenses from a CSV file.")
+    parser.add_argument("csv_file", help="Path to the CSV file")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="Rows per transaction")
+    args = parser.parse_args()
+
+    def print_progress(report):
+        print(f"chunk {report['chunks']}: {report['rows_imported']} imported, "
+              f"{report['rows_rejected']} rejected, {report['rows_read']} read")
+
+    with open(args.csv_file, newline="", encoding="utf-8-sig") as handle:
+        try:
+            result = import_csv(handle, chunk_size=args.chunk_size, on_progress=print_progress)
+        except ImportAbortedError as error:
+            print(error)
+            raise SystemExit(1)
+
+    for problem in result["errors"]:
+        print(f"line {problem['line']}: {problem['error']}")
+    print(f"Done: {result['rows_imported']} rows imported, {result['rows_rejected']} rejected. "
+          "Running servers pick up the new data once their analytics cache entries expire.")
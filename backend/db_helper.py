@@ -1,49 +1,659 @@
 # Import necessary modules
-import mysql.connector                 # MySQL database connector for Python
+import os                              # Reads database/pool settings from environment variables
+import re                              # Tokenizes note search text
+import threading                       # Guards lazy creation of the shared connection pool
+import time                            # Expiry of the cached archive watermark
 from contextlib import contextmanager  # Used to create context managers (for 'with' statements)
 from pprint import pprint              # Pretty-printing for more readable console output
 from logging_setup import setup_logger # Custom logging setup module
+from db_pool import ConnectionPool     # Shared, reusable MySQL connection pool
+from metrics import timed_query        # Records per-function query durations for GET /metrics
+from query_profiler import profiler    # Statement timing and slow-query log for get_db_cursor()
+from db_router import ReadRouter, ROUTING_CONFIG  # Read/write splitting between primary and replicas
+from prepared_statements import StatementCache, PreparedCursor, statement_stats  # Binary-protocol hot statements
 
 # Initialize a logger specific to this module for consistent logging
 logger = setup_logger('db_helper')
 
 
+# ---------------------- DATABASE / POOL CONFIGURATION ----------------------
+# Every setting can be overridden through an environment variable; the defaults
+# match the local development database used throughout this project.
+DB_CONFIG = {
+    "host":     os.getenv("EXPENSE_DB_HOST", "localhost"),
+    "port":     int(os.getenv("EXPENSE_DB_PORT", "3306")),
+    "user":     os.getenv("EXPENSE_DB_USER", "sql_tutorial"),
+    "password": os.getenv("EXPENSE_DB_PASSWORD", "mysql_Pa55word!-."),
+    "database": os.getenv("EXPENSE_DB_NAME", "expense_manager"),
+}
+
+POOL_CONFIG = {
+    "pool_size":    int(os.getenv("EXPENSE_DB_POOL_SIZE", "5")),         # Connections kept open while idle
+    "max_overflow": int(os.getenv("EXPENSE_DB_POOL_OVERFLOW", "10")),    # Extra connections allowed during bursts
+    "timeout":      float(os.getenv("EXPENSE_DB_POOL_TIMEOUT", "30")),   # Seconds to wait for a free connection
+    "idle_timeout": float(os.getenv("EXPENSE_DB_POOL_IDLE_TIMEOUT", "300")),  # Idle seconds before a connection is dropped
+    "recycle":      float(os.getenv("EXPENSE_DB_POOL_RECYCLE", "3600")), # Max connection lifetime in seconds
+    "pre_ping":     os.getenv("EXPENSE_DB_POOL_PRE_PING", "1") == "1",   # Health-check connections on checkout
+}
+
+# Hot statements can run as server-side prepared statements (binary protocol,
+# parsed once per connection), and GET /expenses/{date} can build its response
+# from tuple rows instead of the connector's dict rows
+PREPARED_CONFIG = {
+    "enabled":        os.getenv("EXPENSE_DB_PREPARED", "0") == "1",                   # Prepare the PREPARED_SQL statements
+    "max_statements": int(os.getenv("EXPENSE_DB_PREPARED_CACHE_SIZE", "32")),        # Statements kept prepared per connection
+    "tuple_rows":     os.getenv("EXPENSE_DB_TUPLE_ROWS", "1") == "1",                 # Fetch per-date rows as tuples
+}
+
+# The pool is created lazily on first use so importing this module never opens a connection
+_pool = None
+_pool_lock = threading.Lock()
+
+# Replicas (EXPENSE_DB_REPLICA_HOSTS) use the primary's credentials and pool settings;
+# reads marked 'readonly' are spread over them, writes always use the primary
+_replica_pools = None
+router = ReadRouter(
+    replica_count=len(ROUTING_CONFIG["replica_hosts"]),
+    policy=ROUTING_CONFIG["policy"],
+    pin_seconds=ROUTING_CONFIG["pin_seconds"],
+    max_pinned_clients=ROUTING_CONFIG["max_pinned_clients"],
+)
+
+
+def get_pool():
+    """
+    Returns the process-wide connection pool, creating it on first use.
+
+    Returns:
+        ConnectionPool: The pool shared by every CRUD function in this module.
+    """
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = ConnectionPool(DB_CONFIG, **POOL_CONFIG)
+    return _pool
+
+
+def get_replica_pools():
+    """
+    Returns one connection pool per configured replica, creating them on first use.
+
+    Returns:
+        list[ConnectionPool]: Pools in EXPENSE_DB_REPLICA_HOSTS order (empty if none).
+    """
+    global _replica_pools
+    if _replica_pools is None:
+        with _pool_lock:
+            if _replica_pools is None:
+                _replica_pools = [
+                    ConnectionPool({**DB_CONFIG, "host": host, "port": port}, **POOL_CONFIG)
+                    for host, port in ROUTING_CONFIG["replica_hosts"]
+                ]
+    return _replica_pools
+
+
+def get_pool_stats():
+    """
+    Returns connection pool usage statistics (in use, idle, waiting, checkout latency, ...).
+
+    Returns:
+        dict: See ConnectionPool.stats().
+    """
+    return get_pool().stats()
+
+
+def get_statement_stats():
+    """
+    Returns prepared statement usage (prepares, executions, evictions, reuse ratio).
+
+    Returns:
+        dict: See prepared_statements.statement_stats(), plus 'enabled'.
+    """
+    return {"enabled": PREPARED_CONFIG["enabled"], **statement_stats()}
+
+
+def get_replica_stats():
+    """
+    Returns the usage statistics of every replica pool.
+
+    Returns:
+        list[dict]: One ConnectionPool.stats() per replica, with its 'host'.
+    """
+    return [
+        {"host": f"{host}:{port}", **pool.stats()}
+        for (host, port), pool in zip(ROUTING_CONFIG["replica_hosts"], get_replica_pools())
+    ]
+
+
+def _acquire(readonly):
+    """
+    Borrows a connection for the next statement block.
+    Read-only blocks may go to a replica (see db_router.ReadRouter); if that
+    replica cannot be reached, the read falls back to the primary.
+
+    Returns:
+        tuple[ConnectionPool, PooledConnection]: The pool and the borrowed connection.
+    """
+    replica = router.choose_replica() if readonly else None
+    if replica is not None:
+        pool = get_replica_pools()[replica]
+        try:
+            return pool, pool.acquire()
+        except Exception:
+            logger.warning("replica %s unavailable; reading from the primary", replica, exc_info=True)
+            router.note_fallback()
+    pool = get_pool()
+    return pool, pool.acquire()
+
+
 @contextmanager
-def get_db_cursor(commit=False):
+def get_db_cursor(commit=False, readonly=False, dictionary=True):
     """
     Context manager that provides a MySQL cursor object.
-    Automatically handles opening and closing the connection.
-    Optionally commits transactions if 'commit=True'.
+    Borrows a connection from the shared pool and returns it afterwards.
+    If 'commit=True', the statements run inside one transaction that is
+    committed on success and rolled back if an exception is raised.
     
     Args:
         commit (bool): If True, commits the transaction when exiting the context.
+        readonly (bool): If True (and not committing), the block may run on a replica.
+        dictionary (bool): If False, rows are returned as tuples.
     
     Yields:
-        cursor (mysql.connector.cursor.MySQLCursorDict): A dictionary-based cursor object.
-    """
-    # Establish connection to the MySQL database
-    connection = mysql.connector.connect(
-        host     = "localhost",
-        user     = "sql_tutorial",
-        password = "mysql_Pa55word!-.",
-        database = "expense_manager"
+        cursor (mysql.connector.cursor.MySQLCursorDict): A dictionary-based cursor object
+            (a prepared_statements.PreparedCursor when EXPENSE_DB_PREPARED=1; wrapped by
+            query_profiler.ProfiledCursor while profiling is enabled).
+    """
+    # Borrow a connection from the pool (opens one only if none are idle)
+    pool, pooled = _acquire(readonly and not commit)
+    connection = pooled.connection
+    discard = False
+    profiled = None
+
+    try:
+        # Pooled connections run in autocommit mode; writes get an explicit transaction
+        if commit:
+            connection.start_transaction()
+
+        # Create a cursor that returns rows as dictionaries (or tuples)
+        if PREPARED_CONFIG["enabled"]:
+            # Prepared statements belong to the connection and outlive this block
+            if pooled.statements is None:
+                pooled.statements = StatementCache(connection, PREPARED_CONFIG["max_statements"])
+            cursor = PreparedCursor(pooled.statements, PREPARED_SQL, dictionary)
+        else:
+            cursor = connection.cursor(dictionary=dictionary)
+        # Time every statement run through the cursor (see query_profiler.py)
+        if profiler.enabled:
+            cursor = profiled = profiler.wrap(cursor)
+        try:
+            # Provide the cursor to the calling code
+            yield cursor
+
+            # Commit the transaction if specified; the writer then reads from the primary for a while
+            if commit:
+                connection.commit()
+                router.note_write()
+        finally:
+            try:
+                cursor.close()
+            except Exception:
+                # e.g. a streaming cursor abandoned before its last row: the
+                # connection still has unread results and cannot be reused
+                discard = True
+    except Exception:
+        # Undo any partial work; a connection that cannot roll back is not reused
+        try:
+            if connection.in_transaction:
+                connection.rollback()
+        except Exception:
+            discard = True
+        raise
+    finally:
+        # Log slow statements once the connection is idle, so EXPLAIN can run on it
+        if profiled is not None:
+            profiler.flush(profiled, None if discard else connection)
+        # Return the connection to the pool instead of closing it
+        pool.release(pooled, discard=discard)
+
+
+# ------------------------- SQL STATEMENTS -------------------------
+# Statements are kept at module level so the async helper can share them and
+# 'python migrate.py check' can EXPLAIN each one against the live schema.
+INSERT_EXPENSE_SQL = "INSERT INTO expenses (expense_date, amount, category, notes) VALUES (%s, %s, %s, %s)"
+SELECT_BY_DATE_SQL = "SELECT * FROM expenses WHERE expense_date = %s"
+# Response-shaped variant of SELECT_BY_DATE_SQL: exactly the fields of the API response, in order
+EXPENSE_ROW_FIELDS = ("id", "amount", "category", "notes")
+SELECT_ROWS_BY_DATE_SQL = f"SELECT {', '.join(EXPENSE_ROW_FIELDS)} FROM expenses WHERE expense_date = %s"
+DELETE_BY_DATE_SQL = "DELETE FROM expenses WHERE expense_date = %s"
+# Ordered like idx_expenses_date_category so MySQL can stream rows without a filesort
+EXPORT_RANGE_SQL = (
+    "SELECT id, expense_date, amount, category, notes FROM expenses "
+    "WHERE expense_date BETWEEN %s AND %s ORDER BY expense_date, category, id"
+)
+
+
+# ---------------------- DERIVED DATA: DAILY ROLLUP ----------------------
+# 'expense_daily_rollup' holds one row per (date, category) with the sum and
+# count of that day's expenses. It is refreshed inside the same transaction as
+# every write to a day, so analytics can aggregate it instead of raw rows.
+# Rebuild or verify it with:  python rollup.py {rebuild|verify}
+ROLLUP_DELETE_SQL = "DELETE FROM expense_daily_rollup WHERE expense_date = %s"
+ROLLUP_INSERT_SQL = (
+    "INSERT INTO expense_daily_rollup (expense_date, category, total_amount, expense_count) "
+    "SELECT expense_date, category, SUM(amount), COUNT(*) FROM expenses "
+    "WHERE expense_date = %s GROUP BY expense_date, category"
+)
+SUMMARY_SQL = (
+    "SELECT category, SUM(total_amount) AS `sum(amount)` FROM expense_daily_rollup "
+    "WHERE expense_date BETWEEN %s AND %s GROUP BY category"
+)
+
+
+# Expression mapping a date to the first day of its period, per trend granularity
+# (weeks start on Monday). Only these whitelisted expressions are interpolated into SQL.
+TREND_PERIOD_SQL = {
+    "day":   "expense_date",
+    "week":  "DATE_SUB(expense_date, INTERVAL WEEKDAY(expense_date) DAY)",
+    "month": "DATE_SUB(expense_date, INTERVAL DAYOFMONTH(expense_date) - 1 DAY)",
+}
+
+
+def refresh_daily_rollups(cursor, expense_dates):
+    """
+    Recomputes the rollup rows of several dates with two set-based statements.
+    Used by bulk writes so derived data is refreshed once per batch, not once per row.
+    The month-to-date totals follow incrementally (see update_monthly_totals).
+
+    Args:
+        cursor: Cursor of the write transaction.
+        expense_dates (iterable): Dates whose rollup rows are refreshed.
+
+    Returns:
+        list[dict]: Budgets the write pushed over their limit (see crossed_budgets).
+
+    Raises:
+        ArchivedDateError: If any date was archived (see lock_writable).
+    """
+    expense_dates = sorted(set(expense_dates))
+    if not expense_dates:
+        return []
+    lock_writable(cursor, expense_dates)
+    placeholders = ", ".join(["%s"] * len(expense_dates))
+    old_rows = fetch_rollup_rows(cursor, expense_dates)
+    cursor.execute(
+        f"DELETE FROM expense_daily_rollup WHERE expense_date IN ({placeholders})",
+        expense_dates
+    )
+    cursor.execute(
+        "INSERT INTO expense_daily_rollup (expense_date, category, total_amount, expense_count) "
+        "SELECT expense_date, category, SUM(amount), COUNT(*) FROM expenses "
+        f"WHERE expense_date IN ({placeholders}) GROUP BY expense_date, category",
+        expense_dates
     )
-    # Create a cursor that returns rows as dictionaries
-    cursor = connection.cursor(dictionary=True)
+    return update_monthly_totals(cursor, monthly_deltas(old_rows, fetch_rollup_rows(cursor, expense_dates)))
+
+
+def refresh_daily_rollup(cursor, expense_date):
+    """
+    Recomputes the rollup rows of one date from the raw 'expenses' rows.
+    Must be called with a cursor from get_db_cursor(commit=True) so the
+    refresh commits (or rolls back) together with the write it follows.
+
+    Args:
+        cursor: Cursor of the write transaction.
+        expense_date (str): Date whose rollup rows are refreshed (format: 'YYYY-MM-DD').
+
+    Returns:
+        list[dict]: Budgets the write pushed over their limit (see crossed_budgets).
+
+    Raises:
+        ArchivedDateError: If the date was archived (see lock_writable).
+    """
+    lock_writable(cursor, [expense_date])
+    old_rows = fetch_rollup_rows(cursor, [expense_date])
+    cursor.execute(ROLLUP_DELETE_SQL, (expense_date,))
+    cursor.execute(ROLLUP_INSERT_SQL, (expense_date,))
+    return update_monthly_totals(cursor, monthly_deltas(old_rows, fetch_rollup_rows(cursor, [expense_date])))
 
-    # Provide the cursor to the calling code
-    yield cursor
 
-    # Commit the transaction if specified
-    if commit:
-        connection.commit()
+# ---------------------- DERIVED DATA: MONTHLY TOTALS AND BUDGETS ----------------------
+# 'expense_monthly_totals' holds the month-to-date sum and count per category
+# and 'category_budgets' an optional monthly limit per category (migration 0006).
+# A write adds the difference between its dates' new and old rollup rows to
+# their months, so checking budgets costs a few primary-key lookups and never
+# re-aggregates a month.
+MONTHLY_TOTAL_UPSERT_SQL = (
+    "INSERT INTO expense_monthly_totals (month, category, total_amount, expense_count) VALUES (%s, %s, %s, %s) "
+    "ON DUPLICATE KEY UPDATE total_amount = total_amount + VALUES(total_amount), "
+    "expense_count = expense_count + VALUES(expense_count)"
+)
+BUDGET_UPSERT_SQL = (
+    "INSERT INTO category_budgets (category, monthly_limit) VALUES (%s, %s) "
+    "ON DUPLICATE KEY UPDATE monthly_limit = VALUES(monthly_limit)"
+)
+BUDGET_DELETE_SQL = "DELETE FROM category_budgets WHERE category = %s"
+BUDGET_STATUS_SQL = (
+    "SELECT b.category, b.monthly_limit, COALESCE(t.total_amount, 0) AS total, "
+    "COALESCE(t.expense_count, 0) AS expense_count "
+    "FROM category_budgets b LEFT JOIN expense_monthly_totals t ON t.month = %s AND t.category = b.category "
+    "ORDER BY b.category"
+)
 
-    # Close cursor and connection to release resources
-    cursor.close()
-    connection.close()
+
+def rollup_rows_sql(count):
+    """Locking read of the rollup rows of 'count' dates (the current state, not a snapshot)."""
+    placeholders = ", ".join(["%s"] * count)
+    return (
+        "SELECT expense_date, category, total_amount, expense_count FROM expense_daily_rollup "
+        f"WHERE expense_date IN ({placeholders}) FOR UPDATE"
+    )
+
+
+def budget_check_sql(count):
+    """Month-to-date totals and limits of 'count' (month, category) pairs that have a budget."""
+    pairs = ", ".join(["(%s, %s)"] * count)
+    return (
+        "SELECT t.month, t.category, t.total_amount, b.monthly_limit FROM expense_monthly_totals t "
+        "JOIN category_budgets b ON b.category = t.category "
+        f"WHERE (t.month, t.category) IN ({pairs})"
+    )
+
+
+def fetch_rollup_rows(cursor, expense_dates):
+    """Returns the current rollup rows of some dates inside a write transaction."""
+    cursor.execute(rollup_rows_sql(len(expense_dates)), list(expense_dates))
+    return cursor.fetchall()
+
+
+def monthly_deltas(old_rows, new_rows):
+    """
+    Turns a refresh of daily rollup rows into changes of the monthly totals.
+
+    Args:
+        old_rows (list[dict]): Rollup rows before the write.
+        new_rows (list[dict]): Rollup rows after the write.
+
+    Returns:
+        dict: (first day of month, category) -> (amount delta, count delta); unchanged pairs omitted.
+    """
+    deltas = {}
+    for rows, sign in ((old_rows, -1), (new_rows, 1)):
+        for row in rows:
+            key = (row['expense_date'].replace(day=1), row['category'])
+            amount, count = deltas.get(key, (0, 0))
+            deltas[key] = (amount + sign * row['total_amount'], count + sign * row['expense_count'])
+    return {key: delta for key, delta in deltas.items() if delta != (0, 0)}
+
+
+def crossed_budgets(deltas, rows):
+    """
+    Picks the budgets that a write pushed over their limit.
+
+    Args:
+        deltas (dict): Output of monthly_deltas().
+        rows (list[dict]): Month-to-date totals after the write with their 'monthly_limit'.
+
+    Returns:
+        list[dict]: 'category', 'month', 'monthly_limit' and 'total' for every budget
+                    that was within its limit before the write and is over it now.
+    """
+    alerts = []
+    for row in rows:
+        amount = deltas.get((row['month'], row['category']), (0, 0))[0]
+        if row['total_amount'] - amount <= row['monthly_limit'] < row['total_amount']:
+            alerts.append({
+                "category": row['category'],
+                "month": row['month'],
+                "monthly_limit": row['monthly_limit'],
+                "total": row['total_amount'],
+            })
+    return sorted(alerts, key=lambda alert: (alert['month'], alert['category']))
+
+
+def update_monthly_totals(cursor, deltas):
+    """
+    Applies rollup deltas to the month-to-date totals and checks the budgets they touch.
+
+    Args:
+        cursor: Cursor of the write transaction.
+        deltas (dict): Output of monthly_deltas().
+
+    Returns:
+        list[dict]: Budgets crossed by the write (see crossed_budgets).
+    """
+    if not deltas:
+        return []
+    cursor.executemany(
+        MONTHLY_TOTAL_UPSERT_SQL,
+        [(month, category, amount, count) for (month, category), (amount, count) in sorted(deltas.items())]
+    )
+    # Only growing totals can cross a limit
+    grown = [key for key, (amount, _) in sorted(deltas.items()) if amount > 0]
+    if not grown:
+        return []
+    cursor.execute(budget_check_sql(len(grown)), [value for key in grown for value in key])
+    return crossed_budgets(deltas, cursor.fetchall())
+
+
+# ---------------------- DERIVED DATA: DATE VERSIONS ----------------------
+# 'expense_date_versions' holds a counter per date that every write bumps in
+# its own transaction. The API turns it into ETags, so unchanged data can be
+# answered with '304 Not Modified' after one primary-key lookup.
+BUMP_DATE_VERSION_SQL = (
+    "INSERT INTO expense_date_versions (expense_date, version) VALUES (%s, 1) "
+    "ON DUPLICATE KEY UPDATE version = version + 1"
+)
+DATE_VERSION_SQL = "SELECT version FROM expense_date_versions WHERE expense_date = %s"
+RANGE_VERSION_SQL = (
+    "SELECT COUNT(*) AS dates, COALESCE(SUM(version), 0) AS version "
+    "FROM expense_date_versions WHERE expense_date BETWEEN %s AND %s"
+)
+
+# Small, very frequent fixed-shape statements: with EXPENSE_DB_PREPARED=1 they
+# are parsed once per connection (see prepared_statements.py). Statements built
+# per call (IN lists, batched INSERTs) would only fill the handle cache.
+PREPARED_SQL = frozenset({
+    SELECT_BY_DATE_SQL, SELECT_ROWS_BY_DATE_SQL, DELETE_BY_DATE_SQL,
+    SUMMARY_SQL, DATE_VERSION_SQL, RANGE_VERSION_SQL,
+})
+
+
+def bump_date_versions(cursor, expense_dates):
+    """
+    Increments the version of every given date (creating it at 1 if new).
+    Must run inside the write transaction so the version changes exactly
+    when the written rows become visible.
+
+    Args:
+        cursor: Cursor of the write transaction.
+        expense_dates (iterable): Dates that were written.
+    """
+    expense_dates = sorted(set(expense_dates))
+    if expense_dates:
+        cursor.executemany(BUMP_DATE_VERSION_SQL, [(expense_date,) for expense_date in expense_dates])
+
+
+# ---------------------- DERIVED DATA: NOTE SEARCH INDEX ----------------------
+# 'expense_notes_fts' holds a copy of every non-empty note with a FULLTEXT
+# index (migration 0007; partitioned tables cannot have one). Like the rollup,
+# the notes of each written date are re-indexed in the write transaction, so
+# search never falls back to a LIKE '%...%' scan of 'expenses'.
+NOTES_INDEX_COLUMNS = "id, expense_date, category, amount, notes"
+SEARCH_MODE_SQL = "IN BOOLEAN MODE"
+SEARCH_MAX_TERMS = 10
+
+
+def notes_index_sql(count, append_only=False):
+    """
+    Statements that re-index the notes of 'count' dates (shared with async_db_helper).
+    Each takes the dates as its parameters.
+
+    Args:
+        count (int): Number of dates.
+        append_only (bool): The write only added rows (batched appends); existing
+            entries are kept and only the new rows are inserted.
+
+    Returns:
+        list[str]: The statements, in execution order.
+    """
+    placeholders = ", ".join(["%s"] * count)
+    insert = (
+        f"INSERT {'IGNORE ' if append_only else ''}INTO expense_notes_fts ({NOTES_INDEX_COLUMNS}) "
+        f"SELECT {NOTES_INDEX_COLUMNS} FROM expenses "
+        f"WHERE expense_date IN ({placeholders}) AND notes IS NOT NULL AND notes <> ''"
+    )
+    if append_only:
+        return [insert]
+    return [f"DELETE FROM expense_notes_fts WHERE expense_date IN ({placeholders})", insert]
+
+
+def index_notes(cursor, expense_dates, append_only=False):
+    """
+    Re-indexes the notes of some dates inside the write transaction.
+
+    Args:
+        cursor: Cursor of the write transaction.
+        expense_dates (iterable): Dates that were written.
+        append_only (bool): See notes_index_sql.
+    """
+    expense_dates = sorted(set(expense_dates))
+    if not expense_dates:
+        return
+    for sql in notes_index_sql(len(expense_dates), append_only):
+        cursor.execute(sql, expense_dates)
+
+
+def build_fulltext_query(text):
+    """
+    Turns free text into a BOOLEAN MODE search where every word must match,
+    as a word or a word prefix ('star coffee' -> '+star* +coffee*').
+    Only letters and digits are kept, so user input cannot inject operators.
+
+    Args:
+        text (str): The user's search text.
+
+    Returns:
+        str: The AGAINST(...) expression, or '' if the text has no searchable word.
+    """
+    words = re.findall(r"\w+", text or "")[:SEARCH_MAX_TERMS]
+    return " ".join(f"+{word}*" for word in words)
+
+
+# ---------------------- ARCHIVED DATES (READ-ONLY) ----------------------
+# 'python partitions.py archive' removes the raw rows of old months and keeps
+# only their rollup rows. Writing to such a date would recompute its rollup
+# from nothing, so every write first checks the archive watermark: dates
+# before it are read-only. The watermark is cached per process for a short
+# time, since it only moves when an operator archives another month; the
+# cached value only rejects early. The guard is lock_writable(), which every
+# rollup refresh runs inside its write transaction.
+ARCHIVE_WATERMARK_SQL = "SELECT MAX(range_end) AS watermark FROM expense_partition_archive"
+# Shared lock: 'archive' cannot record a new month until the writer commits,
+# and a month recorded before the read is always seen (locking reads see the latest rows)
+ARCHIVE_WATERMARK_LOCK_SQL = ARCHIVE_WATERMARK_SQL + " LOCK IN SHARE MODE"
+ARCHIVE_WATERMARK_TTL = float(os.getenv("EXPENSE_ARCHIVE_WATERMARK_TTL", "60"))
+
+_archive_watermark = {"value": None, "loaded_at": None}
+_archive_watermark_lock = threading.Lock()
+
+
+class ArchivedDateError(ValueError):
+    """Raised when a write targets a date whose raw rows have been archived."""
+
+
+def cached_archive_watermark():
+    """
+    Returns the cached archive watermark if it is still fresh.
+
+    Returns:
+        tuple[bool, datetime.date | None]: (cache hit, watermark).
+    """
+    with _archive_watermark_lock:
+        loaded_at = _archive_watermark["loaded_at"]
+        if loaded_at is not None and time.monotonic() - loaded_at < ARCHIVE_WATERMARK_TTL:
+            return True, _archive_watermark["value"]
+    return False, None
+
+
+def store_archive_watermark(row):
+    """Caches the result row of ARCHIVE_WATERMARK_SQL and returns the watermark."""
+    with _archive_watermark_lock:
+        _archive_watermark["value"] = row['watermark'] if row else None
+        _archive_watermark["loaded_at"] = time.monotonic()
+        return _archive_watermark["value"]
+
+
+def archive_watermark(refresh=False):
+    """
+    Returns the first date that still has raw expense rows stored row by row.
+
+    Args:
+        refresh (bool): If True, bypasses the per-process cache.
+
+    Returns:
+        datetime.date | None: Dates before it are archived; None if nothing is.
+    """
+    if not refresh:
+        hit, watermark = cached_archive_watermark()
+        if hit:
+            return watermark
+
+    with get_db_cursor() as cursor:
+        cursor.execute(ARCHIVE_WATERMARK_SQL)
+        return store_archive_watermark(cursor.fetchone())
+
+
+def raise_if_archived(expense_dates, watermark):
+    """
+    Raises ArchivedDateError if any date lies before 'watermark'.
+
+    Args:
+        expense_dates (iterable): Dates about to be written (str 'YYYY-MM-DD' or date).
+        watermark (datetime.date | None): See archive_watermark().
+    """
+    if watermark is None:
+        return
+    archived = sorted({str(expense_date) for expense_date in expense_dates if str(expense_date) < watermark.isoformat()})
+    if archived:
+        raise ArchivedDateError(f"Expenses before {watermark} are archived and read-only: {', '.join(archived)}")
+
+
+def check_writable(expense_dates):
+    """
+    Rejects writes to archived dates.
+
+    Args:
+        expense_dates (iterable): Dates about to be written (str 'YYYY-MM-DD' or date).
+
+    Raises:
+        ArchivedDateError: If any date lies before the archive watermark.
+    """
+    raise_if_archived(expense_dates, archive_watermark())
+
+
+def lock_writable(cursor, expense_dates):
+    """
+    Re-checks the archive watermark inside a write transaction, with a locking read.
+    The cached check in check_writable() can be up to ARCHIVE_WATERMARK_TTL old, and
+    other processes do not see an archive run at once; without this, a late write
+    would recompute an archived day's rollup from the new row alone. The fresh
+    watermark also refreshes this process's cache.
+
+    Args:
+        cursor: Cursor of the write transaction.
+        expense_dates (iterable): Dates being written.
+
+    Raises:
+        ArchivedDateError: If any date lies before the watermark (the transaction rolls back).
+    """
+    cursor.execute(ARCHIVE_WATERMARK_LOCK_SQL)
+    raise_if_archived(expense_dates, store_archive_watermark(cursor.fetchone()))
 
 
 # ------------------------- CRUD OPERATION: CREATE -------------------------
+@timed_query
 def create_expense(expense_date, amount, category, notes):
     """
     Inserts a new expense record into the 'expenses' table.
@@ -54,18 +664,21 @@ def create_expense(expense_date, amount, category, notes):
         category (str): Category of the expense (e.g., 'Food', 'Travel').
         notes (str): Optional descriptive notes about the expense.
     """
-    logger.info(f"create_expense function called with params {expense_date}, {amount}, {category}, {notes}")
+    logger.info("create_expense function called with params %s, %s, %s, %s", expense_date, amount, category, notes)
+    check_writable([expense_date])
     
     # Use context manager to handle DB connection and auto-commit
     with get_db_cursor(commit=True) as cursor:
         # Execute parameterized INSERT query to avoid SQL injection
-        cursor.execute(
-            "INSERT INTO expenses (expense_date, amount, category, notes) VALUES (%s, %s, %s, %s)",
-            (expense_date, amount, category, notes)
-        )
+        cursor.execute(INSERT_EXPENSE_SQL, (expense_date, amount, category, notes))
+        # Keep the daily rollup and the date version in step with the new row
+        refresh_daily_rollup(cursor, expense_date)
+        index_notes(cursor, [expense_date], append_only=True)
+        bump_date_versions(cursor, [expense_date])
 
 
 # ------------------------- CRUD OPERATION: READ -------------------------
+@timed_query
 def retrieve_expenses_by_date(expense_date):
     """
     Retrieves all expense records for a specific date.
@@ -76,19 +689,48 @@ def retrieve_expenses_by_date(expense_date):
     Returns:
         list[dict]: A list of expense records as dictionaries.
     """
-    logger.info(f"retrieve_expenses_by_date function called with date {expense_date}")
+    logger.info("retrieve_expenses_by_date function called with date %s", expense_date)
     
-    with get_db_cursor() as cursor:
+    with get_db_cursor(readonly=True) as cursor:
         # Execute SELECT query using parameter substitution
-        cursor.execute(
-            "SELECT * FROM expenses WHERE expense_date = %s",
-            (expense_date,)
-        )
+        cursor.execute(SELECT_BY_DATE_SQL, (expense_date,))
         # Return all matching records as a list of dictionaries
         return cursor.fetchall()
 
 
+@timed_query
+def retrieve_expenses_with_version(expense_date):
+    """
+    Reads a date's version and then its rows on one connection (one pool
+    checkout, one cursor) for GET /expenses/{date}. Only the response fields
+    are selected and each response dict is built once, instead of a connector
+    dict per row that the API then projects again. The version is read first:
+    a concurrent write can then only make the rows newer than the version
+    (one extra refetch for the client), never older.
+
+    Args:
+        expense_date (str): Date to fetch expenses for (format: 'YYYY-MM-DD').
+
+    Returns:
+        tuple[int, list[dict]]: The version (0 if never written) and the records
+            with the EXPENSE_ROW_FIELDS keys, fetched as tuple rows when
+            EXPENSE_DB_TUPLE_ROWS is on.
+    """
+    logger.info("retrieve_expenses_with_version function called with date %s", expense_date)
+
+    tuple_rows = PREPARED_CONFIG["tuple_rows"]
+    with get_db_cursor(readonly=True, dictionary=not tuple_rows) as cursor:
+        cursor.execute(DATE_VERSION_SQL, (expense_date,))
+        row = cursor.fetchone()
+        version = int((row[0] if tuple_rows else row['version'])) if row else 0
+        cursor.execute(SELECT_ROWS_BY_DATE_SQL, (expense_date,))
+        if tuple_rows:
+            return version, [dict(zip(EXPENSE_ROW_FIELDS, row)) for row in cursor.fetchall()]
+        return version, [{field: row[field] for field in EXPENSE_ROW_FIELDS} for row in cursor.fetchall()]
+
+
 # ------------------------- CRUD OPERATION: DELETE -------------------------
+@timed_query
 def delete_expenses_by_date(expense_date):
     """
     Deletes all expense records for a specific date.
@@ -96,20 +738,245 @@ def delete_expenses_by_date(expense_date):
     Args:
         expense_date (str): Date of expenses to delete (format: 'YYYY-MM-DD').
     """
-    logger.info(f"delete_expenses_by_date function called with date {expense_date}")
+    logger.info("delete_expenses_by_date function called with date %s", expense_date)
+    check_writable([expense_date])
     
     with get_db_cursor(commit=True) as cursor:
         # Execute DELETE query for the specified date
-        cursor.execute(
-            "DELETE FROM expenses WHERE expense_date = %s",
-            (expense_date,)
-        )
+        cursor.execute(DELETE_BY_DATE_SQL, (expense_date,))
+        refresh_daily_rollup(cursor, expense_date)
+        index_notes(cursor, [expense_date])
+        bump_date_versions(cursor, [expense_date])
+
+
+# ------------------------- BULK OPERATION: REPLACE -------------------------
+@timed_query
+def replace_expenses_for_date(expense_date, expenses):
+    """
+    Replaces every expense record of a date with a new set, atomically.
+    The DELETE and one batched multi-row INSERT run in a single transaction,
+    so readers see either the old day or the new day, never a half-written one.
+
+    Args:
+        expense_date (str): Date whose expenses are replaced (format: 'YYYY-MM-DD').
+        expenses (list[dict]): New records, each with 'amount', 'category' and 'notes'.
+
+    Returns:
+        list[dict]: Budgets the new set pushed over their monthly limit (see crossed_budgets).
+    """
+    logger.info("replace_expenses_for_date function called with date %s and %s rows", expense_date, len(expenses))
+    check_writable([expense_date])
+
+    with get_db_cursor(commit=True) as cursor:
+        # Remove the existing records for the date
+        cursor.execute(DELETE_BY_DATE_SQL, (expense_date,))
+        # Insert the new records; the connector rewrites this into one multi-VALUES INSERT
+        if expenses:
+            cursor.executemany(
+                INSERT_EXPENSE_SQL,
+                [
+                    (expense_date, expense['amount'], expense['category'], expense['notes'])
+                    for expense in expenses
+                ]
+            )
+        # Recompute the day's rollup rows (and month totals) and bump its version in the same transaction
+        alerts = refresh_daily_rollup(cursor, expense_date)
+        index_notes(cursor, [expense_date])
+        bump_date_versions(cursor, [expense_date])
+    return alerts
+
+
+# ------------------------- ROW-LEVEL OPERATION: PATCH -------------------------
+# Columns an update may change, in the order they appear in generated UPDATEs
+UPDATABLE_FIELDS = ("amount", "category", "notes")
+# Only these columns feed the daily rollup; a notes-only edit leaves it untouched
+ROLLUP_FIELDS = {"amount", "category"}
+
+
+def expense_lock_sql(count):
+    """SELECT ... FOR UPDATE of 'count' ids on one date (parameters: date, then the ids)."""
+    placeholders = ", ".join(["%s"] * count)
+    return f"SELECT id FROM expenses WHERE expense_date = %s AND id IN ({placeholders}) FOR UPDATE"
+
+
+def expense_delete_sql(count):
+    """DELETE of 'count' ids on one date (parameters: date, then the ids)."""
+    placeholders = ", ".join(["%s"] * count)
+    return f"DELETE FROM expenses WHERE expense_date = %s AND id IN ({placeholders})"
+
+
+def expense_update_sql(fields):
+    """UPDATE of the given columns of one row (parameters: the values, then id and date)."""
+    assignments = ", ".join(f"{field} = %s" for field in fields)
+    return f"UPDATE expenses SET {assignments} WHERE id = %s AND expense_date = %s"
+
+
+@timed_query
+def apply_expense_changes(expense_date, inserts=(), updates=(), deletes=(), budget_alerts=None):
+    """
+    Applies row-level changes to one date in a single transaction, so the cost
+    of a save is proportional to what changed instead of a full rewrite of the day.
+    Existing rows keep their ids; only the listed rows are touched.
+
+    Args:
+        expense_date (str): Date the rows belong to (format: 'YYYY-MM-DD').
+        inserts (list[dict]): New records, each with 'amount', 'category' and 'notes'.
+        updates (list[dict]): Records with an 'id' plus the fields to change
+            (any of 'amount', 'category', 'notes'); missing fields are kept.
+        deletes (list[int]): Ids of the records to delete.
+        budget_alerts (list): Optional list that receives the budgets the change
+            pushed over their monthly limit (see crossed_budgets).
+
+    Returns:
+        list[dict]: The date's expense records after the change.
+
+    Raises:
+        ValueError: If an id is listed more than once across updates and deletes.
+        LookupError: If an updated or deleted id does not exist on 'expense_date'.
+        ArchivedDateError: If 'expense_date' has been archived.
+    """
+    logger.info(
+        "apply_expense_changes function called with date %s (%s inserts, %s updates, %s deletes)",
+        expense_date, len(inserts), len(updates), len(deletes)
+    )
+
+    check_writable([expense_date])
+    ids = [update['id'] for update in updates] + list(deletes)
+    if len(ids) != len(set(ids)):
+        raise ValueError("Each expense id may be updated or deleted only once per request")
+
+    with get_db_cursor(commit=True) as cursor:
+        if ids:
+            # Lock the targeted rows and make sure they belong to this date
+            cursor.execute(expense_lock_sql(len(ids)), [expense_date, *ids])
+            missing = set(ids) - {row['id'] for row in cursor.fetchall()}
+            if missing:
+                raise LookupError(f"Expense ids not found on {expense_date}: {sorted(missing)}")
+
+        if deletes:
+            cursor.execute(expense_delete_sql(len(deletes)), [expense_date, *deletes])
+
+        # Group updates by the set of columns they change: one statement shape per group
+        groups = {}
+        for update in updates:
+            fields = tuple(field for field in UPDATABLE_FIELDS if field in update)
+            if fields:
+                groups.setdefault(fields, []).append(
+                    tuple(update[field] for field in fields) + (update['id'], expense_date)
+                )
+        for fields, params in groups.items():
+            cursor.executemany(expense_update_sql(fields), params)
+
+        if inserts:
+            cursor.executemany(
+                INSERT_EXPENSE_SQL,
+                [(expense_date, expense['amount'], expense['category'], expense['notes']) for expense in inserts]
+            )
+
+        # Derived data follows the write in the same transaction
+        if inserts or deletes or any(ROLLUP_FIELDS.intersection(fields) for fields in groups):
+            alerts = refresh_daily_rollup(cursor, expense_date)
+            if budget_alerts is not None:
+                budget_alerts.extend(alerts)
+        if inserts or deletes or groups:
+            # The search index copies amount and category too, so any change re-indexes
+            index_notes(cursor, [expense_date])
+            bump_date_versions(cursor, [expense_date])
+
+        cursor.execute(SELECT_BY_DATE_SQL, (expense_date,))
+        return cursor.fetchall()
+
+
+# ------------------------- BULK OPERATION: APPEND -------------------------
+@timed_query
+def insert_expenses_batch(rows):
+    """
+    Appends many expense records in one transaction with a single batched INSERT,
+    then refreshes the daily rollup of every touched date once.
+
+    Args:
+        rows (list[tuple]): (expense_date, amount, category, notes) tuples.
+
+    Returns:
+        set: The distinct dates that were written.
+    """
+    logger.info("insert_expenses_batch function called with %s rows", len(rows))
+
+    dates = {row[0] for row in rows}
+    if not rows:
+        return dates
+    check_writable(dates)
+
+    with get_db_cursor(commit=True) as cursor:
+        # The connector rewrites this into multi-row INSERT ... VALUES statements
+        cursor.executemany(INSERT_EXPENSE_SQL, rows)
+        refresh_daily_rollups(cursor, dates)
+        index_notes(cursor, dates, append_only=True)
+        bump_date_versions(cursor, dates)
+    return dates
+
+
+# ------------------------- STREAMING READ: RANGE EXPORT -------------------------
+def stream_expenses_between(start_date, end_date, batch_size=1000):
+    """
+    Yields every expense record in a date range without loading them all at once.
+    Uses an unbuffered (server-side) cursor and fetches 'batch_size' rows at a
+    time, so memory stays flat regardless of the size of the range. The pooled
+    connection is held until the generator is exhausted or closed.
+
+    Args:
+        start_date (str): Start date of the range (format: 'YYYY-MM-DD').
+        end_date (str): End date of the range (format: 'YYYY-MM-DD').
+        batch_size (int): Number of rows fetched from the server per round trip.
+
+    Yields:
+        dict: One expense record (id, expense_date, amount, category, notes).
+    """
+    logger.info("stream_expenses_between function called between dates %s - %s", start_date, end_date)
+
+    with get_db_cursor(readonly=True) as cursor:
+        cursor.execute(EXPORT_RANGE_SQL, (start_date, end_date))
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            yield from rows
+
+
+AMOUNTS_RANGE_SQL = "SELECT category, amount FROM expenses WHERE expense_date BETWEEN %s AND %s"
+
+
+def stream_amounts_between(start_date, end_date, batch_size=5000):
+    """
+    Yields (category, amount) pairs of a date range through an unbuffered cursor,
+    for single-pass statistics (see streaming_stats.py). Only the two needed
+    columns are sent and no order is imposed, so the server never sorts.
+
+    Args:
+        start_date (str): Start date of the range (format: 'YYYY-MM-DD').
+        end_date (str): End date of the range (format: 'YYYY-MM-DD').
+        batch_size (int): Number of rows fetched from the server per round trip.
+
+    Yields:
+        tuple: (category, amount).
+    """
+    with get_db_cursor(readonly=True) as cursor:
+        cursor.execute(AMOUNTS_RANGE_SQL, (start_date, end_date))
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            for row in rows:
+                yield row['category'], row['amount']
 
 
 # ---------------------- AGGREGATE QUERY: SUMMARY ----------------------
+@timed_query
 def fetch_expense_summary(start_date, end_date):
     """
     Retrieves the sum of expenses grouped by category within a date range.
+    Reads the pre-aggregated daily rollup, so the cost depends on the number
+    of days in the range rather than the number of expense rows.
     
     Args:
         start_date (str): Start date of the range (format: 'YYYY-MM-DD').
@@ -118,18 +985,296 @@ def fetch_expense_summary(start_date, end_date):
     Returns:
         list[dict]: Each record contains a category and its total sum of expenses.
     """
-    logger.info(f"fetch_expense_summary function called between dates {start_date} - {end_date}")
+    logger.info("fetch_expense_summary function called between dates %s - %s", start_date, end_date)
     
-    with get_db_cursor() as cursor:
+    with get_db_cursor(readonly=True) as cursor:
         # Execute a grouped SELECT query to get total expenses per category
-        cursor.execute(
-            "SELECT category, sum(amount) FROM expenses WHERE expense_date BETWEEN %s AND %s GROUP BY category;",
-            (start_date, end_date)
-        )
+        cursor.execute(SUMMARY_SQL, (start_date, end_date))
         # Return aggregated results as a list of dictionaries
         return cursor.fetchall()
 
 
+# ---------------------- VERSION QUERIES: ETAGS ----------------------
+@timed_query
+def fetch_date_version(expense_date):
+    """
+    Returns the current version of a date (one primary-key lookup).
+
+    Args:
+        expense_date (str): Date to look up (format: 'YYYY-MM-DD').
+
+    Returns:
+        int: The version, or 0 if the date has never been written.
+    """
+    with get_db_cursor(readonly=True) as cursor:
+        cursor.execute(DATE_VERSION_SQL, (expense_date,))
+        row = cursor.fetchone()
+    return int(row['version']) if row else 0
+
+
+@timed_query
+def fetch_range_version(start_date, end_date):
+    """
+    Returns a fingerprint of every date version within a range. Versions only
+    grow, so the pair changes whenever any date in the range is written.
+
+    Args:
+        start_date (str): Start date of the range (format: 'YYYY-MM-DD').
+        end_date (str): End date of the range (format: 'YYYY-MM-DD').
+
+    Returns:
+        tuple[int, int]: (number of written dates, sum of their versions).
+    """
+    with get_db_cursor(readonly=True) as cursor:
+        cursor.execute(RANGE_VERSION_SQL, (start_date, end_date))
+        row = cursor.fetchone()
+    return int(row['dates']), int(row['version'])
+
+
+# ---------------------- AGGREGATE QUERY: TRENDS ----------------------
+def trends_sql(granularity):
+    """The grouped trend query of one granularity (parameters: start and end date)."""
+    return (
+        f"SELECT {TREND_PERIOD_SQL[granularity]} AS period, category, SUM(total_amount) AS total "
+        "FROM expense_daily_rollup WHERE expense_date BETWEEN %s AND %s "
+        "GROUP BY period, category ORDER BY period"
+    )
+
+
+@timed_query
+def fetch_expense_trends(start_date, end_date, granularity="month"):
+    """
+    Retrieves per-period, per-category totals within a date range in one grouped query.
+
+    Args:
+        start_date (str): Start date of the range (format: 'YYYY-MM-DD').
+        end_date (str): End date of the range (format: 'YYYY-MM-DD').
+        granularity (str): 'day', 'week' (starting Monday) or 'month'.
+
+    Returns:
+        list[dict]: Rows with 'period' (first day of the period), 'category' and 'total'.
+
+    Raises:
+        ValueError: If 'granularity' is not supported.
+    """
+    logger.info("fetch_expense_trends function called between dates %s - %s by %s", start_date, end_date, granularity)
+
+    if granularity not in TREND_PERIOD_SQL:
+        raise ValueError(f"Unsupported granularity: {granularity}")
+
+    with get_db_cursor(readonly=True) as cursor:
+        cursor.execute(trends_sql(granularity), (start_date, end_date))
+        return cursor.fetchall()
+
+
+# ---------------------- BUDGETS ----------------------
+@timed_query
+def set_category_budget(category, monthly_limit):
+    """
+    Creates or changes the monthly budget of a category.
+
+    Args:
+        category (str): Expense category.
+        monthly_limit (float): Spending limit per calendar month.
+    """
+    logger.info("set_category_budget function called with %s, %s", category, monthly_limit)
+    with get_db_cursor(commit=True) as cursor:
+        cursor.execute(BUDGET_UPSERT_SQL, (category, monthly_limit))
+
+
+@timed_query
+def delete_category_budget(category):
+    """
+    Removes the budget of a category.
+
+    Args:
+        category (str): Expense category.
+
+    Returns:
+        bool: False if the category had no budget.
+    """
+    logger.info("delete_category_budget function called with %s", category)
+    with get_db_cursor(commit=True) as cursor:
+        cursor.execute(BUDGET_DELETE_SQL, (category,))
+        return cursor.rowcount > 0
+
+
+@timed_query
+def fetch_budget_status(month):
+    """
+    Returns every budget with the month-to-date total of its category.
+    One primary-key lookup per budget, whatever the number of expenses.
+
+    Args:
+        month (date): First day of the month.
+
+    Returns:
+        list[dict]: 'category', 'monthly_limit', 'total' and 'expense_count', by category.
+    """
+    with get_db_cursor(readonly=True) as cursor:
+        cursor.execute(BUDGET_STATUS_SQL, (month,))
+        return cursor.fetchall()
+
+
+# ------------------------- SEARCH: EXPENSE NOTES -------------------------
+# Every query is answered by the FULLTEXT index of 'expense_notes_fts'; the
+# date range and category only narrow the matches. One statement shape for
+# all filter combinations: open bounds default to the whole calendar.
+NOTES_SEARCH_FILTER_SQL = (
+    f"MATCH(notes) AGAINST (%s {SEARCH_MODE_SQL}) "
+    "AND expense_date BETWEEN %s AND %s AND (%s IS NULL OR category = %s)"
+)
+NOTES_SEARCH_SQL = (
+    f"SELECT id, expense_date, category, amount, notes, MATCH(notes) AGAINST (%s {SEARCH_MODE_SQL}) AS score "
+    f"FROM expense_notes_fts WHERE {NOTES_SEARCH_FILTER_SQL} "
+    "ORDER BY score DESC, expense_date DESC, id DESC LIMIT %s OFFSET %s"
+)
+NOTES_SEARCH_TOTALS_SQL = (
+    "SELECT COUNT(*) AS total_matches, COALESCE(SUM(amount), 0) AS total_amount "
+    f"FROM expense_notes_fts WHERE {NOTES_SEARCH_FILTER_SQL}"
+)
+
+
+@timed_query
+def search_expense_notes(text, start_date=None, end_date=None, category=None, limit=20, offset=0):
+    """
+    Full-text search over expense notes, best matches first. Also answers
+    "how much did I spend at X": the totals cover every match, not only the page.
+
+    Args:
+        text (str): Words to look for; each must appear (as a word or word prefix).
+        start_date (str): Optional first date of the range (format: 'YYYY-MM-DD').
+        end_date (str): Optional last date of the range (format: 'YYYY-MM-DD').
+        category (str): Optional category the matches must belong to.
+        limit (int): Maximum number of results returned.
+        offset (int): Number of ranked results to skip (pagination).
+
+    Returns:
+        dict: 'query', 'total_matches', 'total_amount', 'limit', 'offset' and
+            'results' (expense records with their relevance 'score').
+
+    Raises:
+        ValueError: If 'text' contains no searchable word.
+    """
+    logger.info("search_expense_notes function called with %r (%s to %s, category %s)", text, start_date, end_date, category)
+
+    query = build_fulltext_query(text)
+    if not query:
+        raise ValueError("Search text must contain at least one letter or digit")
+    filters = (query, start_date or "1000-01-01", end_date or "9999-12-31", category, category)
+
+    with get_db_cursor(readonly=True) as cursor:
+        cursor.execute(NOTES_SEARCH_TOTALS_SQL, filters)
+        totals = cursor.fetchone()
+        results = []
+        if totals['total_matches'] > offset:
+            cursor.execute(NOTES_SEARCH_SQL, (query, *filters, limit, offset))
+            results = cursor.fetchall()
+
+    return {
+        "query": query,
+        "total_matches": totals['total_matches'],
+        "total_amount": totals['total_amount'],
+        "limit": limit,
+        "offset": offset,
+        "results": results,
+    }
+
+
+# ---------------------- SNAPSHOT SOURCES: COLUMNAR ANALYTICS ----------------------
+# snapshot.py copies 'expense_daily_rollup' into monthly Parquet files and only
+# asks MySQL about the dates written since (their 'updated_at' in
+# 'expense_date_versions' is newer than the snapshot). These reads stay on the
+# primary: the snapshot time comes from its clock.
+DB_TIME_SQL = "SELECT NOW(3) AS now"
+CHANGED_DATES_SQL = (
+    "SELECT expense_date FROM expense_date_versions "
+    "WHERE expense_date BETWEEN %s AND %s AND updated_at > %s ORDER BY expense_date"
+)
+ROLLUP_RANGE_SQL = (
+    "SELECT expense_date, category, total_amount, expense_count FROM expense_daily_rollup "
+    "WHERE expense_date BETWEEN %s AND %s ORDER BY expense_date, category"
+)
+
+
+def fetch_db_time():
+    """
+    Returns the current time of the primary, the reference clock of 'updated_at'.
+
+    Returns:
+        datetime.datetime: NOW(3) on the primary.
+    """
+    with get_db_cursor() as cursor:
+        cursor.execute(DB_TIME_SQL)
+        return cursor.fetchone()['now']
+
+
+@timed_query
+def fetch_changed_dates(since, start_date="1000-01-01", end_date="9999-12-31"):
+    """
+    Lists the dates of a range written after a point in time.
+
+    Args:
+        since (datetime): Dates with 'updated_at' after this are returned.
+        start_date (str): Start of the range (format: 'YYYY-MM-DD').
+        end_date (str): End of the range (format: 'YYYY-MM-DD').
+
+    Returns:
+        list[date]: The changed dates, in order.
+    """
+    with get_db_cursor() as cursor:
+        cursor.execute(CHANGED_DATES_SQL, (start_date, end_date, since))
+        return [row['expense_date'] for row in cursor.fetchall()]
+
+
+def stream_rollup_between(start_date, end_date, batch_size=5000):
+    """
+    Yields the rollup rows of a date range through an unbuffered cursor.
+
+    Args:
+        start_date (str): Start of the range (format: 'YYYY-MM-DD').
+        end_date (str): End of the range (format: 'YYYY-MM-DD').
+        batch_size (int): Rows fetched from the server per round trip.
+
+    Yields:
+        dict: expense_date, category, total_amount and expense_count, in date order.
+    """
+    with get_db_cursor() as cursor:
+        cursor.execute(ROLLUP_RANGE_SQL, (start_date, end_date))
+        while True:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            yield from rows
+
+
+@timed_query
+def fetch_rollup_for_dates(expense_dates, chunk_size=1000):
+    """
+    Returns the rollup rows of specific dates (the live delta of a snapshot query).
+
+    Args:
+        expense_dates (iterable): Dates to read.
+        chunk_size (int): Dates per IN (...) list.
+
+    Returns:
+        list[dict]: expense_date, category, total_amount and expense_count.
+    """
+    expense_dates = sorted(set(expense_dates))
+    rows = []
+    with get_db_cursor() as cursor:
+        for offset in range(0, len(expense_dates), chunk_size):
+            chunk = expense_dates[offset:offset + chunk_size]
+            placeholders = ", ".join(["%s"] * len(chunk))
+            cursor.execute(
+                "SELECT expense_date, category, total_amount, expense_count FROM expense_daily_rollup "
+                f"WHERE expense_date IN ({placeholders})",
+                chunk
+            )
+            rows.extend(cursor.fetchall())
+    return rows
+
+
 # ---------------------- MAIN BLOCK: MODULE TESTING ----------------------
 if __name__ == "__main__":
     """
@@ -0,0 +1,260 @@
+# Import necessary modules
+import threading                       # Locks/conditions to make the pool safe across FastAPI worker threads
+import time                            # Monotonic clock for idle tracking and checkout latency
+from collections import deque          # Double-ended queue holding idle connections (LIFO reuse)
+import mysql.connector                 # MySQL database connector for Python
+
+
+class PoolTimeoutError(Exception):
+    """
+    Raised when no connection could be checked out of the pool within 'timeout' seconds.
+    """
+
+
+class PooledConnection:
+    """
+    Thin wrapper around a raw MySQL connection that remembers pool bookkeeping.
+
+    Attributes:
+        connection: The underlying mysql.connector connection object.
+        created_at (float): Monotonic timestamp when the connection was opened.
+        last_used (float): Monotonic timestamp when the connection was last returned to the pool.
+        overflow (bool): True if this connection was opened above 'pool_size'.
+        statements: Prepared statements of this connection (see prepared_statements.py),
+            created by db_helper on first use.
+    """
+
+    def __init__(self, connection, overflow=False):
+        self.connection = connection
+        self.created_at = time.monotonic()
+        self.last_used  = self.created_at
+        self.overflow   = overflow
+        self.statements = None
+
+
+class ConnectionPool:
+    """
+    A small thread-safe MySQL connection pool shared by all db_helper CRUD functions.
+
+    Behaviour:
+        - Keeps up to 'pool_size' idle connections open for reuse.
+        - Opens up to 'max_overflow' extra connections during bursts; these are closed on release.
+        - Callers block for at most 'timeout' seconds when every connection is in use.
+        - Idle connections older than 'idle_timeout' seconds are closed instead of reused.
+        - Connections older than 'recycle' seconds are replaced to avoid server-side wait_timeout.
+        - With 'pre_ping' enabled, a connection is pinged on checkout and transparently
+          reopened if the server has dropped it.
+
+    Args:
+        connect_kwargs (dict): Keyword arguments forwarded to mysql.connector.connect().
+        pool_size (int): Number of connections kept open while idle.
+        max_overflow (int): Extra connections allowed above 'pool_size' under load.
+        timeout (float): Seconds to wait for a free connection before raising PoolTimeoutError.
+        idle_timeout (float): Seconds a connection may sit idle before it is discarded.
+        recycle (float): Maximum lifetime of a connection in seconds (0 disables recycling).
+        pre_ping (bool): If True, ping each connection before handing it out.
+    """
+
+    def __init__(self, connect_kwargs, pool_size=5, max_overflow=10, timeout=30.0,
+                 idle_timeout=300.0, recycle=3600.0, pre_ping=True):
+        self._connect_kwargs = dict(connect_kwargs)
+        self.pool_size    = pool_size
+        self.max_overflow = max_overflow
+        self.timeout      = timeout
+        self.idle_timeout = idle_timeout
+        self.recycle      = recycle
+        self.pre_ping     = pre_ping
+
+        # Idle connections; the most recently used one is reused first so
+        # rarely used connections age out through 'idle_timeout'
+        self._idle = deque()
+        self._lock = threading.Lock()
+        self._available = threading.Condition(self._lock)
+
+        # Bookkeeping used by stats()
+        self._open     = 0   # Connections currently open (idle + in use)
+        self._in_use   = 0   # Connections currently checked out
+        self._waiting  = 0   # Threads currently blocked waiting for a connection
+        self._closed   = False  # Set by close_all(): released connections are closed, not kept
+        self._counters = {
+            "checkouts": 0,
+            "timeouts": 0,
+            "connections_created": 0,
+            "connections_discarded": 0,
+            "reconnects": 0,
+        }
+        self._checkout_time_total = 0.0
+        self._checkout_time_max   = 0.0
+
+    # ------------------------- CONNECTION LIFECYCLE -------------------------
+    def _connect(self):
+        """Opens a fresh connection in autocommit mode (writes use explicit transactions)."""
+        connection = mysql.connector.connect(**self._connect_kwargs)
+        connection.autocommit = True
+        return connection
+
+    def _close_quietly(self, connection):
+        """Closes a raw connection, ignoring errors from already-dead sockets."""
+        try:
+            connection.close()
+        except Exception:
+            pass
+
+    def _is_stale(self, pooled, now):
+        """Returns True if an idle connection has exceeded its idle or lifetime limits."""
+        if self.idle_timeout and now - pooled.last_used > self.idle_timeout:
+            return True
+        if self.recycle and now - pooled.created_at > self.recycle:
+            return True
+        return False
+
+    # ------------------------- CHECKOUT / RELEASE -------------------------
+    def acquire(self):
+        """
+        Checks a connection out of the pool, opening a new one if allowed.
+
+        Returns:
+            PooledConnection: A healthy connection reserved for the caller.
+
+        Raises:
+            PoolTimeoutError: If no connection became available within 'timeout' seconds.
+        """
+        started  = time.monotonic()
+        deadline = started + self.timeout
+        stale    = []
+        pooled   = None
+        create   = False
+
+        with self._available:
+            while True:
+                # Reuse an idle connection, dropping any that went stale while parked
+                now = time.monotonic()
+                while self._idle:
+                    candidate = self._idle.pop()
+                    if self._is_stale(candidate, now):
+                        stale.append(candidate)
+                        self._open -= 1
+                        continue
+                    pooled = candidate
+                    break
+                if pooled is not None:
+                    break
+
+                # Otherwise open a new connection if we are under the hard cap
+                if self._open < self.pool_size + self.max_overflow:
+                    create = True
+                    self._open += 1
+                    break
+
+                # Every connection is busy: wait for a release or give up
+                remaining = deadline - now
+                if remaining <= 0:
+                    self._counters["timeouts"] += 1
+                    raise PoolTimeoutError(
+                        f"Timed out after {self.timeout}s waiting for a database connection"
+                    )
+                self._waiting += 1
+                try:
+                    self._available.wait(remaining)
+                finally:
+                    self._waiting -= 1
+
+            overflow = self._open > self.pool_size
+            self._in_use += 1
+
+        # Network I/O happens outside the lock so other threads are not blocked by it
+        for old in stale:
+            self._close_quietly(old.connection)
+        if stale:
+            self._count("connections_discarded", len(stale))
+
+        try:
+            if create:
+                pooled = PooledConnection(self._connect(), overflow=overflow)
+                self._count("connections_created")
+            elif self.pre_ping and not self._ping(pooled):
+                self._close_quietly(pooled.connection)
+                pooled = PooledConnection(self._connect(), overflow=pooled.overflow)
+                self._count("reconnects")
+        except Exception:
+            # Give the reserved slot back so a failed connect does not leak capacity
+            with self._available:
+                self._open   -= 1
+                self._in_use -= 1
+                self._available.notify()
+            raise
+
+        elapsed = time.monotonic() - started
+        with self._lock:
+            self._counters["checkouts"] += 1
+            self._checkout_time_total += elapsed
+            self._checkout_time_max = max(self._checkout_time_max, elapsed)
+        return pooled
+
+    def release(self, pooled, discard=False):
+        """
+        Returns a connection to the pool.
+
+        Args:
+            pooled (PooledConnection): The connection previously returned by acquire().
+            discard (bool): If True, close the connection instead of keeping it (e.g. after an error).
+        """
+        close = discard
+        with self._available:
+            self._in_use -= 1
+            if not close and (self._closed or pooled.overflow or len(self._idle) >= self.pool_size):
+                close = True
+            if close:
+                self._open -= 1
+                self._counters["connections_discarded"] += 1
+            else:
+                pooled.last_used = time.monotonic()
+                self._idle.append(pooled)
+            self._available.notify()
+
+        if close:
+            self._close_quietly(pooled.connection)
+
+    def _ping(self, pooled):
+        """Returns True if the server still answers on this connection."""
+        try:
+            pooled.connection.ping(reconnect=False)
+            return True
+        except Exception:
+            return False
+
+    def _count(self, name, amount=1):
+        with self._lock:
+            self._counters[name] += amount
+
+    # ------------------------- INTROSPECTION / SHUTDOWN -------------------------
+    def stats(self):
+        """
+        Returns a snapshot of pool usage counters.
+
+        Returns:
+            dict: Open/idle/in-use/waiting connection counts, lifetime counters and
+                  checkout latency (average and maximum, in milliseconds).
+        """
+        with self._lock:
+            checkouts = self._counters["checkouts"]
+            return {
+                "pool_size": self.pool_size,
+                "max_overflow": self.max_overflow,
+                "open": self._open,
+                "idle": len(self._idle),
+                "in_use": self._in_use,
+                "waiting": self._waiting,
+                **self._counters,
+                "checkout_ms_avg": (1000 * self._checkout_time_total / checkouts) if checkouts else 0.0,
+                "checkout_ms_max": 1000 * self._checkout_time_max,
+            }
+
+    def close_all(self):
+        """Closes every idle connection (in-use connections are closed when released)."""
+        with self._available:
+            self._closed = True
+            idle, self._idle = list(self._idle), deque()
+            self._open -= len(idle)
+        for pooled in idle:
+            self._close_quietly(pooled.connection)
@@ -0,0 +1,218 @@
+# Import necessary modules
+import contextvars                     # Carries the client id and chosen replica through a request
+import itertools                       # Round-robin replica counter
+import os                              # Reads the routing settings from environment variables
+import random                          # 'random' read policy
+import threading                       # Guards the pin table and counters across worker threads
+import time                            # Monotonic clock for the read-your-writes window
+from collections import OrderedDict    # Bounded, oldest-first table of pinned clients
+from contextlib import contextmanager  # Route scopes for scripts and tests
+from starlette.datastructures import Headers  # Reads the client id header in the middleware
+
+# -------------------------------------------------------------------------
+# Read/write splitting.
+#
+# Writes always go to the primary. Reads marked 'readonly' in db_helper go to
+# one of the replicas listed in EXPENSE_DB_REPLICA_HOSTS, chosen by a policy
+# ('round_robin' or 'random'; 'primary' turns splitting off). Two rules keep
+# replica reads safe:
+#
+#   - Read-your-writes: after a client writes, its reads go to the primary for
+#     EXPENSE_DB_PIN_SECONDS, longer than the replicas are expected to lag.
+#     Clients are identified by the X-Client-Id header (or their address).
+#   - One replica per request: every read of a request uses the same replica,
+#     so e.g. an ETag version and the rows it describes come from one server.
+# -------------------------------------------------------------------------
+
+
+def parse_hosts(value, default_port=3306):
+    """
+    Parses a comma-separated host list.
+
+    Args:
+        value (str): e.g. 'replica1, replica2:3307'.
+        default_port (int): Port used when an entry has none.
+
+    Returns:
+        list[tuple[str, int]]: (host, port) pairs.
+    """
+    hosts = []
+    for entry in (value or "").split(","):
+        entry = entry.strip()
+        if not entry:
+            continue
+        host, _, port = entry.partition(":")
+        hosts.append((host, int(port) if port else default_port))
+    return hosts
+
+
+ROUTING_CONFIG = {
+    "replica_hosts":      parse_hosts(os.getenv("EXPENSE_DB_REPLICA_HOSTS", ""),
+                                      int(os.getenv("EXPENSE_DB_PORT", "3306"))),
+    "policy":             os.getenv("EXPENSE_DB_READ_POLICY", "round_robin"),   # round_robin | random | primary
+    "pin_seconds":        float(os.getenv("EXPENSE_DB_PIN_SECONDS", "5")),      # Read-your-writes window
+    "max_pinned_clients": int(os.getenv("EXPENSE_DB_MAX_PINNED_CLIENTS", "10000")),
+}
+
+READ_POLICIES = ("round_robin", "random", "primary")
+
+# Routing state of the current request: {"client": id, "replica": index or None}.
+# Unset outside requests (scripts), where every caller counts as one client.
+CURRENT_ROUTE = contextvars.ContextVar("expense_db_route", default=None)
+
+
+class ReadRouter:
+    """
+    Decides whether a read goes to the primary or to a replica.
+
+    Args:
+        replica_count (int): Number of configured replicas (0 disables splitting).
+        policy (str): 'round_robin', 'random' or 'primary'.
+        pin_seconds (float): How long a client's reads stay on the primary after it writes.
+        max_pinned_clients (int): Bound on the pin table (oldest entries are dropped first).
+        clock (callable): Monotonic clock; injectable for tests.
+    """
+
+    def __init__(self, replica_count=0, policy="round_robin", pin_seconds=5.0,
+                 max_pinned_clients=10000, clock=time.monotonic):
+        if policy not in READ_POLICIES:
+            raise ValueError(f"Unsupported read policy: {policy}")
+        self.replica_count = replica_count
+        self.policy = policy
+        self.pin_seconds = pin_seconds
+        self.max_pinned_clients = max_pinned_clients
+        self.clock = clock
+        self._pins = OrderedDict()          # client -> time of its last write
+        self._last_write = None             # Time of the last write by any client
+        self._counter = itertools.count()
+        self._lock = threading.Lock()
+        self._stats = {"primary_reads": 0, "replica_reads": 0, "pinned_reads": 0, "replica_fallbacks": 0}
+
+    @staticmethod
+    def _client():
+        route = CURRENT_ROUTE.get()
+        return route["client"] if route is not None else None
+
+    def note_write(self):
+        """Pins the current client to the primary for 'pin_seconds'."""
+        if not self.replica_count or self.pin_seconds <= 0:
+            return
+        client = self._client()
+        with self._lock:
+            self._last_write = self.clock()
+            self._pins[client] = self._last_write
+            self._pins.move_to_end(client)
+            while len(self._pins) > self.max_pinned_clients:
+                self._pins.popitem(last=False)
+
+    def is_pinned(self, client):
+        """True if 'client' wrote within the last 'pin_seconds'."""
+        with self._lock:
+            written_at = self._pins.get(client)
+            if written_at is None:
+                return False
+            if self.clock() - written_at < self.pin_seconds:
+                return True
+            del self._pins[client]
+            return False
+
+    def choose_replica(self):
+        """
+        Picks the server for the next read of the current request.
+
+        Returns:
+            int | None: Index of the replica to read from, or None for the primary.
+        """
+        if not self.replica_count or self.policy == "primary":
+            self._count("primary_reads")
+            return None
+
+        route = CURRENT_ROUTE.get()
+        client = route["client"] if route is not None else None
+        if self.is_pinned(client):
+            self._count("pinned_reads")
+            return None
+
+        if route is not None and route.get("replica") is not None:
+            replica = route["replica"]
+        else:
+            if self.policy == "random":
+                replica = random.randrange(self.replica_count)
+            else:
+                replica = next(self._counter) % self.replica_count
+            if route is not None:
+                route["replica"] = replica
+        self._count("replica_reads")
+        return replica
+
+    def cache_safe(self):
+        """
+        Whether results read in the current request may be stored in a shared cache.
+        A replica read shortly after a write may predate that write, so it is only
+        served, not cached, until the pin window has passed.
+
+        Returns:
+            bool: False if this request read from a replica within 'pin_seconds' of a write.
+        """
+        route = CURRENT_ROUTE.get()
+        if route is None or route.get("replica") is None:
+            return True
+        with self._lock:
+            return self._last_write is None or self.clock() - self._last_write >= self.pin_seconds
+
+    def note_fallback(self):
+        """Counts a replica read that went to the primary because the replica was unavailable."""
+        self._count("replica_fallbacks")
+
+    def _count(self, key):
+        with self._lock:
+            self._stats[key] += 1
+
+    def stats(self):
+        """
+        Returns routing counters.
+
+        Returns:
+            dict: Replica count, reads per destination, fallbacks and pinned clients.
+        """
+        with self._lock:
+            return {"replicas": self.replica_count, **self._stats, "pinned_clients": len(self._pins)}
+
+
+@contextmanager
+def route_scope(client=None):
+    """
+    Routes the reads of a block like one request of 'client' (scripts and tests).
+
+    Args:
+        client (str): Client identity used for read-your-writes pinning.
+    """
+    token = CURRENT_ROUTE.set({"client": client, "replica": None})
+    try:
+        yield
+    finally:
+        CURRENT_ROUTE.reset(token)
+
+
+class ReadRoutingMiddleware:
+    """
+    Pure ASGI middleware that opens a route scope per HTTP request, identifying
+    the client by its X-Client-Id header (falling back to its address).
+
+    Args:
+        app: The wrapped ASGI application.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        client = Headers(scope=scope).get("x-client-id")
+        if not client and scope.get("client"):
+            client = scope["client"][0]
+        with route_scope(client):
+            await self.app(scope, receive, send)
@@ -0,0 +1,157 @@
+# Import necessary modules
+import json                                  # Fallback encoder when orjson is not installed
+import os                                    # Reads the response settings from environment variables
+from datetime import date, datetime          # Values the encoder must handle (DB rows)
+from decimal import Decimal                  # DECIMAL columns / SUM() results from MySQL
+from fastapi.responses import JSONResponse   # Base class of the fast response
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.middleware.gzip import GZipResponder, IdentityResponder  # Streaming-aware compression responders
+
+# Optional accelerators: fall back to the standard library when missing
+try:
+    import orjson                            # Rust JSON encoder, several times faster than json.dumps
+except ImportError:                          # pragma: no cover - depends on the environment
+    orjson = None
+try:
+    import brotli                            # 'br' content encoding
+except ImportError:                          # pragma: no cover - depends on the environment
+    brotli = None
+
+# -------------------------------------------------------------------------
+# Fast response path.
+#
+# Rows that come straight from the DB are already well-formed, so the hot
+# endpoints return FastJSONResponse directly: no response_model re-validation
+# and no jsonable_encoder pass, just one orjson call. CompressionMiddleware
+# then negotiates brotli or gzip for bodies above a size threshold.
+# -------------------------------------------------------------------------
+
+RESPONSE_CONFIG = {
+    "fast":            os.getenv("EXPENSE_FAST_RESPONSES", "1") not in ("0", "false", "no"),
+    "minimum_size":    int(os.getenv("EXPENSE_COMPRESSION_MIN_BYTES", "1024")),
+    "gzip_level":      int(os.getenv("EXPENSE_GZIP_LEVEL", "6")),
+    "brotli_quality":  int(os.getenv("EXPENSE_BROTLI_QUALITY", "4")),
+}
+
+
+def _default(value):
+    """Encodes the non-JSON types found in DB rows (Decimal sums, dates)."""
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, (date, datetime)):
+        return value.isoformat()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(content):
+    """
+    Serializes 'content' to compact UTF-8 JSON bytes (orjson when available).
+
+    Args:
+        content: Any JSON-compatible value; Decimal becomes float and dates ISO strings.
+
+    Returns:
+        bytes: The encoded document.
+    """
+    if orjson is not None:
+        return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+    return json.dumps(content, default=_default, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered with dumps() (orjson when available)."""
+
+    def render(self, content):
+        return dumps(content)
+
+
+# ------------------------- COMPRESSION -------------------------
+def choose_encoding(accept_encoding):
+    """
+    Picks the response encoding from an Accept-Encoding header ('br' preferred, then 'gzip').
+
+    Args:
+        accept_encoding (str): e.g. 'gzip, deflate, br' or 'br;q=0, gzip'.
+
+    Returns:
+        str | None: 'br', 'gzip' or None for an uncompressed response.
+    """
+    offered = {}
+    for part in accept_encoding.split(","):
+        token, _, params = part.partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        if token.strip():
+            offered[token.strip().lower()] = quality
+
+    for encoding in ("br", "gzip"):
+        if encoding == "br" and brotli is None:
+            continue
+        if offered.get(encoding, offered.get("*", 0.0)) > 0:
+            return encoding
+    return None
+
+
+class BrotliResponder(IdentityResponder):
+    """Brotli counterpart of Starlette's GZipResponder (handles streaming bodies too)."""
+
+    content_encoding = "br"
+
+    def __init__(self, app, minimum_size, quality=4):
+        super().__init__(app, minimum_size)
+        self.compressor = brotli.Compressor(quality=quality)
+
+    def apply_compression(self, body, *, more_body):
+        data = self.compressor.process(body)
+        if not more_body:
+            data += self.compressor.finish()
+        return data
+
+
+class CompressionMiddleware:
+    """
+    Pure ASGI middleware compressing responses of at least 'minimum_size' bytes
+    with brotli (if installed and accepted) or gzip. Compressed responses get a
+    weak ETag, since their bytes differ from the uncompressed representation.
+
+    Args:
+        app: The wrapped ASGI application.
+        minimum_size (int): Smaller bodies are sent uncompressed.
+        gzip_level (int): gzip compression level (1-9).
+        brotli_quality (int): brotli quality (0-11).
+    """
+
+    def __init__(self, app, minimum_size=1024, gzip_level=6, brotli_quality=4):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding == "br":
+            responder = BrotliResponder(self.app, self.minimum_size, quality=self.brotli_quality)
+        elif encoding == "gzip":
+            responder = GZipResponder(self.app, self.minimum_size, compresslevel=self.gzip_level)
+        else:
+            await self.app(scope, receive, send)
+            return
+
+        async def send_with_weak_etag(message):
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(raw=message["headers"])
+                etag = headers.get("etag")
+                if "content-encoding" in headers and etag and not etag.startswith("W/"):
+                    headers["ETag"] = f"W/{etag}"
+            await send(message)
+
+        await responder(scope, receive, send_with_weak_etag)
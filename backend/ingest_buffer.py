@@ -0,0 +1,242 @@
+# Import necessary modules
+import atexit                          # Drains the buffer if the process exits without a clean shutdown
+import os                              # Reads the buffer settings from environment variables
+import threading                       # Background flusher thread and the condition guarding the buffer
+import time                            # Flush deadlines and retry back-off
+from collections import deque          # FIFO of pending rows
+from logging_setup import setup_logger # Custom logging setup module
+
+# Initialize a logger specific to this module for consistent logging
+logger = setup_logger('ingest_buffer')
+
+# -------------------------------------------------------------------------
+# Buffered, append-only ingestion.
+#
+# High-rate producers (receipt scanners, bank webhooks) send single expenses.
+# Instead of one transaction per row, accepted rows wait in a bounded
+# in-process buffer and a background thread writes them in batches: as soon
+# as 'batch_rows' rows are pending, or 'flush_ms' after the oldest pending
+# row arrived. A full buffer rejects new rows (the API answers 429), so a
+# slow database pushes back on producers instead of growing memory.
+# -------------------------------------------------------------------------
+
+INGEST_CONFIG = {
+    "max_rows":   int(os.getenv("EXPENSE_INGEST_QUEUE_SIZE", "10000")),  # Rows buffered before 429
+    "batch_rows": int(os.getenv("EXPENSE_INGEST_BATCH_ROWS", "500")),    # Rows per INSERT transaction
+    "flush_ms":   float(os.getenv("EXPENSE_INGEST_FLUSH_MS", "200")),    # Max wait of a row before its flush
+    "retries":    int(os.getenv("EXPENSE_INGEST_RETRIES", "3")),         # Extra attempts for a failed batch
+}
+
+
+class BufferClosedError(RuntimeError):
+    """Raised when rows are submitted after the buffer was closed."""
+
+
+class RequestTooLargeError(ValueError):
+    """Raised when one submission holds more rows than the buffer can ever hold."""
+
+
+class IngestBuffer:
+    """
+    Bounded buffer of expense rows with a background batch writer.
+
+    Args:
+        write_batch (callable): Writes a list of (expense_date, amount, category, notes)
+            tuples in one transaction and returns the dates written
+            (e.g. db_helper.insert_expenses_batch).
+        on_flush (callable): Optional callback receiving the written dates (cache invalidation).
+        max_rows (int): Rows held before submit() starts refusing.
+        batch_rows (int): Rows written per transaction.
+        flush_ms (float): Longest time a row waits before it is written.
+        retries (int): Extra attempts for a batch whose write failed.
+    """
+
+    def __init__(self, write_batch, on_flush=None, max_rows=10000, batch_rows=500, flush_ms=200.0, retries=3):
+        self.write_batch = write_batch
+        self.on_flush = on_flush
+        self.max_rows = max_rows
+        self.batch_rows = batch_rows
+        self.flush_ms = flush_ms
+        self.retries = retries
+        self._pending = deque()       # (arrival time, row) pairs, oldest first
+        self._due = False             # Set by flush(): write pending rows without waiting
+        self._in_flight = 0           # Rows taken by the flusher but not yet written
+        self._closed = False
+        self._thread = None
+        self._cond = threading.Condition()
+        self._stats = {"accepted": 0, "rejected": 0, "written": 0, "batches": 0, "failed": 0, "last_batch_ms": 0.0}
+
+    # ------------------------- PRODUCERS -------------------------
+    def start(self):
+        """Starts the flusher thread, or restarts it after close() (idempotent while running)."""
+        with self._cond:
+            if self._thread is not None and self._thread.is_alive():
+                return
+            if self._thread is None:
+                atexit.register(self.close)
+            self._closed = False
+            self._thread = threading.Thread(target=self._run, name="expense-ingest-flusher", daemon=True)
+            self._thread.start()
+
+    def submit(self, rows):
+        """
+        Buffers rows for the next batch; all rows are accepted or none.
+
+        Args:
+            rows (list[tuple]): (expense_date, amount, category, notes) tuples.
+
+        Returns:
+            bool: False if the buffer has no room for them (the caller should retry later).
+
+        Raises:
+            BufferClosedError: If the buffer is shutting down.
+            RequestTooLargeError: If 'rows' exceeds 'max_rows' (retrying cannot succeed).
+        """
+        if len(rows) > self.max_rows:
+            raise RequestTooLargeError(f"{len(rows)} rows exceed the ingest buffer size of {self.max_rows}")
+        if self._thread is None:
+            self.start()
+        with self._cond:
+            if self._closed:
+                raise BufferClosedError("ingest buffer is closed")
+            if len(self._pending) + len(rows) > self.max_rows:
+                self._stats["rejected"] += len(rows)
+                return False
+            arrived = time.monotonic()
+            self._pending.extend((arrived, row) for row in rows)
+            self._stats["accepted"] += len(rows)
+            self._cond.notify_all()
+            return True
+
+    # ------------------------- FLUSHER -------------------------
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._pending and not self._closed:
+                    self._cond.wait()
+                if not self._pending:
+                    return   # Closed and drained
+
+                # Wait for a full batch, the oldest row's deadline, flush() or shutdown.
+                # Rows left over from the previous batch keep their own arrival time.
+                while len(self._pending) < self.batch_rows and not self._closed and not self._due:
+                    remaining = self._pending[0][0] + self.flush_ms / 1000 - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+
+                batch = [self._pending.popleft()[1] for _ in range(min(self.batch_rows, len(self._pending)))]
+                if not self._pending:
+                    self._due = False
+                self._in_flight = len(batch)
+
+            self._write(batch)
+
+            with self._cond:
+                self._in_flight = 0
+                self._cond.notify_all()
+
+    def _write(self, batch):
+        """
+        Writes one batch. If its data is rejected (e.g. a month archived after the
+        rows were accepted), writes it again one date at a time so that only the
+        rows of the rejected dates are dropped, not other clients' valid rows.
+        """
+        try:
+            self._write_rows(batch)
+            return
+        except ValueError:
+            pass
+
+        by_date = {}
+        for entry in batch:
+            by_date.setdefault(entry[0], []).append(entry)
+        rejected = []
+        for expense_date, rows in by_date.items():
+            try:
+                self._write_rows(rows)
+            except ValueError as error:
+                logger.warning("ingest: %s rows for %s rejected: %s", len(rows), expense_date, error)
+                rejected.extend(rows)
+        if rejected:
+            # Counts and dates only: notes may hold personal data
+            logger.error("ingest: dropped %s of %s rows with invalid data (dates: %s)", len(rejected), len(batch),
+                         ", ".join(sorted({str(entry[0]) for entry in rejected})))
+            with self._cond:
+                self._stats["failed"] += len(rejected)
+
+    def _write_rows(self, rows):
+        """
+        Writes rows in one transaction, retrying transient failures with exponential back-off.
+
+        Raises:
+            ValueError: If the data is rejected; it fails the same way on every attempt.
+        """
+        for attempt in range(self.retries + 1):
+            started = time.perf_counter()
+            try:
+                dates = self.write_batch(rows)
+            except ValueError:
+                raise
+            except Exception:
+                logger.warning("ingest: batch of %s rows failed (attempt %s)", len(rows), attempt + 1, exc_info=True)
+                time.sleep(min(0.1 * 2 ** attempt, 2.0))
+                continue
+
+            with self._cond:
+                self._stats["written"] += len(rows)
+                self._stats["batches"] += 1
+                self._stats["last_batch_ms"] = round((time.perf_counter() - started) * 1000, 3)
+            if self.on_flush is not None:
+                try:
+                    self.on_flush(dates)
+                except Exception:
+                    logger.exception("ingest: on_flush callback failed")
+            return
+
+        logger.error("ingest: dropped %s rows after %s attempts (dates: %s)", len(rows), self.retries + 1,
+                     ", ".join(sorted({str(entry[0]) for entry in rows})))
+        with self._cond:
+            self._stats["failed"] += len(rows)
+
+    # ------------------------- CONTROL -------------------------
+    def flush(self, timeout=None):
+        """
+        Waits until every accepted row has been written (or has failed).
+
+        Args:
+            timeout (float): Seconds to wait at most (None waits indefinitely).
+
+        Returns:
+            bool: True if the buffer is empty.
+        """
+        with self._cond:
+            if self._pending:
+                self._due = True
+                self._cond.notify_all()
+            return self._cond.wait_for(lambda: not self._pending and not self._in_flight, timeout)
+
+    def close(self, timeout=30.0):
+        """
+        Stops accepting rows, writes everything still buffered and stops the flusher.
+
+        Args:
+            timeout (float): Seconds to wait for the final batches.
+        """
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+            thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
+
+    def stats(self):
+        """
+        Returns buffer statistics.
+
+        Returns:
+            dict: Rows queued/in flight, accepted/rejected/written/failed counters,
+                  batches written and the duration of the last batch in milliseconds.
+        """
+        with self._cond:
+            return {"queued": len(self._pending), "in_flight": self._in_flight, "capacity": self.max_rows, **self._stats}
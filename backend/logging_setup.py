@@ -1,51 +1,217 @@
-# Import the built-in logging module for application-wide logging
+# Import the built-in logging modules for application-wide logging
+import atexit                 # Drains the log queue when the process exits
+import json                   # Structured (JSON lines) output
 import logging
+import logging.handlers       # QueueHandler/QueueListener and the rotating file handlers
+import os                     # Reads logging settings from environment variables
+import queue                  # Bounded queue between request threads and the writer thread
+import random                 # Sampling of hot-path messages
+import threading              # Guards creation of the shared writer per log file
 
+# -------------------------------------------------------------------------
+# Logging subsystem.
+#
+# Request threads never touch the disk: setup_logger() attaches a
+# QueueHandler that only enqueues the record, and ONE background
+# QueueListener per log file formats and writes it through a rotating file
+# handler. If the queue is full the record is dropped (and counted) instead
+# of blocking the request.
+#
+# Settings (environment variables):
+#   EXPENSE_LOG_FILE          Log file path                        (server.log)
+#   EXPENSE_LOG_LEVEL         Minimum level                        (INFO)
+#   EXPENSE_LOG_FORMAT        'text' or 'json' (one object per line) (text)
+#   EXPENSE_LOG_ROTATION      'size' or 'time'                     (size)
+#   EXPENSE_LOG_MAX_BYTES     Size rotation threshold              (10485760)
+#   EXPENSE_LOG_WHEN          Time rotation interval, e.g. 'midnight', 'H' (midnight)
+#   EXPENSE_LOG_BACKUPS       Rotated files kept                   (5)
+#   EXPENSE_LOG_SAMPLE_RATE   Fraction of DEBUG/INFO records kept  (1.0)
+#   EXPENSE_LOG_QUEUE_SIZE    Records buffered before dropping     (10000)
+# -------------------------------------------------------------------------
+
+LOG_CONFIG = {
+    "log_file":    os.getenv("EXPENSE_LOG_FILE", "server.log"),
+    "level":       os.getenv("EXPENSE_LOG_LEVEL", "INFO").upper(),
+    "format":      os.getenv("EXPENSE_LOG_FORMAT", "text").lower(),
+    "rotation":    os.getenv("EXPENSE_LOG_ROTATION", "size").lower(),
+    "max_bytes":   int(os.getenv("EXPENSE_LOG_MAX_BYTES", str(10 * 1024 * 1024))),
+    "when":        os.getenv("EXPENSE_LOG_WHEN", "midnight"),
+    "backups":     int(os.getenv("EXPENSE_LOG_BACKUPS", "5")),
+    "sample_rate": float(os.getenv("EXPENSE_LOG_SAMPLE_RATE", "1.0")),
+    "queue_size":  int(os.getenv("EXPENSE_LOG_QUEUE_SIZE", "10000")),
+}
+
+# Example text line: "2025-10-18 15:42:10,123 - db_helper - INFO - Database connection established"
+TEXT_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+# log file -> (queue, listener); one writer thread per file
+_writers = {}
+_writers_lock = threading.Lock()
+
+
+# ------------------------- FORMATTERS AND FILTERS -------------------------
+class JsonFormatter(logging.Formatter):
+    """Formats a record as one JSON object per line (time, level, logger, message, exception)."""
+
+    def format(self, record):
+        entry = {
+            "time": self.formatTime(record),
+            "level": record.levelname,
+            "logger": record.name,
+            "message": record.getMessage(),
+        }
+        if record.exc_info:
+            entry["exception"] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry["exception"] = record.exc_text
+        return json.dumps(entry, default=str)
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Keeps only a fraction of DEBUG/INFO records; WARNING and above always pass.
 
-def setup_logger(logger_name, log_file='server.log', level=logging.INFO):
+    Args:
+        rate (float): Fraction of low-severity records kept (1.0 keeps all, 0 keeps none).
+    """
+
+    def __init__(self, rate):
+        super().__init__()
+        self.rate = rate
+
+    def filter(self, record):
+        if record.levelno >= logging.WARNING or self.rate >= 1.0:
+            return True
+        return random.random() < self.rate
+
+
+class NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """
+    QueueHandler that never blocks the caller: records are dropped when the
+    queue is full. Only the %-style message merge happens in the calling thread;
+    timestamps, layout and JSON encoding are done by the writer thread.
+    """
+
+    dropped = 0                      # Records dropped by every handler of the process
+    _dropped_lock = threading.Lock() # Request threads drop concurrently when the queue is full
+
+    def prepare(self, record):
+        message = record.getMessage()
+        record = logging.makeLogRecord(record.__dict__)
+        record.msg = message
+        record.args = None
+        if record.exc_info:
+            # Tracebacks hold frames; render them now so the writer thread gets plain text
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            with NonBlockingQueueHandler._dropped_lock:
+                NonBlockingQueueHandler.dropped += 1
+
+
+# ------------------------- WRITER THREADS -------------------------
+def _build_file_handler(log_file, config):
+    """Creates the rotating handler used by the writer thread of 'log_file'."""
+    if config["rotation"] == "time":
+        handler = logging.handlers.TimedRotatingFileHandler(
+            log_file, when=config["when"], backupCount=config["backups"], encoding="utf-8"
+        )
+    else:
+        handler = logging.handlers.RotatingFileHandler(
+            log_file, maxBytes=config["max_bytes"], backupCount=config["backups"], encoding="utf-8"
+        )
+    if config["format"] == "json":
+        handler.setFormatter(JsonFormatter())
+    elif config["format"] == "raw":
+        # The message is written as-is (used for logs that are already JSON lines)
+        handler.setFormatter(logging.Formatter('%(message)s'))
+    else:
+        handler.setFormatter(logging.Formatter(TEXT_FORMAT))
+    return handler
+
+
+def _get_writer_queue(log_file, config):
+    """Returns the queue of the writer thread for 'log_file', starting the thread on first use."""
+    key = os.path.abspath(log_file)
+    with _writers_lock:
+        writer = _writers.get(key)
+        if writer is None:
+            records = queue.Queue(maxsize=config["queue_size"])
+            listener = logging.handlers.QueueListener(records, _build_file_handler(log_file, config))
+            listener.start()
+            writer = _writers[key] = (records, listener)
+    return writer[0]
+
+
+def shutdown_logging(log_file=None):
+    """
+    Writes every queued record, stops the writer threads and closes the log files.
+    Registered with atexit; also useful in tests before reading a log file.
+
+    Args:
+        log_file (str): Only stop the writer of this file (default: all writers).
+    """
+    with _writers_lock:
+        if log_file is None:
+            writers = list(_writers.values())
+            _writers.clear()
+        else:
+            writer = _writers.pop(os.path.abspath(log_file), None)
+            writers = [writer] if writer else []
+    for _, listener in writers:
+        listener.stop()                 # Drains the queue before returning
+        for handler in listener.handlers:
+            handler.close()
+
+
+atexit.register(shutdown_logging)
+
+
+# ------------------------- PUBLIC API -------------------------
+def setup_logger(logger_name, log_file=None, level=None, **overrides):
     """
     Creates and configures a logger instance for the application.
-    
+    Calling it again with the same name returns the already configured logger
+    (no duplicate handlers), and every logger writing to the same file shares
+    one background writer thread.
+
     Args:
         logger_name (str): The name to assign to the logger instance.
         log_file (str): Path to the file where logs will be written.
-                        Defaults to 'server.log'.
-        level (int): Logging level (e.g., logging.INFO, logging.DEBUG).
-                     Defaults to logging.INFO.
-    
+                        Defaults to EXPENSE_LOG_FILE ('server.log').
+        level (int or str): Logging level (e.g., logging.INFO, 'DEBUG').
+                            Defaults to EXPENSE_LOG_LEVEL ('INFO').
+        **overrides: Any LOG_CONFIG key (format, rotation, max_bytes, when,
+                     backups, sample_rate, queue_size) for this logger's file.
+
     Returns:
         logging.Logger: A configured logger object ready for use.
-    
+
     Notes:
-        - This function sets up file-based logging.
-        - The logs will be formatted with timestamp, logger name,
-          severity level, and message.
+        - Use lazy arguments so messages are only built when they are kept:
+          logger.info("fetched %s rows", len(rows))
         - To watch logs in real-time, use: `tail -f server.log` in the terminal.
     """
     # Create (or get, if already existing) a named logger instance
     logger = logging.getLogger(logger_name)
+    if getattr(logger, "_expense_configured", False):
+        return logger
 
-    # --- DEBUGGING PRINTS (for introspection) ---
-    # These print statements help verify the types of logging components during runtime
-    print(f"logging type: {type(logging)}")
-    print(f"basicConfig type: {type(logging.basicConfig)}")
-
-    # Configure the global logging system’s default behavior
-    # Here, we set the default logging level for root logger
-    logging.basicConfig(level=level)
-
-    # Create a file handler — this writes all log messages to a file
-    file_handler = logging.FileHandler(log_file)  # Log file destination (e.g., 'server.log')
+    config = {**LOG_CONFIG, **overrides}
+    log_file = log_file or config["log_file"]
 
-    # Define the log message format:
-    # Example: "2025-10-18 15:42:10,123 - db_helper - INFO - Database connection established"
-    formatter = logging.Formatter('%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    handler = NonBlockingQueueHandler(_get_writer_queue(log_file, config))
+    if config["sample_rate"] < 1.0:
+        handler.addFilter(SamplingFilter(config["sample_rate"]))
 
-    # Apply the formatter to the file handler
-    file_handler.setFormatter(formatter)
-
-    # Attach the file handler to the logger so it knows where to send output
-    logger.addHandler(file_handler)
+    logger.addHandler(handler)
+    logger.setLevel(level or config["level"])
+    logger._expense_configured = True
 
     # Return the fully configured logger object
     return logger
@@ -53,9 +219,8 @@ def setup_logger(logger_name, log_file='server.log', level=logging.INFO):
 
 # ---------------------------------------------------------------------
 # NOTE:
-# Logging can also be implemented using a decorator function to
-# automatically log function calls, arguments, and results.
-#
 # To view logs live as they are written to 'server.log', run:
 #     tail -f server.log
+# With EXPENSE_LOG_FORMAT=json each line is a JSON object, e.g.:
+#     tail -f server.log | jq .
 # ---------------------------------------------------------------------
@@ -0,0 +1,19 @@
+# Import necessary modules
+import os   # Reads the server mode from the environment
+
+# -------------------------------------------------------------------------
+# Entry point that picks the sync or async request path at startup.
+#
+#   fastapi dev ./main.py                             -> sync (default)
+#   EXPENSE_SERVER_MODE=async fastapi dev ./main.py   -> async
+#
+# Both modes expose the same endpoints and response shapes.
+# -------------------------------------------------------------------------
+SERVER_MODE = os.getenv("EXPENSE_SERVER_MODE", "sync").lower()
+
+if SERVER_MODE == "async":
+    from async_server import app
+elif SERVER_MODE == "sync":
+    from server import app
+else:
+    raise ValueError(f"EXPENSE_SERVER_MODE must be 'sync' or 'async', got {SERVER_MODE!r}")
@@ -0,0 +1,231 @@
+# Import necessary modules
+import bisect                          # Finds the histogram bucket of an observation in O(log n)
+import contextvars                     # Exposes the running db_helper function to the query profiler
+import functools                       # Preserves function metadata in the timing decorators
+import threading                       # Lock protecting metric updates across worker threads
+import time                            # High-resolution timer for durations
+
+# -------------------------------------------------------------------------
+# Minimal Prometheus-compatible instrumentation.
+#
+# Histograms are updated in-process with one lock and a bisect per
+# observation, and rendered in the Prometheus text exposition format by
+# GET /metrics. Gauges are read lazily from callbacks (pool/cache stats)
+# only when /metrics is scraped, so they cost nothing on the request path.
+# -------------------------------------------------------------------------
+
+# Latency buckets in seconds (upper bounds); +Inf is implicit
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+def _escape(value):
+    """Escapes a label value for the text exposition format."""
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names, values, extra=None):
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Histogram:
+    """
+    Cumulative-bucket histogram keyed by a fixed set of label names.
+
+    Args:
+        name (str): Metric name, e.g. 'expense_http_request_duration_seconds'.
+        documentation (str): HELP text.
+        labelnames (tuple[str]): Label names; observe() takes values in the same order.
+        buckets (tuple[float]): Sorted bucket upper bounds.
+    """
+
+    def __init__(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(buckets)
+        self._series = {}   # label values -> [per-bucket counts..., +Inf count], sum
+        self._lock = threading.Lock()
+
+    def observe(self, labelvalues, value):
+        """
+        Records one observation.
+
+        Args:
+            labelvalues (tuple): Values for 'labelnames', in order.
+            value (float): The observed value (seconds for durations).
+        """
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(labelvalues)
+            if series is None:
+                series = self._series[labelvalues] = [[0] * (len(self.buckets) + 1), 0.0]
+            series[0][index] += 1
+            series[1] += value
+
+    def render(self):
+        """Returns the metric in Prometheus text format."""
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            snapshot = [(labels, list(counts), total) for labels, (counts, total) in self._series.items()]
+        for labelvalues, counts, total in sorted(snapshot):
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = 'le="+Inf"' if bound == float("inf") else f'le="{bound!r}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labelnames, labelvalues, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labelnames, labelvalues)} {total}")
+            lines.append(f"{self.name}_count{_format_labels(self.labelnames, labelvalues)} {cumulative}")
+        return "\n".join(lines)
+
+
+class CallbackGauges:
+    """
+    A family of gauges read from a callback returning a flat dict of numbers,
+    e.g. db_helper.get_pool_stats(). Each numeric key becomes '<prefix>_<key>'.
+
+    Args:
+        prefix (str): Metric name prefix, e.g. 'expense_db_pool'.
+        documentation (str): HELP text shared by the family.
+        callback (callable): Returns dict[str, number]; called only at scrape time.
+    """
+
+    def __init__(self, prefix, documentation, callback):
+        self.prefix = prefix
+        self.documentation = documentation
+        self.callback = callback
+
+    def render(self):
+        lines = []
+        for key, value in self.callback().items():
+            if isinstance(value, bool) or not isinstance(value, (int, float)):
+                continue
+            name = f"{self.prefix}_{key}"
+            lines += [f"# HELP {name} {self.documentation} ({key})", f"# TYPE {name} gauge", f"{name} {value}"]
+        return "\n".join(lines)
+
+
+class Registry:
+    """Holds every metric rendered by GET /metrics."""
+
+    def __init__(self):
+        self._metrics = []
+        self._lock = threading.Lock()
+
+    def register(self, metric):
+        with self._lock:
+            self._metrics.append(metric)
+        return metric
+
+    def render(self):
+        """Returns all registered metrics in Prometheus text format (version 0.0.4)."""
+        with self._lock:
+            metrics = list(self._metrics)
+        return "\n".join(part for part in (metric.render() for metric in metrics) if part) + "\n"
+
+
+# ------------------------- SHARED METRICS -------------------------
+REGISTRY = Registry()
+
+REQUEST_DURATION = REGISTRY.register(Histogram(
+    "expense_http_request_duration_seconds",
+    "HTTP request duration by route template, method and status code.",
+    ("method", "route", "status"),
+))
+
+QUERY_DURATION = REGISTRY.register(Histogram(
+    "expense_db_query_duration_seconds",
+    "Duration of db_helper operations by function and outcome.",
+    ("function", "outcome"),
+))
+
+
+def register_gauges(prefix, documentation, callback):
+    """Registers a CallbackGauges family on the shared registry."""
+    return REGISTRY.register(CallbackGauges(prefix, documentation, callback))
+
+
+# ------------------------- DB TIMING DECORATORS -------------------------
+# Name of the db_helper function currently running (read by query_profiler)
+CURRENT_QUERY_FUNCTION = contextvars.ContextVar("current_query_function", default=None)
+
+
+def timed_query(function):
+    """Decorator recording the duration of a db_helper function in QUERY_DURATION."""
+    @functools.wraps(function)
+    def wrapper(*args, **kwargs):
+        started = time.perf_counter()
+        outcome = "error"
+        token = CURRENT_QUERY_FUNCTION.set(function.__name__)
+        try:
+            result = function(*args, **kwargs)
+            outcome = "ok"
+            return result
+        finally:
+            CURRENT_QUERY_FUNCTION.reset(token)
+            QUERY_DURATION.observe((function.__name__, outcome), time.perf_counter() - started)
+    return wrapper
+
+
+def timed_async_query(function):
+    """Decorator recording the duration of an async_db_helper coroutine in QUERY_DURATION."""
+    @functools.wraps(function)
+    async def wrapper(*args, **kwargs):
+        started = time.perf_counter()
+        outcome = "error"
+        try:
+            result = await function(*args, **kwargs)
+            outcome = "ok"
+            return result
+        finally:
+            QUERY_DURATION.observe((function.__name__, outcome), time.perf_counter() - started)
+    return wrapper
+
+
+# ------------------------- HTTP MIDDLEWARE -------------------------
+class RequestMetricsMiddleware:
+    """
+    Pure ASGI middleware timing each HTTP request into REQUEST_DURATION.
+    Requests are labelled with the route template (e.g. '/expenses/{expenses_date}')
+    rather than the raw path, so label cardinality stays bounded.
+    Streaming responses are timed until their headers are sent.
+
+    Args:
+        app: The wrapped ASGI application.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        started = time.perf_counter()
+        status = {"code": 500, "observed": False}
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+                observe()
+            await send(message)
+
+        def observe():
+            # Once per request, even if the app fails after its headers were sent
+            if status["observed"]:
+                return
+            status["observed"] = True
+            route = scope.get("route")
+            REQUEST_DURATION.observe(
+                (scope["method"], route.path if route is not None else "unmatched", str(status["code"])),
+                time.perf_counter() - started
+            )
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            # Requests that never started a response are recorded as 500
+            observe()
@@ -0,0 +1,181 @@
+'''
+Versioned schema migrations for the expense database.
+
+Migrations are the numbered .sql files in ./migrations and are applied in
+order; applied versions are recorded in the 'schema_migrations' table.
+Run from the backend folder:
+
+    python migrate.py status    # List applied and pending migrations
+    python migrate.py upgrade   # Apply every pending migration
+    python migrate.py check     # EXPLAIN each db_helper hot query; exit 1 on a full table scan
+'''
+
+# Import necessary modules
+import argparse                        # Command-line parsing for the migration commands
+import os                              # Locates the migrations folder
+import sys                             # Exit status for 'check'
+import db_helper                       # Pooled cursors and the SQL statements to EXPLAIN
+from logging_setup import setup_logger # Custom logging setup module
+
+# Initialize a logger specific to this module for consistent logging
+logger = setup_logger('migrate')
+
+# Folder holding the NNNN_description.sql migration files
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "migrations")
+
+# Representative parameters used when EXPLAINing the hot queries
+SAMPLE_DATE = "2024-08-01"
+SAMPLE_RANGE = ("2024-01-01", "2024-12-31")
+
+# Every statement db_helper runs on the request path, with sample parameters
+HOT_QUERIES = [
+    ("retrieve_expenses_by_date",     db_helper.SELECT_BY_DATE_SQL, (SAMPLE_DATE,)),
+    ("retrieve_expenses_with_version", db_helper.SELECT_ROWS_BY_DATE_SQL, (SAMPLE_DATE,)),
+    ("delete_expenses_by_date",       db_helper.DELETE_BY_DATE_SQL, (SAMPLE_DATE,)),
+    ("refresh_daily_rollup (delete)", db_helper.ROLLUP_DELETE_SQL,  (SAMPLE_DATE,)),
+    ("refresh_daily_rollup (insert)", db_helper.ROLLUP_INSERT_SQL,  (SAMPLE_DATE,)),
+    ("fetch_expense_summary",         db_helper.SUMMARY_SQL,        SAMPLE_RANGE),
+    ("stream_expenses_between",       db_helper.EXPORT_RANGE_SQL,   SAMPLE_RANGE),
+    ("bump_date_versions",            db_helper.BUMP_DATE_VERSION_SQL, (SAMPLE_DATE,)),
+    ("fetch_date_version",            db_helper.DATE_VERSION_SQL,   (SAMPLE_DATE,)),
+    ("fetch_range_version",           db_helper.RANGE_VERSION_SQL,  SAMPLE_RANGE),
+    ("update_monthly_totals (upsert)", db_helper.MONTHLY_TOTAL_UPSERT_SQL, (SAMPLE_DATE, "Food", 1, 1)),
+    ("update_monthly_totals (budgets)", db_helper.budget_check_sql(1), (SAMPLE_DATE, "Food")),
+    ("index_notes (delete)",          db_helper.notes_index_sql(1)[0], (SAMPLE_DATE,)),
+    ("search_expense_notes",          db_helper.NOTES_SEARCH_SQL,
+     ("+coffee*", "+coffee*", *SAMPLE_RANGE, None, None, 20, 0)),
+    ("search_expense_notes (totals)", db_helper.NOTES_SEARCH_TOTALS_SQL, ("+coffee*", *SAMPLE_RANGE, None, None)),
+    ("stream_amounts_between",        db_helper.AMOUNTS_RANGE_SQL,  SAMPLE_RANGE),
+    *[
+        (f"fetch_expense_trends ({granularity})", db_helper.trends_sql(granularity), SAMPLE_RANGE)
+        for granularity in db_helper.TREND_PERIOD_SQL
+    ],
+    ("apply_expense_changes (lock)",   db_helper.expense_lock_sql(2),   (SAMPLE_DATE, 1, 2)),
+    ("apply_expense_changes (delete)", db_helper.expense_delete_sql(2), (SAMPLE_DATE, 1, 2)),
+    ("apply_expense_changes (update)", db_helper.expense_update_sql(db_helper.UPDATABLE_FIELDS),
+     (1.0, "Food", "", 1, SAMPLE_DATE)),
+    ("fetch_budget_status",           db_helper.BUDGET_STATUS_SQL,  (SAMPLE_DATE,)),
+]
+
+
+def list_migrations():
+    """
+    Returns the migration files found on disk, in the order they must be applied.
+
+    Returns:
+        list[tuple[str, str]]: (version, file path) pairs, e.g. ("0001", ".../0001_create_expenses.sql").
+    """
+    migrations = []
+    for name in sorted(os.listdir(MIGRATIONS_DIR)):
+        if name.endswith(".sql"):
+            migrations.append((name.split("_", 1)[0], os.path.join(MIGRATIONS_DIR, name)))
+    return migrations
+
+
+def split_statements(sql):
+    """
+    Splits a migration file into individual statements.
+    Lines starting with '--' are comments; statements are separated by ';'.
+
+    Args:
+        sql (str): Contents of a migration file.
+
+    Returns:
+        list[str]: Non-empty SQL statements.
+    """
+    lines = [line for line in sql.splitlines() if not line.strip().startswith("--")]
+    return [statement.strip() for statement in "\n".join(lines).split(";") if statement.strip()]
+
+
+def applied_versions():
+    """
+    Returns the versions already recorded in 'schema_migrations' (creating it if needed).
+
+    Returns:
+        set[str]: Applied migration versions.
+    """
+    with db_helper.get_db_cursor(commit=True) as cursor:
+        cursor.execute(
+            "CREATE TABLE IF NOT EXISTS schema_migrations ("
+            " version VARCHAR(32) NOT NULL PRIMARY KEY,"
+            " name VARCHAR(255) NOT NULL,"
+            " applied_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP)"
+        )
+        cursor.execute("SELECT version FROM schema_migrations")
+        return {row['version'] for row in cursor.fetchall()}
+
+
+def upgrade():
+    """
+    Applies every pending migration in version order.
+    MySQL commits DDL implicitly, so a migration is recorded only after all of
+    its statements succeed; a failed migration must be fixed and re-run.
+
+    Returns:
+        list[str]: File names of the migrations that were applied.
+    """
+    done = applied_versions()
+    applied = []
+    for version, path in list_migrations():
+        if version in done:
+            continue
+        name = os.path.basename(path)
+        logger.info("applying migration %s", name)
+        with open(path, encoding="utf-8") as handle:
+            statements = split_statements(handle.read())
+        with db_helper.get_db_cursor(commit=True) as cursor:
+            for statement in statements:
+                cursor.execute(statement)
+            cursor.execute(
+                "INSERT INTO schema_migrations (version, name) VALUES (%s, %s)",
+                (version, name)
+            )
+        applied.append(name)
+    return applied
+
+
+def check_query_plans():
+    """
+    Runs EXPLAIN on every hot db_helper query and reports full table scans.
+    The row describing the target of an INSERT is ignored since it is not a read.
+
+    Returns:
+        list[dict]: One entry per query with its plan rows and whether it scans a full table.
+    """
+    report = []
+    with db_helper.get_db_cursor() as cursor:
+        for name, sql, params in HOT_QUERIES:
+            cursor.execute("EXPLAIN " + sql, params)
+            plan = cursor.fetchall()
+            scans = [
+                row['table'] for row in plan
+                if row.get('type') == "ALL" and row.get('select_type') not in ("INSERT", "REPLACE")
+            ]
+            report.append({"query": name, "plan": plan, "full_scans": scans})
+    return report
+
+
+# ---------------------- MAIN BLOCK: COMMAND LINE ----------------------
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Manage the expense database schema.")
+    parser.add_argument("command", choices=["status", "upgrade", "check"])
+    args = parser.parse_args()
+
+    if args.command == "status":
+        done = applied_versions()
+        for version, path in list_migrations():
+            print(f"[{'x' if version in done else ' '}] {os.path.basename(path)}")
+    elif args.command == "upgrade":
+        applied = upgrade()
+        print("\n".join(f"Applied {name}" for name in applied) or "Schema is up to date")
+    else:
+        failed = False
+        for entry in check_query_plans():
+            keys = ", ".join(str(row.get('key')) for row in entry["plan"])
+            partitions = ", ".join(str(row.get('partitions')) for row in entry["plan"] if row.get('partitions'))
+            if entry["full_scans"]:
+                failed = True
+                print(f"FAIL {entry['query']}: full table scan on {', '.join(entry['full_scans'])}")
+            else:
+                print(f"OK   {entry['query']} (keys: {keys}" + (f"; partitions: {partitions})" if partitions else ")"))
+        sys.exit(1 if failed else 0)
@@ -0,0 +1,11 @@
+-- 0001: Core 'expenses' table queried by db_helper.py.
+-- Matches the table the application has always used, so on an existing
+-- database this migration is a no-op and only gets recorded as applied.
+CREATE TABLE IF NOT EXISTS expenses (
+    id           INT          NOT NULL AUTO_INCREMENT,
+    expense_date DATE         NOT NULL,
+    amount       FLOAT        NOT NULL,
+    category     VARCHAR(255) NOT NULL,
+    notes        TEXT,
+    PRIMARY KEY (id)
+);
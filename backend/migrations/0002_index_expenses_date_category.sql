@@ -0,0 +1,4 @@
+-- 0002: Composite index for the hot queries.
+-- Serves the per-date SELECT/DELETE (leftmost column) and the per-day
+-- GROUP BY category used to refresh the daily rollup without a table scan.
+ALTER TABLE expenses ADD INDEX idx_expenses_date_category (expense_date, category);
@@ -0,0 +1,15 @@
+-- 0003: Daily (date, category) rollup read by fetch_expense_summary.
+-- Kept in step by every write in db_helper.py; fill or repair it with
+-- 'python rollup.py rebuild' and check it with 'python rollup.py verify'.
+CREATE TABLE IF NOT EXISTS expense_daily_rollup (
+    expense_date  DATE          NOT NULL,
+    category      VARCHAR(255)  NOT NULL,
+    total_amount  DECIMAL(14,2) NOT NULL,
+    expense_count INT UNSIGNED  NOT NULL,
+    PRIMARY KEY (expense_date, category)
+);
+
+-- Backfill from the raw table so analytics are correct immediately
+DELETE FROM expense_daily_rollup;
+INSERT INTO expense_daily_rollup (expense_date, category, total_amount, expense_count)
+SELECT expense_date, category, SUM(amount), COUNT(*) FROM expenses GROUP BY expense_date, category;
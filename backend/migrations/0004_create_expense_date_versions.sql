@@ -0,0 +1,14 @@
+-- 0004: Per-date version counter used for ETags (conditional GET).
+-- Every write in db_helper.py bumps the version of each date it touches, in
+-- the same transaction as the write. Rows are never deleted, so versions
+-- only grow and SUM(version) over a range changes whenever the range does.
+CREATE TABLE IF NOT EXISTS expense_date_versions (
+    expense_date DATE            NOT NULL,
+    version      BIGINT UNSIGNED NOT NULL,
+    updated_at   TIMESTAMP(3)    NOT NULL DEFAULT CURRENT_TIMESTAMP(3) ON UPDATE CURRENT_TIMESTAMP(3),
+    PRIMARY KEY (expense_date)
+);
+
+-- Every date that already has expenses starts at version 1
+INSERT IGNORE INTO expense_date_versions (expense_date, version)
+SELECT DISTINCT expense_date, 1 FROM expenses;
@@ -0,0 +1,26 @@
+-- 0005: Monthly RANGE partitioning of 'expenses' on expense_date.
+-- MySQL requires the partitioning column in every unique key, so the primary
+-- key becomes (id, expense_date); id stays AUTO_INCREMENT and unique.
+-- Every row starts in the catch-all 'p_future' partition; run
+--   python partitions.py ensure
+-- right after this migration (and then monthly) to split it into one
+-- partition per month. Queries filtering on expense_date (all of db_helper's
+-- per-date and range statements) then only read the matching partitions.
+ALTER TABLE expenses DROP PRIMARY KEY, ADD PRIMARY KEY (id, expense_date);
+
+ALTER TABLE expenses PARTITION BY RANGE COLUMNS (expense_date) (
+    PARTITION p_future VALUES LESS THAN (MAXVALUE)
+);
+
+-- One row per archived month ('python partitions.py archive'). Dates before
+-- MAX(range_end) only exist in expense_daily_rollup and are read-only.
+CREATE TABLE IF NOT EXISTS expense_partition_archive (
+    partition_name VARCHAR(64)  NOT NULL,
+    range_start    DATE         NULL,
+    range_end      DATE         NOT NULL,
+    row_count      BIGINT UNSIGNED NOT NULL,
+    mode           VARCHAR(16)  NOT NULL,
+    archive_table  VARCHAR(64)  NULL,
+    archived_at    TIMESTAMP    NOT NULL DEFAULT CURRENT_TIMESTAMP,
+    PRIMARY KEY (partition_name)
+);
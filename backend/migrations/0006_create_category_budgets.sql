@@ -0,0 +1,27 @@
+-- 0006: Per-category monthly budgets and running month-to-date totals.
+-- 'expense_monthly_totals' is kept in step incrementally: every write adds
+-- the difference between a day's new and old rollup rows to its month, in
+-- the same transaction (db_helper.refresh_daily_rollups). Budget checks and
+-- GET /budgets are then primary-key lookups instead of month aggregations.
+CREATE TABLE IF NOT EXISTS category_budgets (
+    category      VARCHAR(255)  NOT NULL,
+    monthly_limit DECIMAL(14,2) NOT NULL,
+    updated_at    TIMESTAMP     NOT NULL DEFAULT CURRENT_TIMESTAMP ON UPDATE CURRENT_TIMESTAMP,
+    PRIMARY KEY (category)
+);
+
+CREATE TABLE IF NOT EXISTS expense_monthly_totals (
+    month         DATE          NOT NULL,   -- First day of the month
+    category      VARCHAR(255)  NOT NULL,
+    total_amount  DECIMAL(14,2) NOT NULL,
+    expense_count INT           NOT NULL,   -- Signed: writes add negative deltas
+    PRIMARY KEY (month, category)
+);
+
+-- Backfill from the daily rollup (which also covers archived months)
+DELETE FROM expense_monthly_totals;
+INSERT INTO expense_monthly_totals (month, category, total_amount, expense_count)
+SELECT DATE_SUB(expense_date, INTERVAL DAYOFMONTH(expense_date) - 1 DAY) AS month, category,
+       SUM(total_amount), SUM(expense_count)
+FROM expense_daily_rollup
+GROUP BY month, category;
@@ -0,0 +1,23 @@
+-- 0007: Full-text index over expense notes.
+-- InnoDB does not support FULLTEXT indexes on partitioned tables (0005), so
+-- the searchable copy of each note lives in this side table. Every write in
+-- db_helper.py re-indexes the notes of the dates it touches in the same
+-- transaction (db_helper.index_notes); archived months are removed with
+-- their partitions. Only expenses with non-empty notes are stored.
+CREATE TABLE IF NOT EXISTS expense_notes_fts (
+    id           INT           NOT NULL,
+    expense_date DATE          NOT NULL,
+    category     VARCHAR(255)  NOT NULL,
+    amount       FLOAT         NOT NULL,
+    notes        TEXT          NOT NULL,
+    PRIMARY KEY (id),
+    KEY idx_notes_fts_date (expense_date)
+);
+
+-- Backfill before the FULLTEXT index exists: building it once is much faster
+-- than maintaining it row by row
+DELETE FROM expense_notes_fts;
+INSERT INTO expense_notes_fts (id, expense_date, category, amount, notes)
+SELECT id, expense_date, category, amount, notes FROM expenses WHERE notes IS NOT NULL AND notes <> '';
+
+ALTER TABLE expense_notes_fts ADD FULLTEXT INDEX ft_expense_notes (notes);
@@ -0,0 +1,284 @@
+'''
+Maintenance commands for the monthly partitions of the 'expenses' table.
+
+Migration 0005 partitions 'expenses' by RANGE COLUMNS (expense_date) with a
+single catch-all partition; these commands keep one partition per month.
+Run from the backend folder:
+
+    python partitions.py status                          # List partitions and archived months
+    python partitions.py ensure  [--months-ahead 3]      # Create monthly partitions up to N months ahead
+    python partitions.py archive --older-than-years 3 [--mode drop|exchange] [--dry-run]
+
+'ensure' splits the catch-all 'p_future' partition, so it is cheap as long
+as it runs before rows for new months arrive (e.g. from a monthly cron job).
+
+'archive' removes the raw rows of whole months older than N years. Their
+analytics stay available through 'expense_daily_rollup', which is verified
+against the raw rows before anything is removed. With '--mode exchange' the
+rows are first moved (metadata only, no copy) into a standalone table named
+'expenses_archive_pYYYYMM'; with '--mode drop' only the rollup is kept.
+Archived dates become read-only (see db_helper.check_writable).
+'''
+
+# Import necessary modules
+import argparse                        # Command-line parsing for the maintenance commands
+from datetime import date              # Month arithmetic for partition bounds
+import db_helper                       # Pooled cursors and the archive watermark
+import rollup                          # Rollup verification before raw rows are archived
+from logging_setup import setup_logger # Custom logging setup module
+
+# Initialize a logger specific to this module for consistent logging
+logger = setup_logger('partitions')
+
+# Name of the catch-all partition holding rows beyond the last monthly bound
+FUTURE_PARTITION = "p_future"
+
+PARTITIONS_SQL = (
+    "SELECT PARTITION_NAME AS name, PARTITION_DESCRIPTION AS bound, TABLE_ROWS AS table_rows "
+    "FROM information_schema.PARTITIONS "
+    "WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = 'expenses' "
+    "ORDER BY PARTITION_ORDINAL_POSITION"
+)
+
+
+# ------------------------- MONTH HELPERS -------------------------
+def month_start(day):
+    """Returns the first day of the month containing 'day'."""
+    return day.replace(day=1)
+
+
+def add_months(day, months):
+    """Returns the first day of the month 'months' after the month of 'day'."""
+    index = day.year * 12 + day.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month):
+    """Partition name of a month, e.g. 'p202408' for August 2024."""
+    return f"p{month.year:04d}{month.month:02d}"
+
+
+def parse_bound(description):
+    """
+    Converts a PARTITION_DESCRIPTION from information_schema into a date.
+
+    Args:
+        description (str): e.g. "'2024-09-01'" or 'MAXVALUE'.
+
+    Returns:
+        datetime.date | None: The exclusive upper bound, or None for MAXVALUE.
+    """
+    description = (description or "").strip().strip("'")
+    return None if description.upper() == "MAXVALUE" else date.fromisoformat(description)
+
+
+# ------------------------- PLANNING -------------------------
+def plan_new_partitions(partitions, first_month, last_month):
+    """
+    Lists the monthly partitions missing between the current last bound and 'last_month'.
+
+    Args:
+        partitions (list[dict]): Current partitions ('name' and parsed 'bound'), in order.
+        first_month (date): Month to start from when no monthly partition exists yet.
+        last_month (date): Last month that must have its own partition.
+
+    Returns:
+        list[tuple[str, date]]: (partition name, exclusive upper bound) pairs, in order.
+    """
+    bounds = [partition['bound'] for partition in partitions if partition['bound'] is not None]
+    month = max(bounds) if bounds else month_start(first_month)
+
+    planned = []
+    while month <= last_month:
+        planned.append((partition_name(month), add_months(month, 1)))
+        month = add_months(month, 1)
+    return planned
+
+
+def plan_archive(partitions, cutoff):
+    """
+    Lists the monthly partitions whose rows all lie before 'cutoff'.
+
+    Args:
+        partitions (list[dict]): Current partitions ('name' and parsed 'bound'), in order.
+        cutoff (date): First date that must stay row by row.
+
+    Returns:
+        list[dict]: Partitions to archive, each with 'name', 'range_start' (None for
+                    the first partition, which also holds any older rows) and 'range_end'.
+    """
+    candidates = []
+    previous = None
+    for partition in partitions:
+        bound = partition['bound']
+        if bound is None or bound > cutoff:
+            break
+        candidates.append({"name": partition['name'], "range_start": previous, "range_end": bound})
+        previous = bound
+    return candidates
+
+
+# ------------------------- DATABASE OPERATIONS -------------------------
+def list_partitions():
+    """
+    Returns the partitions of 'expenses' in bound order.
+
+    Returns:
+        list[dict]: 'name', 'bound' (date or None for MAXVALUE) and 'table_rows' (an estimate).
+
+    Raises:
+        RuntimeError: If 'expenses' is not partitioned (migration 0005 not applied).
+    """
+    with db_helper.get_db_cursor() as cursor:
+        cursor.execute(PARTITIONS_SQL)
+        rows = cursor.fetchall()
+    if not rows or rows[0]['name'] is None:
+        raise RuntimeError("'expenses' is not partitioned; run 'python migrate.py upgrade' first")
+    return [
+        {"name": row['name'], "bound": parse_bound(row['bound']), "table_rows": row['table_rows']}
+        for row in rows
+    ]
+
+
+def ensure(months_ahead=3, today=None):
+    """
+    Creates the monthly partitions up to 'months_ahead' months after the current one
+    by splitting the catch-all partition. The first run after migration 0005 starts
+    at the month of the oldest expense, moving the existing rows once.
+
+    Args:
+        months_ahead (int): Number of future months that get a partition in advance.
+        today (date): Reference date (defaults to today).
+
+    Returns:
+        list[str]: Names of the partitions created.
+    """
+    today = today or date.today()
+    partitions = list_partitions()
+
+    first_month = month_start(today)
+    if all(partition['bound'] is None for partition in partitions):
+        with db_helper.get_db_cursor() as cursor:
+            cursor.execute("SELECT MIN(expense_date) AS first_date FROM expenses")
+            row = cursor.fetchone()
+        if row and row['first_date']:
+            first_month = month_start(row['first_date'])
+
+    planned = plan_new_partitions(partitions, first_month, add_months(month_start(today), months_ahead))
+    if not planned:
+        return []
+
+    definitions = ", ".join(f"PARTITION {name} VALUES LESS THAN ('{bound.isoformat()}')" for name, bound in planned)
+    logger.info("ensure: creating partitions %s", ", ".join(name for name, _ in planned))
+    with db_helper.get_db_cursor() as cursor:
+        cursor.execute(
+            f"ALTER TABLE expenses REORGANIZE PARTITION {FUTURE_PARTITION} INTO "
+            f"({definitions}, PARTITION {FUTURE_PARTITION} VALUES LESS THAN (MAXVALUE))"
+        )
+    return [name for name, _ in planned]
+
+
+def archive(older_than_years, mode="drop", today=None, dry_run=False):
+    """
+    Archives every monthly partition older than 'older_than_years' years.
+    Each month's rollup is verified against its raw rows first; a month whose
+    rollup disagrees is left alone (fix it with 'python rollup.py rebuild').
+
+    Args:
+        older_than_years (int): Months entirely before this many years ago are archived.
+        mode (str): 'drop' (keep only the rollup) or 'exchange' (move the rows to
+                    a standalone 'expenses_archive_pYYYYMM' table first).
+        today (date): Reference date (defaults to today).
+        dry_run (bool): If True, only reports what would be archived.
+
+    Returns:
+        list[dict]: The archived (or, with dry_run, archivable) partitions with their row counts.
+
+    Raises:
+        ValueError: If 'mode' is not supported.
+    """
+    if mode not in ("drop", "exchange"):
+        raise ValueError(f"Unsupported archive mode: {mode}")
+
+    today = today or date.today()
+    cutoff = month_start(today).replace(year=today.year - older_than_years)
+    archived = []
+
+    for partition in plan_archive(list_partitions(), cutoff):
+        name = partition['name']
+        with db_helper.get_db_cursor() as cursor:
+            cursor.execute(f"SELECT COUNT(*) AS n FROM expenses PARTITION ({name})")
+            partition['row_count'] = cursor.fetchone()['n']
+
+        last_day = date.fromordinal(partition['range_end'].toordinal() - 1)
+        start = partition['range_start'].isoformat() if partition['range_start'] else None
+        if rollup.verify(start, last_day.isoformat()):
+            logger.warning("archive: rollup of %s does not match its rows; skipped", name)
+            break
+
+        partition['archive_table'] = f"expenses_archive_{name}" if mode == "exchange" else None
+        archived.append(partition)
+        if dry_run:
+            continue
+
+        logger.info("archive: %s (%s rows, mode %s)", name, partition['row_count'], mode)
+        with db_helper.get_db_cursor() as cursor:
+            if mode == "exchange":
+                table = partition['archive_table']
+                cursor.execute(f"CREATE TABLE {table} LIKE expenses")
+                cursor.execute(f"ALTER TABLE {table} REMOVE PARTITIONING")
+                cursor.execute(f"ALTER TABLE expenses EXCHANGE PARTITION {name} WITH TABLE {table}")
+            # Record the month first: from here on its dates are read-only
+            cursor.execute(
+                "INSERT INTO expense_partition_archive "
+                "(partition_name, range_start, range_end, row_count, mode, archive_table) "
+                "VALUES (%s, %s, %s, %s, %s, %s)",
+                (name, partition['range_start'], partition['range_end'], partition['row_count'],
+                 mode, partition['archive_table'])
+            )
+            cursor.execute(f"ALTER TABLE expenses DROP PARTITION {name}")
+            # The notes of archived months leave the search index with them
+            cursor.execute("DELETE FROM expense_notes_fts WHERE expense_date < %s", (partition['range_end'],))
+
+    if archived and not dry_run:
+        db_helper.archive_watermark(refresh=True)
+    return archived
+
+
+def archived_months():
+    """
+    Returns the months archived so far.
+
+    Returns:
+        list[dict]: Rows of 'expense_partition_archive', oldest first.
+    """
+    with db_helper.get_db_cursor() as cursor:
+        cursor.execute("SELECT * FROM expense_partition_archive ORDER BY range_end")
+        return cursor.fetchall()
+
+
+# ---------------------- MAIN BLOCK: COMMAND LINE ----------------------
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Maintain the monthly partitions of the expenses table.")
+    parser.add_argument("command", choices=["status", "ensure", "archive"])
+    parser.add_argument("--months-ahead", type=int, default=3, help="Future months to create (ensure)")
+    parser.add_argument("--older-than-years", type=int, help="Archive months older than this (archive)")
+    parser.add_argument("--mode", choices=["drop", "exchange"], default="drop", help="What happens to archived rows")
+    parser.add_argument("--dry-run", action="store_true", help="Only list what would be archived")
+    args = parser.parse_args()
+
+    if args.command == "status":
+        for partition in list_partitions():
+            bound = partition['bound'] or "MAXVALUE"
+            print(f"{partition['name']:<10} < {bound}  (~{partition['table_rows']} rows)")
+        for month in archived_months():
+            print(f"archived {month['partition_name']} ({month['row_count']} rows, {month['mode']}) on {month['archived_at']}")
+    elif args.command == "ensure":
+        created = ensure(args.months_ahead)
+        print("\n".join(f"Created {name}" for name in created) or "Partitions are up to date")
+    else:
+        if args.older_than_years is None:
+            parser.error("archive requires --older-than-years")
+        for partition in archive(args.older_than_years, args.mode, dry_run=args.dry_run):
+            action = "Would archive" if args.dry_run else "Archived"
+            print(f"{action} {partition['name']} ({partition['row_count']} rows)")
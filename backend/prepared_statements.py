@@ -0,0 +1,200 @@
+'''
+Server-side prepared statements for db_helper.get_db_cursor().
+
+With EXPENSE_DB_PREPARED=1, the hot fixed-shape statements (db_helper.PREPARED_SQL)
+are prepared once per pooled connection and then executed with the binary
+protocol: MySQL skips parsing them again, and result values arrive already
+typed instead of as text. Every other statement runs on a regular cursor of
+the same connection, in the same transaction.
+
+A mysql.connector prepared cursor holds one statement, so each connection
+keeps one cursor per statement (StatementCache, least recently used evicted).
+The handles live as long as the connection; a reconnect starts a new cache.
+'''
+
+# Import necessary modules
+import struct                          # Float32 round trip for FLOAT columns
+import threading                       # Guards the hit/miss counters
+from collections import OrderedDict    # Least-recently-used order of the cached statements
+from mysql.connector import FieldType  # Column type codes of cursor.description
+
+# Counters shared by every StatementCache, served by GET /stats/pool
+_counter_lock = threading.Lock()
+_counters = {"prepares": 0, "executions": 0, "evictions": 0}
+
+
+def _count(name):
+    with _counter_lock:
+        _counters[name] += 1
+
+
+def statement_stats():
+    """
+    Returns how often statements were prepared, executed and evicted.
+
+    Returns:
+        dict: 'prepares', 'executions', 'evictions' and 'reuse_ratio'
+              (executions that did not need a prepare).
+    """
+    with _counter_lock:
+        stats = dict(_counters)
+    executions = stats["executions"]
+    stats["reuse_ratio"] = round(1 - stats["prepares"] / executions, 4) if executions else 0.0
+    return stats
+
+
+def float32_text(value):
+    """
+    Returns the shortest decimal that reads back as the same FLOAT.
+    The text protocol sends FLOAT columns formatted this way ('12.3'); the
+    binary protocol sends the raw single-precision value (12.300000190734863).
+
+    Args:
+        value (float): A FLOAT column value.
+
+    Returns:
+        float: The value as the text protocol would have returned it.
+    """
+    single = struct.unpack("f", struct.pack("f", value))[0]
+    for digits in range(1, 10):
+        candidate = float(f"{value:.{digits}g}")
+        if struct.unpack("f", struct.pack("f", candidate))[0] == single:
+            return candidate
+    return value
+
+
+class StatementCache:
+    """
+    The prepared statements of one connection.
+
+    Args:
+        connection: A mysql.connector connection.
+        max_statements (int): Statements kept prepared; the least recently
+            used one is closed (deallocated on the server) beyond that.
+    """
+
+    def __init__(self, connection, max_statements=32):
+        self.connection = connection
+        self.max_statements = max_statements
+        self._cursors = OrderedDict()   # (sql, dictionary) -> (sql, prepared cursor)
+
+    def __len__(self):
+        return len(self._cursors)
+
+    def cursor_for(self, sql, dictionary):
+        """
+        Returns the prepared cursor of a statement, creating it on first use.
+
+        Returns:
+            tuple: (sql, cursor). Execute the returned 'sql' object: the connector
+                   only reuses its statement handle for the very same string object.
+        """
+        key = (sql, dictionary)
+        entry = self._cursors.get(key)
+        if entry is not None:
+            self._cursors.move_to_end(key)
+            return entry
+
+        _count("prepares")
+        entry = self._cursors[key] = (sql, self.connection.cursor(prepared=True, dictionary=dictionary))
+        if len(self._cursors) > self.max_statements:
+            _, (_, oldest) = self._cursors.popitem(last=False)
+            oldest.close()
+            _count("evictions")
+        return entry
+
+
+class PreparedCursor:
+    """
+    Cursor facade used by get_db_cursor() when prepared statements are enabled.
+    Statements in 'prepared_sql' go to the connection's StatementCache; anything
+    else (dynamic IN lists, batched INSERTs, streaming reads) to a regular cursor.
+
+    Args:
+        cache (StatementCache): Prepared statements of the borrowed connection.
+        prepared_sql (frozenset): Statements worth preparing.
+        dictionary (bool): Rows as dicts (True) or tuples (False).
+    """
+
+    def __init__(self, cache, prepared_sql, dictionary=True):
+        self._cache = cache
+        self._prepared_sql = prepared_sql
+        self._dictionary = dictionary
+        self._plain = None
+        self._cursor = None
+        self._float_columns = ()
+
+    def __getattr__(self, name):
+        # rowcount, lastrowid, description, column_names, ... of the last statement
+        return getattr(self._cursor, name)
+
+    def __iter__(self):
+        return iter(self.fetchone, None)
+
+    # ------------------------- DB-API -------------------------
+    def execute(self, operation, params=None):
+        if operation in self._prepared_sql:
+            operation, self._cursor = self._cache.cursor_for(operation, self._dictionary)
+            _count("executions")
+            result = self._cursor.execute(operation, params)
+            self._float_columns = self._find_float_columns()
+            return result
+        self._cursor = self._plain_cursor()
+        self._float_columns = ()
+        return self._cursor.execute(operation, params)
+
+    def executemany(self, operation, seq_params):
+        # The regular cursor rewrites batched INSERTs into one multi-row statement
+        self._cursor = self._plain_cursor()
+        self._float_columns = ()
+        return self._cursor.executemany(operation, seq_params)
+
+    def fetchone(self):
+        row = self._cursor.fetchone()
+        return self._convert(row) if row is not None and self._float_columns else row
+
+    def fetchmany(self, size=1):
+        return self._convert_all(self._cursor.fetchmany(size))
+
+    def fetchall(self):
+        return self._convert_all(self._cursor.fetchall())
+
+    def close(self):
+        """
+        Closes the regular cursor; prepared statements stay with the connection.
+
+        Raises:
+            RuntimeError: If a prepared statement still has unread rows (the
+                connection cannot run another statement and must be discarded).
+        """
+        if self._plain is not None:
+            self._plain.close()
+        if self._cache.connection.unread_result:
+            raise RuntimeError("Prepared statement closed with unread rows")
+
+    # ------------------------- HELPERS -------------------------
+    def _plain_cursor(self):
+        if self._plain is None:
+            self._plain = self._cache.connection.cursor(dictionary=self._dictionary)
+        return self._plain
+
+    def _find_float_columns(self):
+        description = self._cursor.description or ()
+        return tuple(
+            column[0] if self._dictionary else index
+            for index, column in enumerate(description)
+            if column[1] == FieldType.FLOAT
+        )
+
+    def _convert(self, row):
+        if not self._dictionary:
+            row = list(row)
+        for column in self._float_columns:
+            if row[column] is not None:
+                row[column] = float32_text(row[column])
+        return row if self._dictionary else tuple(row)
+
+    def _convert_all(self, rows):
+        if not self._float_columns:
+            return rows
+        return [self._convert(row) for row in rows]
@@ -0,0 +1,345 @@
+'''
+Statement-level profiling for db_helper.get_db_cursor().
+
+Every statement run through a pooled cursor is timed (execute plus the
+fetches that read its rows) and aggregated in memory per db_helper function
+and normalised SQL text; the aggregate is served by GET /stats/queries.
+Statements slower than the threshold are also written as JSON lines to a
+dedicated slow-query log, optionally with their EXPLAIN plan. Parameter
+values are never recorded, only their types.
+
+Profiling is off by default (EXPENSE_QUERY_PROFILING=1 enables it): every
+profiled statement pays a wrapper call per execute/fetch, SQL normalisation
+and a shared lock, which is worth it while investigating but not on every
+production request.
+
+Summarise a slow-query log (from the backend folder):
+
+    python query_profiler.py slow_query.log [--top 10] [--sort total_ms|max_ms|calls]
+'''
+
+# Import necessary modules
+import argparse                        # Command-line parsing for the log summary
+import functools                       # Caches normalised SQL per statement text
+import json                            # Slow-query log entries are JSON lines
+import os                              # Reads profiler settings from environment variables
+import re                              # Normalises SQL text for aggregation
+import threading                       # Guards the in-memory aggregate
+import time                            # High-resolution timer for statements
+from datetime import datetime, timezone
+from logging_setup import setup_logger # Queued, rotated writer for the slow-query log
+from metrics import CURRENT_QUERY_FUNCTION  # Name of the db_helper function running the statement
+
+# Profiler settings (environment variables)
+PROFILER_CONFIG = {
+    "enabled":      os.getenv("EXPENSE_QUERY_PROFILING", "0") in ("1", "true", "yes"),
+    "threshold_ms": float(os.getenv("EXPENSE_SLOW_QUERY_MS", "100")),
+    "log_file":     os.getenv("EXPENSE_SLOW_QUERY_LOG", "slow_query.log"),
+    "explain":      os.getenv("EXPENSE_SLOW_QUERY_EXPLAIN", "0") in ("1", "true", "yes"),
+}
+
+# Statements are aggregated by shape; bound the number of distinct shapes kept
+MAX_TRACKED_STATEMENTS = 1000
+
+# "IN (%s, %s, %s)" / "VALUES (%s, %s), (%s, %s)" collapse to one shape regardless of length
+_PLACEHOLDER_LIST = re.compile(r"\(\s*%s(?:\s*,\s*%s)*\s*\)(?:\s*,\s*\(\s*%s(?:\s*,\s*%s)*\s*\))*")
+_WHITESPACE = re.compile(r"\s+")
+_EXPLAINABLE = ("select", "delete", "update", "insert", "replace")
+
+
+@functools.lru_cache(maxsize=2048)
+def normalize_sql(sql):
+    """Collapses whitespace and placeholder lists so equal statements share one key."""
+    if isinstance(sql, bytes):
+        sql = sql.decode("utf-8", "replace")
+    return _PLACEHOLDER_LIST.sub("(%s, ...)", _WHITESPACE.sub(" ", sql).strip())
+
+
+def param_shape(params, batch=None):
+    """
+    Describes parameters without their values, e.g. '(date, str)' or '(date, float, str, str) x 120'.
+
+    Args:
+        params (tuple|dict|None): Parameters of one execution.
+        batch (int): Number of parameter sets for executemany().
+    """
+    if params is None:
+        shape = "()"
+    elif isinstance(params, dict):
+        shape = "{" + ", ".join(f"{key}: {type(value).__name__}" for key, value in params.items()) + "}"
+    else:
+        shape = "(" + ", ".join(type(value).__name__ for value in params) + ")"
+    return f"{shape} x {batch}" if batch is not None else shape
+
+
+class ProfiledCursor:
+    """
+    Proxy around a DB-API cursor that times each statement. A statement is
+    finished (and recorded) when the next one starts or the cursor closes, so
+    the time spent fetching unbuffered rows is included.
+
+    Args:
+        cursor: The real cursor (mysql.connector dictionary cursor).
+        profiler (QueryProfiler): Where finished statements are recorded.
+    """
+
+    def __init__(self, cursor, profiler):
+        self._cursor = cursor
+        self._profiler = profiler
+        self._current = None
+        self.slow = []          # Slow statements waiting for flush() (EXPLAIN needs an idle connection)
+
+    def __getattr__(self, name):
+        return getattr(self._cursor, name)
+
+    def __iter__(self):
+        return iter(self.fetchone, None)
+
+    def _start(self, sql, params, shape, batch=False):
+        self._finish()
+        self._current = {
+            "function": CURRENT_QUERY_FUNCTION.get() or "-",
+            "sql": sql,
+            "params": params,
+            "batch": batch,
+            "shape": shape,
+            "elapsed": 0.0,
+            "fetched": 0,
+        }
+
+    def _finish(self):
+        current, self._current = self._current, None
+        if current is not None:
+            rowcount = getattr(self._cursor, "rowcount", -1) or 0
+            current["rows"] = max(rowcount, current["fetched"])
+            self._profiler.record(current, self)
+
+    def _timed(self, method, *args, **kwargs):
+        started = time.perf_counter()
+        try:
+            return method(*args, **kwargs)
+        finally:
+            if self._current is not None:
+                self._current["elapsed"] += time.perf_counter() - started
+
+    # ------------------------- DB-API -------------------------
+    def execute(self, operation, params=None, *args, **kwargs):
+        self._start(operation, params, param_shape(params))
+        return self._timed(self._cursor.execute, operation, params, *args, **kwargs)
+
+    def executemany(self, operation, seq_params, *args, **kwargs):
+        seq_params = list(seq_params)
+        self._start(operation, None, param_shape(seq_params[0] if seq_params else None, len(seq_params)), batch=True)
+        return self._timed(self._cursor.executemany, operation, seq_params, *args, **kwargs)
+
+    def fetchone(self):
+        row = self._timed(self._cursor.fetchone)
+        if row is not None and self._current is not None:
+            self._current["fetched"] += 1
+        return row
+
+    def fetchmany(self, size=1):
+        rows = self._timed(self._cursor.fetchmany, size)
+        if self._current is not None:
+            self._current["fetched"] += len(rows)
+        return rows
+
+    def fetchall(self):
+        rows = self._timed(self._cursor.fetchall)
+        if self._current is not None:
+            self._current["fetched"] += len(rows)
+        return rows
+
+    def close(self):
+        self._finish()
+        return self._cursor.close()
+
+
+class QueryProfiler:
+    """
+    Aggregates statement timings and writes slow statements to a JSON lines log.
+
+    Args:
+        enabled (bool): If False, get_db_cursor() uses the raw cursor (no overhead).
+        threshold_ms (float): Statements at or above this duration are logged as slow.
+        log_file (str): Path of the slow-query log.
+        explain (bool): Capture EXPLAIN output for slow statements.
+    """
+
+    def __init__(self, enabled=True, threshold_ms=100.0, log_file="slow_query.log", explain=False):
+        self.enabled = enabled
+        self.threshold_ms = threshold_ms
+        self.log_file = log_file
+        self.explain = explain
+        self._stats = {}
+        self._lock = threading.Lock()
+        self._logger = None
+
+    def wrap(self, cursor):
+        """Returns a ProfiledCursor around 'cursor'."""
+        return ProfiledCursor(cursor, self)
+
+    def record(self, statement, cursor):
+        """Adds a finished statement to the aggregate; slow ones are queued on the cursor."""
+        duration_ms = 1000 * statement["elapsed"]
+        slow = duration_ms >= self.threshold_ms
+        key = (statement["function"], normalize_sql(statement["sql"]))
+        with self._lock:
+            entry = self._stats.get(key)
+            if entry is None:
+                if len(self._stats) >= MAX_TRACKED_STATEMENTS:
+                    key = (statement["function"], "(other statements)")
+                    entry = self._stats.get(key)
+                if entry is None:
+                    entry = self._stats[key] = {"calls": 0, "total_ms": 0.0, "max_ms": 0.0, "rows": 0, "slow": 0}
+            entry["calls"] += 1
+            entry["total_ms"] += duration_ms
+            entry["max_ms"] = max(entry["max_ms"], duration_ms)
+            entry["rows"] += statement["rows"]
+            entry["slow"] += slow
+        if slow:
+            statement["duration_ms"] = duration_ms
+            cursor.slow.append(statement)
+
+    def flush(self, cursor, connection=None):
+        """
+        Writes the slow statements of a finished cursor to the slow-query log.
+        Called by get_db_cursor() once the connection is idle, so EXPLAIN can
+        run on it; never raises.
+
+        Args:
+            cursor (ProfiledCursor): The cursor that was handed to the caller.
+            connection: The idle connection for EXPLAIN, or None to skip it.
+        """
+        slow, cursor.slow = cursor.slow, []
+        for statement in slow:
+            entry = {
+                "time": datetime.now(timezone.utc).isoformat(timespec="milliseconds"),
+                "function": statement["function"],
+                "sql": normalize_sql(statement["sql"]),
+                "params": statement["shape"],
+                "rows": statement["rows"],
+                "duration_ms": round(statement["duration_ms"], 3),
+            }
+            if self.explain and connection is not None and not statement["batch"]:
+                entry["explain"] = self._explain(connection, statement)
+            try:
+                self._get_logger().warning("%s", json.dumps(entry, default=str))
+            except Exception:
+                pass
+
+    def _explain(self, connection, statement):
+        """Runs EXPLAIN for a statement with its original parameters (None if not possible)."""
+        sql = statement["sql"].decode() if isinstance(statement["sql"], bytes) else statement["sql"]
+        if not sql.lstrip().lower().startswith(_EXPLAINABLE):
+            return None
+        try:
+            cursor = connection.cursor(dictionary=True)
+            try:
+                cursor.execute("EXPLAIN " + sql, statement["params"])
+                return cursor.fetchall()
+            finally:
+                cursor.close()
+        except Exception as error:
+            return f"EXPLAIN failed: {error}"
+
+    def _get_logger(self):
+        if self._logger is None:
+            self._logger = setup_logger('slow_query', log_file=self.log_file, format="raw")
+            self._logger.propagate = False      # Keep JSON lines out of server.log handlers
+        return self._logger
+
+    def top(self, n=10, sort="total_ms"):
+        """
+        Returns the N most expensive statement shapes.
+
+        Args:
+            n (int): Number of statements returned.
+            sort (str): 'total_ms', 'max_ms', 'calls', 'rows' or 'slow'.
+
+        Returns:
+            list[dict]: function, sql, calls, total_ms, avg_ms, max_ms, rows and slow per statement.
+        """
+        with self._lock:
+            items = [(key, dict(entry)) for key, entry in self._stats.items()]
+        report = [
+            {
+                "function": function,
+                "sql": sql,
+                "calls": entry["calls"],
+                "total_ms": round(entry["total_ms"], 3),
+                "avg_ms": round(entry["total_ms"] / entry["calls"], 3),
+                "max_ms": round(entry["max_ms"], 3),
+                "rows": entry["rows"],
+                "slow": entry["slow"],
+            }
+            for (function, sql), entry in items
+        ]
+        report.sort(key=lambda row: row[sort], reverse=True)
+        return report[:n]
+
+    def reset(self):
+        """Clears the in-memory aggregate."""
+        with self._lock:
+            self._stats.clear()
+
+
+def summarize_log(lines, n=10, sort="total_ms"):
+    """
+    Aggregates slow-query log lines by (function, sql).
+
+    Args:
+        lines (iterable[str]): JSON lines from the slow-query log.
+        n (int): Number of statements returned.
+        sort (str): 'total_ms', 'max_ms' or 'calls'.
+
+    Returns:
+        list[dict]: function, sql, calls, total_ms, avg_ms and max_ms per statement.
+    """
+    totals = {}
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            entry = json.loads(line)
+        except ValueError:
+            continue
+        key = (entry.get("function", "-"), entry.get("sql", ""))
+        total = totals.setdefault(key, {"calls": 0, "total_ms": 0.0, "max_ms": 0.0})
+        total["calls"] += 1
+        total["total_ms"] += entry.get("duration_ms", 0.0)
+        total["max_ms"] = max(total["max_ms"], entry.get("duration_ms", 0.0))
+
+    report = [
+        {
+            "function": function, "sql": sql, "calls": total["calls"],
+            "total_ms": round(total["total_ms"], 3),
+            "avg_ms": round(total["total_ms"] / total["calls"], 3),
+            "max_ms": round(total["max_ms"], 3),
+        }
+        for (function, sql), total in totals.items()
+    ]
+    report.sort(key=lambda row: row[sort], reverse=True)
+    return report[:n]
+
+
+# Process-wide profiler used by db_helper.get_db_cursor()
+profiler = QueryProfiler(**PROFILER_CONFIG)
+
+
+# ---------------------- MAIN BLOCK: COMMAND LINE ----------------------
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Summarise the slow-query log.")
+    parser.add_argument("log_file", nargs="?", default=PROFILER_CONFIG["log_file"], help="Slow-query log file")
+    parser.add_argument("--top", type=int, default=10, help="Number of statements shown")
+    parser.add_argument("--sort", choices=["total_ms", "max_ms", "calls"], default="total_ms")
+    args = parser.parse_args()
+
+    with open(args.log_file, encoding="utf-8") as handle:
+        report = summarize_log(handle, args.top, args.sort)
+
+    print(f"{'total ms':>12}{'calls':>8}{'avg ms':>10}{'max ms':>10}  function / sql")
+    for row in report:
+        print(f"{row['total_ms']:>12}{row['calls']:>8}{row['avg_ms']:>10}{row['max_ms']:>10}  {row['function']}")
+        print(f"{'':>42}{row['sql']}")
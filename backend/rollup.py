@@ -0,0 +1,182 @@
+'''
+Maintenance commands for the 'expense_daily_rollup' table read by analytics.
+
+Run from the backend folder:
+
+    python rollup.py rebuild [--start YYYY-MM-DD --end YYYY-MM-DD] # Recompute from raw expenses
+    python rollup.py verify  [--start YYYY-MM-DD --end YYYY-MM-DD] # Compare with raw expenses
+
+The table itself is created by migration 0003 ('python migrate.py upgrade').
+'rebuild' also recomputes the month-to-date totals of the months it touches
+('expense_monthly_totals', migration 0006) from the rebuilt rollup.
+'verify' exits with status 1 if any (date, category) pair disagrees.
+Archived months ('python partitions.py archive') have no raw rows left, so
+both commands skip dates before the archive watermark.
+'''
+
+# Import necessary modules
+import argparse                        # Command-line parsing for the maintenance commands
+import sys                             # Exit status for 'verify'
+from datetime import date              # Month bounds for the monthly totals
+from decimal import Decimal            # Exact comparison of monetary sums
+from db_helper import get_db_cursor, archive_watermark  # Pooled cursors; first non-archived date
+from db_helper import NOTES_INDEX_COLUMNS  # Columns copied into the note search index
+from logging_setup import setup_logger # Custom logging setup module
+
+# Initialize a logger specific to this module for consistent logging
+logger = setup_logger('rollup')
+
+
+def _money(value):
+    """Normalises a FLOAT/DECIMAL sum from MySQL to a 2-decimal Decimal for comparison."""
+    return Decimal(str(value)).quantize(Decimal("0.01"))
+
+
+def _range_filter(start_date, end_date):
+    """
+    Builds the optional 'WHERE expense_date BETWEEN ...' clause and its parameters,
+    starting no earlier than the archive watermark (archived rollup rows are final).
+    """
+    watermark = archive_watermark(refresh=True)
+    if watermark is not None and (not start_date or str(start_date) < watermark.isoformat()):
+        start_date = watermark.isoformat()
+    if start_date and end_date:
+        return " WHERE expense_date BETWEEN %s AND %s", (start_date, end_date)
+    if start_date:
+        return " WHERE expense_date >= %s", (start_date,)
+    if end_date:
+        return " WHERE expense_date <= %s", (end_date,)
+    return "", ()
+
+
+def _month_bounds(start_date, end_date):
+    """
+    Widens a date range to whole months.
+
+    Returns:
+        tuple[date | None, date | None]: First day of the first month and first day
+                                         of the month after the last one (None if open).
+    """
+    first = date.fromisoformat(str(start_date)).replace(day=1) if start_date else None
+    after = None
+    if end_date:
+        last = date.fromisoformat(str(end_date))
+        after = date(last.year + last.month // 12, last.month % 12 + 1, 1)
+    return first, after
+
+
+def rebuild(start_date=None, end_date=None):
+    """
+    Recomputes rollup rows from the raw 'expenses' table in one transaction,
+    then the monthly totals of every month overlapping the range and the
+    note search index of the range.
+
+    Args:
+        start_date (str): Optional first date to rebuild (inclusive).
+        end_date (str): Optional last date to rebuild (inclusive).
+
+    Returns:
+        int: Number of rollup rows written.
+    """
+    where, params = _range_filter(start_date, end_date)
+    logger.info("rebuild called for range %s - %s", start_date, end_date)
+
+    with get_db_cursor(commit=True) as cursor:
+        cursor.execute("DELETE FROM expense_daily_rollup" + where, params)
+        cursor.execute(
+            "INSERT INTO expense_daily_rollup (expense_date, category, total_amount, expense_count) "
+            "SELECT expense_date, category, SUM(amount), COUNT(*) FROM expenses" + where +
+            " GROUP BY expense_date, category",
+            params
+        )
+        written = cursor.rowcount
+
+        # Whole months are recomputed from the rollup, which also covers archived days
+        first, after = _month_bounds(start_date, end_date)
+        conditions, month_params = [], []
+        if first:
+            conditions.append("expense_date >= %s")
+            month_params.append(first)
+        if after:
+            conditions.append("expense_date < %s")
+            month_params.append(after)
+        rollup_where = (" WHERE " + " AND ".join(conditions)) if conditions else ""
+        cursor.execute(
+            "DELETE FROM expense_monthly_totals" + rollup_where.replace("expense_date", "month"),
+            month_params
+        )
+        cursor.execute(
+            "INSERT INTO expense_monthly_totals (month, category, total_amount, expense_count) "
+            "SELECT DATE_SUB(expense_date, INTERVAL DAYOFMONTH(expense_date) - 1 DAY) AS month, category, "
+            "SUM(total_amount), SUM(expense_count) FROM expense_daily_rollup" + rollup_where +
+            " GROUP BY month, category",
+            month_params
+        )
+
+        # The note search index is a copy of the same rows: rebuild it alongside
+        cursor.execute("DELETE FROM expense_notes_fts" + where, params)
+        cursor.execute(
+            f"INSERT INTO expense_notes_fts ({NOTES_INDEX_COLUMNS}) SELECT {NOTES_INDEX_COLUMNS} FROM expenses" +
+            (where + " AND" if where else " WHERE") + " notes IS NOT NULL AND notes <> ''",
+            params
+        )
+        return written
+
+
+def verify(start_date=None, end_date=None):
+    """
+    Compares the rollup with aggregates computed from the raw 'expenses' table.
+
+    Args:
+        start_date (str): Optional first date to check (inclusive).
+        end_date (str): Optional last date to check (inclusive).
+
+    Returns:
+        list[dict]: One entry per mismatching (date, category) with the expected
+                    (raw) and actual (rollup) sum and count. Empty if consistent.
+    """
+    where, params = _range_filter(start_date, end_date)
+
+    with get_db_cursor() as cursor:
+        cursor.execute(
+            "SELECT expense_date, category, SUM(amount) AS total, COUNT(*) AS n FROM expenses" + where +
+            " GROUP BY expense_date, category",
+            params
+        )
+        expected = {(row['expense_date'], row['category']): (_money(row['total']), row['n']) for row in cursor.fetchall()}
+
+        cursor.execute(
+            "SELECT expense_date, category, total_amount AS total, expense_count AS n FROM expense_daily_rollup" + where,
+            params
+        )
+        actual = {(row['expense_date'], row['category']): (_money(row['total']), row['n']) for row in cursor.fetchall()}
+
+    mismatches = []
+    for key in sorted(expected.keys() | actual.keys()):
+        if expected.get(key) != actual.get(key):
+            mismatches.append({
+                "expense_date": key[0],
+                "category": key[1],
+                "expected": expected.get(key),
+                "actual": actual.get(key),
+            })
+    return mismatches
+
+
+# ---------------------- MAIN BLOCK: COMMAND LINE ----------------------
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Maintain the expense_daily_rollup table.")
+    parser.add_argument("command", choices=["rebuild", "verify"])
+    parser.add_argument("--start", help="First date (YYYY-MM-DD), inclusive")
+    parser.add_argument("--end", help="Last date (YYYY-MM-DD), inclusive")
+    args = parser.parse_args()
+
+    if args.command == "rebuild":
+        print(f"Rebuilt {rebuild(args.start, args.end)} rollup rows")
+    else:
+        problems = verify(args.start, args.end)
+        for problem in problems:
+            print(f"MISMATCH {problem['expense_date']} {problem['category']}: "
+                  f"expected {problem['expected']}, rollup has {problem['actual']}")
+        print("Rollup is consistent" if not problems else f"{len(problems)} mismatching rows")
+        sys.exit(1 if problems else 0)
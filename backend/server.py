@@ -1,10 +1,26 @@
 # Import necessary modules and dependencies
-from http.client import HTTPException   # Used to raise HTTP-related errors
-from fastapi import FastAPI             # The core FastAPI class for creating the web API
+from contextlib import asynccontextmanager  # Used to build the application lifespan handler
+from fastapi import FastAPI, HTTPException, Query, UploadFile, Header, Response  # Core FastAPI class, HTTP errors, params
+from fastapi.responses import StreamingResponse, PlainTextResponse  # Chunked output / plain-text metrics
 from datetime import date               # For handling and validating date objects
+import csv                              # CSV encoding for range exports
+import io                               # In-memory text buffer used to encode CSV chunks
+import json                             # ASCII-safe JSON for the X-Budget-Alerts header
 import db_helper                        # Local module containing database CRUD operations
-from typing import List                 # For type hinting lists (used in Pydantic models and endpoints)
-from pydantic import BaseModel           # Base class for defining request/response data models
+import bulk_import                      # Chunked CSV import pipeline
+import trends                           # Vectorized (pandas) trend post-processing
+import streaming_stats                  # Single-pass per-category statistics (Welford + t-digest)
+import snapshot                         # Columnar (Parquet + DuckDB) engine for long analytics ranges
+import metrics                          # Request/query histograms and pool/cache gauges
+from db_router import ReadRoutingMiddleware  # Per-request replica choice and read-your-writes pinning
+from fast_responses import (            # orjson responses and brotli/gzip compression
+    FastJSONResponse, CompressionMiddleware, RESPONSE_CONFIG, dumps,
+)
+from query_profiler import profiler     # Per-statement timings collected by db_helper.get_db_cursor()
+from ingest_buffer import IngestBuffer, BufferClosedError, RequestTooLargeError, INGEST_CONFIG  # Batched high-rate ingestion
+from analytics_cache import summary_cache  # In-process LRU cache for analytics results
+from typing import List, Literal, Optional  # For type hinting lists, fixed choices and optional headers
+from pydantic import BaseModel, Field    # Base class for request/response data models, field constraints
 
 # -------------------------------------------------------------------------
 # Run the API with:
@@ -16,8 +32,47 @@ from pydantic import BaseModel           # Base class for defining request/respo
 # from logging_setup import setup_logger
 # logger = setup_logger('server')
 
-# Instantiate the FastAPI application
-app = FastAPI()
+# Rows posted to /ingest/expenses are written in batches by a background thread
+ingest_buffer = IngestBuffer(
+    write_batch=lambda rows: db_helper.insert_expenses_batch(rows),
+    on_flush=lambda dates: summary_cache.invalidate_dates(*dates),
+    **INGEST_CONFIG,
+)
+
+
+@asynccontextmanager
+async def lifespan(app):
+    """Starts the ingest flusher (and snapshot refresher, if configured); drains both on shutdown."""
+    ingest_buffer.start()
+    snapshot.start_refresher()
+    yield
+    snapshot.stop_refresher()
+    ingest_buffer.close()
+
+
+# Instantiate the FastAPI application (responses are encoded with orjson when available)
+app = FastAPI(lifespan=lifespan, default_response_class=FastJSONResponse)
+
+# Compress large responses (brotli if installed and accepted, otherwise gzip)
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=RESPONSE_CONFIG["minimum_size"],
+    gzip_level=RESPONSE_CONFIG["gzip_level"],
+    brotli_quality=RESPONSE_CONFIG["brotli_quality"],
+)
+
+# Route each request's reads to one replica (or the primary right after the client wrote)
+app.add_middleware(ReadRoutingMiddleware)
+
+# Time every request by route template and status code (exposed on GET /metrics).
+# Added last, so it is the outermost middleware and includes compression time.
+app.add_middleware(metrics.RequestMetricsMiddleware)
+
+# Pool and cache statistics are read only when /metrics is scraped
+metrics.register_gauges("expense_db_pool", "Database connection pool statistics", db_helper.get_pool_stats)
+metrics.register_gauges("expense_analytics_cache", "Analytics cache statistics", summary_cache.stats)
+metrics.register_gauges("expense_db_routing", "Primary/replica read routing statistics", db_helper.router.stats)
+metrics.register_gauges("expense_ingest", "Ingest buffer statistics", ingest_buffer.stats)
 
 
 # ----------------------------- Pydantic Models -----------------------------
@@ -35,6 +90,66 @@ class Expense(BaseModel):
     notes    : str
 
 
+class StoredExpense(Expense):
+    """
+    An expense as stored in the DB, with its stable row id.
+
+    Attributes:
+        id (int): Primary key of the row; unchanged by PATCH /expenses/{date} updates.
+    """
+    id : int
+
+
+class ExpenseUpdate(BaseModel):
+    """
+    Partial update of one stored expense; omitted fields keep their value.
+
+    Attributes:
+        id (int): Id of the row to change.
+        amount (float): New amount (optional).
+        category (str): New category (optional).
+        notes (str): New notes (optional).
+    """
+    id       : int
+    amount   : Optional[float] = None
+    category : Optional[str] = None
+    notes    : Optional[str] = None
+
+
+class ExpenseChanges(BaseModel):
+    """
+    Row-level changes to one date, applied in a single transaction.
+
+    Attributes:
+        inserts (List[Expense]): New rows.
+        updates (List[ExpenseUpdate]): Changed rows, by id.
+        deletes (List[int]): Ids of removed rows.
+    """
+    inserts : List[Expense] = []
+    updates : List[ExpenseUpdate] = []
+    deletes : List[int] = []
+
+
+class IngestExpense(Expense):
+    """
+    An expense pushed to the ingest endpoint, carrying its own date.
+
+    Attributes:
+        expense_date (date): Date of the expense.
+    """
+    expense_date : date
+
+
+class Budget(BaseModel):
+    """
+    Monthly spending limit of a category.
+
+    Attributes:
+        monthly_limit (float): Limit per calendar month; must be positive.
+    """
+    monthly_limit : float = Field(gt=0)
+
+
 class DateRange(BaseModel):
     """
     Data model representing a date range used for analytics queries.
@@ -47,69 +162,379 @@ class DateRange(BaseModel):
     end_date   : date
 
 
+class TrendRequest(DateRange):
+    """
+    Date range plus the size of the buckets used for trend analytics.
+
+    Attributes:
+        granularity (str): 'day', 'week' (starting Monday) or 'month'.
+    """
+    granularity : Literal["day", "week", "month"] = "month"
+
+
+# ----------------------------- HELPER FUNCTIONS -----------------------------
+def build_analytics_breakdown(data):
+    """
+    Converts category-wise sums from the DB into the analytics response shape.
+
+    Args:
+        data (list[dict]): Rows with 'category' and 'sum(amount)' keys.
+
+    Returns:
+        dict: A mapping of categories to their total and percentage values.
+    """
+    # Compute total spending across all categories in the date range
+    total = sum([row['sum(amount)'] for row in data])
+
+    # Initialize dictionary to store category-wise breakdown
+    braakdown = {}
+
+    # For each category, compute total spent and its percentage of the grand total
+    for row in data:
+        percentage = 100 * row['sum(amount)'] / total if total != 0 else 0
+        braakdown[row['category']] = {
+            "total": row['sum(amount)'],
+            "percentage": percentage
+        }
+
+    # Final JSON structure returned to the frontend example:
+    # {
+    #     "Rent":     {"total": 1234, "percentage": 34.45},
+    #     "Shopping": {"total": 2234, "percentage": 64.45}
+    # }
+    return braakdown
+
+
+# ----------------------------- CONDITIONAL GET (ETAGS) -----------------------------
+# Clients may keep a response but must revalidate it (If-None-Match) before reuse
+VALIDATE_CACHE_CONTROL = "private, no-cache"
+
+
+# ETags are weak: they identify the data, not the bytes, so the same ETag is
+# valid for the identity, gzip and brotli encodings of a response.
+def date_etag(expense_date, version):
+    """ETag of one day's expenses, derived from its version counter."""
+    return f'W/"d{expense_date}.{version}"'
+
+
+def range_etag(start_date, end_date, range_version):
+    """ETag of a date range, derived from db_helper.fetch_range_version()."""
+    dates, version = range_version
+    return f'W/"r{start_date}.{end_date}.{dates}.{version}"'
+
+
+def etag_matches(if_none_match, etag):
+    """
+    Weak comparison of an If-None-Match header with the current ETag.
+
+    Args:
+        if_none_match (str): Header value, e.g. 'W/"d2024-08-01.3"' or 'W/"a", "b"' or '*'.
+        etag (str): The current ETag.
+
+    Returns:
+        bool: True if the client's copy is current.
+    """
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    opaque = etag.removeprefix("W/")
+    return any(candidate.strip().removeprefix("W/") == opaque for candidate in if_none_match.split(","))
+
+
+def validator_headers(etag):
+    """ETag and revalidation headers for a response (none if 'etag' is None)."""
+    return {"ETag": etag, "Cache-Control": VALIDATE_CACHE_CONTROL} if etag else {}
+
+
+def not_modified(etag):
+    """Empty '304 Not Modified' response carrying the validator."""
+    return Response(status_code=304, headers=validator_headers(etag))
+
+
+def finish_response(content, response, etag=None, headers=None):
+    """
+    Returns an endpoint's result through the fast path: a FastJSONResponse
+    encoded in one orjson call, skipping response_model re-validation and
+    jsonable_encoder (the content comes from the DB or was validated on input).
+    With EXPENSE_FAST_RESPONSES=0 the content is returned as-is for FastAPI
+    to validate and encode.
+
+    Args:
+        content: JSON-compatible result (Decimal and date values are allowed).
+        response (Response): The endpoint's response, used for headers on the slow path.
+        etag (str): Optional ETag to attach.
+        headers (dict): Optional extra headers (e.g. budget_alert_headers()).
+
+    Returns:
+        FastJSONResponse | object: The response, or 'content' on the slow path.
+    """
+    headers = {**validator_headers(etag), **(headers or {})}
+    if RESPONSE_CONFIG["fast"]:
+        return FastJSONResponse(content, headers=headers)
+    response.headers.update(headers)
+    return content
+
+
+def budget_alert_headers(alerts):
+    """
+    X-Budget-Alerts header listing the budgets a write pushed over their limit.
+    The body of write endpoints keeps its shape; clients that care read the header.
+
+    Args:
+        alerts (list[dict]): Output of db_helper.crossed_budgets().
+
+    Returns:
+        dict: The header (JSON list, ASCII-escaped), or {} if no budget was crossed.
+    """
+    if not alerts:
+        return {}
+    return {"X-Budget-Alerts": json.dumps(
+        [
+            {
+                "category": alert['category'],
+                "month": alert['month'].isoformat(),
+                "monthly_limit": float(alert['monthly_limit']),
+                "total": float(alert['total']),
+            }
+            for alert in alerts
+        ],
+        separators=(",", ":"),
+    )}
+
+
+# Fields of the StoredExpense response model, in output order
+EXPENSE_FIELDS = ("id", "amount", "category", "notes")
+
+
+def expense_rows(rows):
+    """Projects DB rows onto the StoredExpense response fields."""
+    return [{field: row[field] for field in EXPENSE_FIELDS} for row in rows]
+
+
+# Columns written by the range export, in output order
+EXPORT_FIELDS = ["id", "expense_date", "amount", "category", "notes"]
+
+
+def encode_export_chunks(rows, export_format, rows_per_chunk=500):
+    """
+    Encodes expense rows as NDJSON or CSV text, grouping rows into chunks so the
+    response is sent in reasonably sized pieces instead of one write per row.
+
+    Args:
+        rows (iterable[dict]): Expense records, e.g. from db_helper.stream_expenses_between().
+        export_format (str): 'ndjson' or 'csv'.
+        rows_per_chunk (int): Number of rows encoded per yielded chunk.
+
+    Yields:
+        str: Encoded text chunks (the CSV header comes first).
+    """
+    buffer = io.StringIO()
+    writer = None
+    if export_format == "csv":
+        writer = csv.writer(buffer)
+        writer.writerow(EXPORT_FIELDS)
+
+    pending = 0
+    for row in rows:
+        if writer is not None:
+            writer.writerow([row['id'], row['expense_date'].isoformat(), row['amount'], row['category'], row['notes']])
+        else:
+            buffer.write(dumps({
+                "id": row['id'],
+                "expense_date": row['expense_date'].isoformat(),
+                "amount": float(row['amount']),
+                "category": row['category'],
+                "notes": row['notes'],
+            }).decode("utf-8"))
+            buffer.write("\n")
+        pending += 1
+        if pending >= rows_per_chunk:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+            pending = 0
+
+    if buffer.tell():
+        yield buffer.getvalue()
+
+
 # ----------------------------- API ENDPOINTS -----------------------------
 
 # Endpoint: Retrieve all expenses for a specific date
-@app.get("/expenses/{expenses_date}", response_model=List[Expense])
-def get_expenses(expenses_date: date):
+@app.get("/expenses/{expenses_date}", response_model=List[StoredExpense])
+def get_expenses(expenses_date: date, response: Response, if_none_match: Optional[str] = Header(None)):
     """
     GET endpoint that retrieves all expenses for a given date.
+    The response carries an ETag built from the date's version counter; a
+    request whose If-None-Match still matches gets '304 Not Modified' without
+    the rows being queried or serialized.
     
     Args:
         expenses_date (date): The date for which to fetch expenses.
+        if_none_match (str): Optional If-None-Match request header.
     
     Returns:
-        List[Expense]: A list of expense records matching the provided date.
+        List[StoredExpense]: The expense records of the date, with their ids.
     
     Raises:
         HTTPException: If the database retrieval fails.
     """
-    # Retrieve expenses from the database for the specified date
-    expenses = db_helper.retrieve_expenses_by_date(expenses_date)
+    # A conditional request first checks the version alone, so a match
+    # answers 304 without the rows being queried or serialized
+    if if_none_match is not None:
+        etag = date_etag(expenses_date, db_helper.fetch_date_version(expenses_date))
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag)
+
+    # Version and rows on one connection, version first (see db_helper); the
+    # rows already have the response shape
+    version, expenses = db_helper.retrieve_expenses_with_version(expenses_date)
 
     # If retrieval fails, raise an HTTP exception with status 500
     if expenses is None:
         raise HTTPException(status_code=500, detail="Failed to retrieve expenses from the DB")
 
-    return expenses
+    return finish_response(expenses, response, date_etag(expenses_date, version))
 
 
 # Endpoint: Insert or update expenses for a given date
 @app.post("/expenses/{expenses_date}", response_model=List[Expense])
-def add_or_update_expenses(expenses_date: date, expenses: List[Expense]):
+def add_or_update_expenses(expenses_date: date, expenses: List[Expense], response: Response):
     """
     POST endpoint that adds or updates expenses for a specific date.
-    - Deletes all existing records for that date.
-    - Inserts the new set of expenses received from the client.
-    
+    - Replaces all existing records for that date with the new set of
+      expenses received from the client, in a single DB transaction.
+    - Every row gets a new id; use PATCH /expenses/{date} to change
+      individual rows while keeping their ids.
+
     Args:
         expenses_date (date): The date associated with the expense records.
         expenses (List[Expense]): A list of Expense objects to be stored.
-    
+
     Returns:
-        List[dict]: A confirmation list of the inserted expense records.
+        List[dict]: A confirmation list of the inserted expense records. Budgets the
+                    save pushed over their monthly limit are listed in the
+                    X-Budget-Alerts response header.
+
+    Raises:
+        HTTPException: 409 if the date has been archived (read-only).
     """
-    # Delete all previous expense records for the given date
-    db_helper.delete_expenses_by_date(expenses_date)
+    # Delete the previous records and insert the new ones atomically (one round trip for the rows)
+    try:
+        alerts = db_helper.replace_expenses_for_date(expenses_date, [expense.model_dump() for expense in expenses])
+    except db_helper.ArchivedDateError as error:
+        raise HTTPException(status_code=409, detail=str(error))
 
-    # Iterate through the list of expenses and insert each one into the database
-    for expense in expenses:
-        db_helper.create_expense(expenses_date, expense.amount, expense.category, expense.notes)
+    # Drop only the cached analytics ranges that include the written date
+    summary_cache.invalidate_dates(expenses_date)
 
     # Return the inserted expenses in dictionary format for API response
-    return [
-        {
-            "amount": expense.amount,
-            "category": expense.category,
-            "notes": expense.notes
-        }
-        for expense in expenses
-    ]
+    return finish_response(
+        [
+            {
+                "amount": expense.amount,
+                "category": expense.category,
+                "notes": expense.notes
+            }
+            for expense in expenses
+        ],
+        response,
+        headers=budget_alert_headers(alerts),
+    )
+
+
+# Endpoint: Insert, update and delete individual expenses of a date
+@app.patch("/expenses/{expenses_date}", response_model=List[StoredExpense])
+def patch_expenses(expenses_date: date, changes: ExpenseChanges, response: Response):
+    """
+    PATCH endpoint that applies row-level changes to a date in one transaction:
+    new rows are inserted, listed ids are updated (only the fields sent) or
+    deleted, and every other row is left alone. A save therefore costs work
+    proportional to what changed, not a rewrite of the whole day.
+
+    Args:
+        expenses_date (date): The date the rows belong to.
+        changes (ExpenseChanges): 'inserts', 'updates' (by id) and 'deletes' (ids).
+
+    Returns:
+        List[StoredExpense]: The date's expenses after the change, with their ids
+                             (crossed budgets in the X-Budget-Alerts header).
+
+    Raises:
+        HTTPException: 400 if an id is listed twice, 404 if an id does not
+                       belong to the date, 409 if the date has been archived.
+    """
+    alerts = []
+    try:
+        rows = db_helper.apply_expense_changes(
+            expenses_date,
+            inserts=[expense.model_dump() for expense in changes.inserts],
+            updates=[update.model_dump(exclude_none=True) for update in changes.updates],
+            deletes=changes.deletes,
+            budget_alerts=alerts,
+        )
+    except db_helper.ArchivedDateError as error:
+        raise HTTPException(status_code=409, detail=str(error))
+    except LookupError as error:
+        raise HTTPException(status_code=404, detail=str(error))
+    except ValueError as error:
+        raise HTTPException(status_code=400, detail=str(error))
+
+    # Drop only the cached analytics ranges that include the written date
+    if changes.inserts or changes.updates or changes.deletes:
+        summary_cache.invalidate_dates(expenses_date)
+
+    return finish_response(expense_rows(rows), response, headers=budget_alert_headers(alerts))
+
+
+def analytics_response(start_date, end_date, response, if_none_match=None):
+    """
+    Shared body of the analytics endpoints: serves the breakdown from the
+    cache or the DB, with an ETag derived from the range's date versions.
+
+    Args:
+        start_date (date): Start of the range (inclusive).
+        end_date (date): End of the range (inclusive).
+        response (Response): The endpoint's response, used to set headers.
+        if_none_match (str): Optional If-None-Match header (GET only).
+
+    Returns:
+        dict | Response: The breakdown, or a '304 Not Modified' response.
+    """
+    # Serve repeated ranges from the cache; writes evict overlapping ranges.
+    # Cached entries hold (etag, breakdown), so a cache hit needs no DB access at all.
+    cached = summary_cache.get(start_date, end_date)
+    if cached is not None:
+        etag, breakdown = cached
+    else:
+        generation = summary_cache.generation()
+        etag = range_etag(start_date, end_date, db_helper.fetch_range_version(start_date, end_date))
+        breakdown = None
+
+    if etag_matches(if_none_match, etag):
+        return not_modified(etag)
+
+    if breakdown is None:
+        # Fetch aggregated expense data (category-wise sums) from the DB, or for
+        # long ranges from the columnar snapshot when EXPENSE_ANALYTICS_ENGINE=snapshot
+        data = snapshot.fetch_expense_summary(start_date, end_date)
+
+        # If data retrieval fails, return a 500 Internal Server Error
+        if data is None:
+            raise HTTPException(status_code=500, detail="Failed to retrieve expense summary from the DB.")
+
+        breakdown = build_analytics_breakdown(data)
+        # A replica read right after a write may be behind: serve it, but do not cache it
+        if db_helper.router.cache_safe():
+            summary_cache.put(start_date, end_date, (etag, breakdown), generation)
+
+    return finish_response(breakdown, response, etag)
 
 
 # Endpoint: Generate analytics (summary) for a given date range
 @app.post("/analytics/")
-def get_analytics(date_range: DateRange):
+def get_analytics(date_range: DateRange, response: Response):
     """
     POST endpoint that generates an expense summary grouped by category.
     Calculates both total spending and category-wise percentage breakdown
@@ -129,30 +554,392 @@ def get_analytics(date_range: DateRange):
     Raises:
         HTTPException: If fetching data from the database fails.
     """
-    # Fetch aggregated expense data (category-wise sums) from DB
-    data = db_helper.fetch_expense_summary(date_range.start_date, date_range.end_date)
+    return analytics_response(date_range.start_date, date_range.end_date, response)
 
-    # If data retrieval fails, return a 500 Internal Server Error
-    if data is None:
-        raise HTTPException(status_code=500, detail="Failed to retrieve expense summary from the DB.")
 
-    # Compute total spending across all categories in the date range
-    total = sum([row['sum(amount)'] for row in data])
+# Endpoint: Same summary as a cacheable GET (supports If-None-Match)
+@app.get("/analytics/")
+def get_analytics_conditional(start_date: date, end_date: date, response: Response,
+                              if_none_match: Optional[str] = Header(None)):
+    """
+    GET variant of the analytics endpoint. Conditional requests are only
+    defined for GET, so clients that revalidate with ETags use this one;
+    an unchanged range is answered with '304 Not Modified'.
 
-    # Initialize dictionary to store category-wise breakdown
-    braakdown = {}
+    Args:
+        start_date (date): Start of the range (query parameter).
+        end_date (date): End of the range (query parameter).
+        if_none_match (str): Optional If-None-Match request header.
 
-    # For each category, compute total spent and its percentage of the grand total
-    for row in data:
-        percentage = 100 * row['sum(amount)'] / total if total != 0 else 0
-        braakdown[row['category']] = {
-            "total": row['sum(amount)'],
-            "percentage": percentage
-        }
+    Returns:
+        dict: Same body as POST /analytics/.
+    """
+    return analytics_response(start_date, end_date, response, if_none_match)
 
-    # Final JSON structure returned to the frontend example:
-    # {
-    #     "Rent":     {"total": 1234, "percentage": 34.45},
-    #     "Shopping": {"total": 2234, "percentage": 64.45}
-    # }
-    return braakdown
+
+# Endpoint: Time-bucketed trends per category for a date range
+@app.post("/analytics/trends")
+def get_trends(trend_request: TrendRequest, response: Response):
+    """
+    POST endpoint that returns per-day/week/month totals per category.
+    The buckets are computed by one grouped SQL query over the daily rollup
+    (or the columnar snapshot for long ranges, see snapshot.py); percentages, running totals and period-over-period changes are derived
+    with vectorized pandas operations.
+
+    Args:
+        trend_request (TrendRequest): 'start_date', 'end_date' and 'granularity'.
+
+    Returns:
+        dict: Chart-ready series, see trends.build_trend_report().
+
+    Raises:
+        HTTPException: 400 if 'start_date' is after 'end_date'.
+    """
+    if trend_request.start_date > trend_request.end_date:
+        raise HTTPException(status_code=400, detail="start_date must not be after end_date")
+
+    rows = snapshot.fetch_expense_trends(trend_request.start_date, trend_request.end_date, trend_request.granularity)
+    report = trends.build_trend_report(rows, trend_request.start_date, trend_request.end_date, trend_request.granularity)
+    return finish_response(report, response)
+
+
+# Endpoint: Distribution statistics per category for a date range
+@app.post("/analytics/stats")
+def get_expense_stats(date_range: DateRange, response: Response):
+    """
+    POST endpoint that returns count, total, mean, standard deviation, min/max
+    and approximate median/p90/p99 of the expense amounts per category.
+    The rows are read once through a server-side cursor and folded into
+    constant-size sketches (see streaming_stats.py), so memory does not grow
+    with the size of the range. Archived months have no raw rows and are not included.
+
+    Args:
+        date_range (DateRange): Object containing 'start_date' and 'end_date'.
+
+    Returns:
+        dict: Category -> statistics, see streaming_stats.CategoryStats.report().
+
+    Raises:
+        HTTPException: 400 if 'start_date' is after 'end_date'.
+    """
+    if date_range.start_date > date_range.end_date:
+        raise HTTPException(status_code=400, detail="start_date must not be after end_date")
+
+    pairs = db_helper.stream_amounts_between(date_range.start_date, date_range.end_date)
+    return finish_response(streaming_stats.summarize(pairs), response)
+
+
+# Endpoint: Full-text search over expense notes
+@app.get("/search/expenses")
+def search_expenses(
+    response: Response,
+    q: str = Query(..., max_length=200),
+    start_date: Optional[date] = None,
+    end_date: Optional[date] = None,
+    category: Optional[str] = None,
+    limit: int = Query(20, ge=1, le=100),
+    offset: int = Query(0, ge=0),
+):
+    """
+    GET endpoint that finds expenses whose notes contain every word of 'q'
+    (words may be prefixes: 'star' matches 'Starbucks'), best matches first.
+    Answered by the FULLTEXT index of 'expense_notes_fts', never by a LIKE scan.
+    'total_matches' and 'total_amount' cover every match, not only the returned page.
+
+    Args:
+        q (str): Search text.
+        start_date (date): Optional first date (query parameter).
+        end_date (date): Optional last date (query parameter).
+        category (str): Optional category filter (query parameter).
+        limit (int): Page size, 1-100.
+        offset (int): Number of ranked results to skip.
+
+    Returns:
+        dict: 'query', 'total_matches', 'total_amount', 'limit', 'offset' and 'results'.
+
+    Raises:
+        HTTPException: 400 if 'q' has no searchable word or the date range is reversed.
+    """
+    if start_date and end_date and start_date > end_date:
+        raise HTTPException(status_code=400, detail="start_date must not be after end_date")
+    try:
+        found = db_helper.search_expense_notes(q, start_date, end_date, category, limit, offset)
+    except ValueError as error:
+        raise HTTPException(status_code=400, detail=str(error))
+    return finish_response(found, response)
+
+
+# Endpoint: Budget status of every category for a month
+@app.get("/budgets")
+def get_budgets(response: Response, month: Optional[date] = None):
+    """
+    GET endpoint that lists the category budgets with their month-to-date spending.
+    Totals are maintained incrementally by every write, so this is one
+    primary-key lookup per budget instead of an aggregation of the month.
+
+    Args:
+        month (date): Any day of the month to report (query parameter; defaults to today).
+
+    Returns:
+        list[dict]: 'category', 'monthly_limit', 'total', 'expense_count', 'remaining',
+                    'percentage' (of the limit) and 'over' per budget.
+    """
+    month = (month or date.today()).replace(day=1)
+    return finish_response(
+        [
+            {
+                **row,
+                "remaining": row['monthly_limit'] - row['total'],
+                "percentage": round(float(100 * row['total'] / row['monthly_limit']), 2),
+                "over": row['total'] > row['monthly_limit'],
+            }
+            for row in db_helper.fetch_budget_status(month)
+        ],
+        response,
+    )
+
+
+# Endpoint: Create or change the monthly budget of a category
+@app.put("/budgets/{category}")
+def put_budget(category: str, budget: Budget):
+    """
+    PUT endpoint that sets the monthly limit of a category.
+
+    Args:
+        category (str): Expense category.
+        budget (Budget): The new 'monthly_limit'.
+
+    Returns:
+        dict: The stored budget.
+    """
+    db_helper.set_category_budget(category, budget.monthly_limit)
+    return {"category": category, "monthly_limit": budget.monthly_limit}
+
+
+# Endpoint: Remove the budget of a category
+@app.delete("/budgets/{category}", status_code=204)
+def delete_budget(category: str):
+    """
+    DELETE endpoint that removes the budget of a category (its spending totals stay).
+
+    Raises:
+        HTTPException: 404 if the category has no budget.
+    """
+    if not db_helper.delete_category_budget(category):
+        raise HTTPException(status_code=404, detail=f"No budget for category {category!r}")
+    return Response(status_code=204)
+
+
+# Endpoint: Report database connection pool usage
+@app.get("/stats/pool")
+def get_pool_stats():
+    """
+    GET endpoint that exposes connection pool statistics for monitoring.
+    
+    Returns:
+        dict: Open, idle, in-use and waiting connection counts, lifetime
+              counters (checkouts, timeouts, reconnects, ...) and checkout
+              latency in milliseconds of the primary pool, plus the same
+              statistics per replica, the read routing counters and the
+              prepared statement counters.
+    """
+    return {
+        **db_helper.get_pool_stats(),
+        "replicas": db_helper.get_replica_stats(),
+        "routing": db_helper.router.stats(),
+        "prepared_statements": db_helper.get_statement_stats(),
+    }
+
+
+# Endpoint: Append expenses through the batching buffer (high-rate producers)
+@app.post("/ingest/expenses", status_code=202)
+def ingest_expenses(expenses: List[IngestExpense]):
+    """
+    POST endpoint for producers that push single expenses at high rates
+    (receipt scanners, bank webhooks). Rows are appended, never replacing a
+    day, and are acknowledged once buffered: a background thread writes them
+    in batches of EXPENSE_INGEST_BATCH_ROWS rows (or after EXPENSE_INGEST_FLUSH_MS),
+    one transaction per batch.
+
+    Args:
+        expenses (List[IngestExpense]): Expenses with their 'expense_date'.
+
+    Returns:
+        dict: Number of rows accepted and rows now waiting in the buffer.
+
+    Raises:
+        HTTPException: 409 if a date is archived, 413 if the request alone exceeds
+                       the buffer (split it), 429 (with Retry-After) if the
+                       buffer is full, 503 while the server is shutting down.
+    """
+    try:
+        db_helper.check_writable(expense.expense_date for expense in expenses)
+    except db_helper.ArchivedDateError as error:
+        raise HTTPException(status_code=409, detail=str(error))
+
+    rows = [(expense.expense_date, expense.amount, expense.category, expense.notes) for expense in expenses]
+    try:
+        accepted = ingest_buffer.submit(rows)
+    except BufferClosedError:
+        raise HTTPException(status_code=503, detail="Server is shutting down")
+    except RequestTooLargeError as error:
+        raise HTTPException(status_code=413, detail=f"{error}; send smaller requests")
+    if not accepted:
+        raise HTTPException(status_code=429, detail="Ingest buffer is full; retry later", headers={"Retry-After": "1"})
+
+    return {"accepted": len(rows), "queued": ingest_buffer.stats()["queued"]}
+
+
+# Endpoint: Report ingest buffer usage
+@app.get("/stats/ingest")
+def get_ingest_stats():
+    """
+    GET endpoint that exposes ingest buffer statistics for monitoring.
+
+    Returns:
+        dict: Rows queued and in flight, capacity, and accepted/rejected/written/failed
+              counters, batches written and the duration of the last batch.
+    """
+    return ingest_buffer.stats()
+
+
+# Endpoint: Report the state of the columnar analytics snapshot
+@app.get("/stats/snapshot")
+def get_snapshot_stats():
+    """
+    GET endpoint that describes the analytics snapshot used by the 'snapshot' engine.
+
+    Returns:
+        dict: Selected engine, whether the snapshot is usable, its time, months and
+              rows, and the number of dates written since (answered from MySQL).
+    """
+    return {"engine": snapshot.SNAPSHOT_CONFIG["engine"], **snapshot.store.status()}
+
+
+# Endpoint: Report analytics cache usage
+@app.get("/stats/cache")
+def get_cache_stats():
+    """
+    GET endpoint that exposes analytics cache statistics for monitoring.
+
+    Returns:
+        dict: Cache size, bounds and hit/miss/eviction/expiration/invalidation counters.
+    """
+    return summary_cache.stats()
+
+
+# Endpoint: Report the most expensive SQL statements
+@app.get("/stats/queries")
+def get_query_stats(top: int = Query(10, ge=1, le=1000),
+                    sort: Literal["total_ms", "max_ms", "calls", "rows", "slow"] = "total_ms"):
+    """
+    GET endpoint that lists the SQL statements with the highest total (or max) time
+    since the process started, grouped by db_helper function and statement shape.
+
+    Args:
+        top (int): Number of statements returned.
+        sort (str): Ordering key ('total_ms', 'max_ms', 'calls', 'rows' or 'slow').
+
+    Returns:
+        dict: The profiler settings and the top statements with call count,
+              total/average/max milliseconds, rows and slow-call count.
+    """
+    return {
+        "enabled": profiler.enabled,
+        "slow_threshold_ms": profiler.threshold_ms,
+        "statements": profiler.top(top, sort),
+    }
+
+
+# Endpoint: Prometheus metrics
+@app.get("/metrics", response_class=PlainTextResponse)
+def get_metrics():
+    """
+    GET endpoint that exposes request/query duration histograms and pool/cache
+    gauges in the Prometheus text exposition format (version 0.0.4).
+
+    Returns:
+        PlainTextResponse: The rendered metrics.
+    """
+    return PlainTextResponse(metrics.REGISTRY.render(), media_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+# Endpoint: Stream raw expenses for an arbitrary date range
+@app.get("/export/expenses")
+def export_expenses(start_date: date, end_date: date, format: Literal["ndjson", "csv"] = "ndjson"):
+    """
+    GET endpoint that streams every expense between two dates (inclusive).
+    Rows are read through a server-side cursor and encoded as they arrive, so
+    memory use stays flat no matter how large the range is.
+
+    Args:
+        start_date (date): First date of the export (query parameter).
+        end_date (date): Last date of the export (query parameter).
+        format (str): 'ndjson' (one JSON object per line) or 'csv'.
+
+    Returns:
+        StreamingResponse: The encoded rows, ordered by date.
+
+    Raises:
+        HTTPException: 400 if 'start_date' is after 'end_date'.
+    """
+    if start_date > end_date:
+        raise HTTPException(status_code=400, detail="start_date must not be after end_date")
+
+    rows = db_helper.stream_expenses_between(start_date, end_date)
+    media_type = "text/csv" if format == "csv" else "application/x-ndjson"
+    filename = f"expenses_{start_date}_{end_date}.{format}"
+
+    return StreamingResponse(
+        encode_export_chunks(rows, format),
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
+
+
+# Endpoint: Bulk import expenses from an uploaded CSV file
+@app.post("/import/expenses")
+def import_expenses(file: UploadFile, chunk_size: int = Query(bulk_import.DEFAULT_CHUNK_SIZE, ge=1, le=50000)):
+    """
+    POST endpoint that streams an uploaded CSV file into the database.
+    Rows are validated and written in chunks (one transaction and one batched
+    INSERT per chunk); invalid rows are skipped and reported by line number.
+    See bulk_import.py for the expected columns.
+
+    Args:
+        file (UploadFile): CSV file with expense_date, amount, category and notes columns.
+        chunk_size (int): Rows per transaction.
+
+    Returns:
+        dict: The import report (rows read/imported/rejected, chunks, dates, errors).
+
+    Raises:
+        HTTPException: 400 if the CSV header is missing a required column. If the
+            import stops halfway (400 for undecodable input, 409 for a month archived
+            meanwhile, 500 otherwise), 'detail' holds the error and the partial
+            'report' of the rows already imported.
+    """
+    text_stream = io.TextIOWrapper(file.file, encoding="utf-8-sig", newline="")
+    try:
+        report = bulk_import.import_csv(text_stream, chunk_size=chunk_size)
+    except bulk_import.ImportAbortedError as error:
+        # Chunks committed before the failure stay: refresh their cached ranges
+        # and tell the client exactly what was imported
+        summary_cache.invalidate_dates(*error.report["dates"])
+        if isinstance(error.cause, db_helper.ArchivedDateError):
+            status_code = 409
+        elif isinstance(error.cause, ValueError):
+            status_code = 400
+        else:
+            status_code = 500
+        raise HTTPException(status_code=status_code, detail={"error": str(error.cause), "report": error.report})
+    except ValueError as error:
+        # Header problems are detected before anything is written
+        raise HTTPException(status_code=400, detail=str(error))
+    except Exception:
+        # Anything else: drop every cached range to be safe
+        summary_cache.clear()
+        raise
+
+    summary_cache.invalidate_dates(*report["dates"])
+    return report
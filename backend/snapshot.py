@@ -0,0 +1,585 @@
+'''
+Columnar snapshots for long-range analytics.
+
+'python snapshot.py build' copies 'expense_daily_rollup' into one Parquet file
+per month under EXPENSE_SNAPSHOT_DIR. With EXPENSE_ANALYTICS_ENGINE=snapshot,
+/analytics/ and /analytics/trends answer ranges of at least
+EXPENSE_SNAPSHOT_MIN_DAYS days with DuckDB, an in-process engine that scans
+the Parquet files directly. MySQL only has to return the small "live delta":
+the rollup rows of dates written after the snapshot was taken. Those dates
+are left out of the snapshot query and added from MySQL, so results stay exact.
+
+    python snapshot.py build [--full]       # Refresh changed months (--full rewrites every month)
+    python snapshot.py status               # Snapshot time, months and stale dates
+    python snapshot.py query START END      # Category totals from the snapshot, e.g. to compare with MySQL
+
+pyarrow and duckdb are optional. Without them, or without a snapshot, every
+query falls back to db_helper and the MySQL rollup.
+
+The rollup is snapshotted instead of raw 'expenses' rows: it is what both
+endpoints aggregate, it is far smaller, and it still holds the months removed
+by 'partitions.py archive'. 'rollup.py rebuild' rewrites the rollup without
+touching date versions, so run 'snapshot.py build --full' after it.
+'''
+
+# Import necessary modules
+import argparse                        # Command-line interface for building and inspecting snapshots
+import calendar                        # Last day of a month when rewriting it
+import itertools                       # Groups the streamed rollup rows by month
+import json                            # Snapshot manifest
+import os                              # Settings from environment variables, atomic file replacement
+import shutil                          # Removes month directories that no longer have data
+import threading                       # Optional periodic refresh inside the server process
+from collections import defaultdict    # Merges snapshot and live totals
+from datetime import date, datetime, timedelta  # Month keys, snapshot time and the safety margin
+from decimal import Decimal            # Rollup totals are DECIMAL
+import db_helper                       # Snapshot sources and the MySQL fallback
+from metrics import timed_query        # Records snapshot query durations for GET /metrics
+from logging_setup import setup_logger # Custom logging setup module
+
+# Optional columnar stack: without it every query falls back to MySQL
+try:
+    import pyarrow as pa                # Arrow tables written to Parquet
+    import pyarrow.parquet as pq
+except ImportError:                     # pragma: no cover - depends on the environment
+    pa = pq = None
+try:
+    import duckdb                       # Embedded engine that scans the Parquet files
+except ImportError:                     # pragma: no cover - depends on the environment
+    duckdb = None
+
+# Initialize a logger specific to this module for consistent logging
+logger = setup_logger('snapshot')
+
+SNAPSHOT_CONFIG = {
+    "engine":         os.getenv("EXPENSE_ANALYTICS_ENGINE", "mysql"),         # mysql | snapshot
+    "directory":      os.getenv("EXPENSE_SNAPSHOT_DIR", "snapshots"),
+    "min_days":       int(os.getenv("EXPENSE_SNAPSHOT_MIN_DAYS", "90")),      # Shorter ranges stay on MySQL
+    "interval":       float(os.getenv("EXPENSE_SNAPSHOT_INTERVAL", "0")),     # Seconds between in-server refreshes (0 = cron only)
+    # Writes stamp 'updated_at' before they commit, so a date stamped shortly
+    # before the snapshot may still have been invisible to it. Dates stamped
+    # within this margin of the snapshot are treated as changed as well.
+    "margin_seconds": float(os.getenv("EXPENSE_SNAPSHOT_MARGIN_SECONDS", "300")),
+}
+
+MANIFEST = "manifest.json"
+
+# DuckDB expression mapping a date to the first day of its period (same buckets as db_helper.TREND_PERIOD_SQL)
+TREND_PERIOD_DUCKDB = {
+    "day":   "expense_date",
+    "week":  "CAST(date_trunc('week', expense_date) AS DATE)",
+    "month": "CAST(date_trunc('month', expense_date) AS DATE)",
+}
+
+
+# ------------------------- PURE HELPERS -------------------------
+def month_key(day):
+    """Month of a date as 'YYYY-MM'."""
+    return f"{day.year:04d}-{day.month:02d}"
+
+
+def months_between(start_date, end_date):
+    """
+    Lists the months overlapping a date range.
+
+    Args:
+        start_date (date): Start of the range.
+        end_date (date): End of the range.
+
+    Returns:
+        list[str]: 'YYYY-MM' keys, in order.
+    """
+    keys = []
+    year, month = start_date.year, start_date.month
+    while (year, month) <= (end_date.year, end_date.month):
+        keys.append(f"{year:04d}-{month:02d}")
+        year, month = (year + 1, 1) if month == 12 else (year, month + 1)
+    return keys
+
+
+def month_range(key):
+    """First and last day of a 'YYYY-MM' month."""
+    year, month = (int(part) for part in key.split("-"))
+    return date(year, month, 1), date(year, month, calendar.monthrange(year, month)[1])
+
+
+def _decimal(value):
+    """Rollup totals arrive as Decimal; anything else is converted without float noise."""
+    return value if isinstance(value, Decimal) else Decimal(str(value))
+
+
+def period_start(day, granularity):
+    """First day of the day/week (Monday)/month containing 'day'."""
+    if granularity == "day":
+        return day
+    if granularity == "week":
+        return day - timedelta(days=day.weekday())
+    if granularity == "month":
+        return day.replace(day=1)
+    raise ValueError(f"Unsupported granularity: {granularity}")
+
+
+def category_key(category):
+    """
+    Grouping key of a category. MySQL compares categories case-insensitively
+    (its default collation), so 'food' and 'Food' are one category there; the
+    snapshot must group them the same way. The alphabetically smallest spelling
+    names the group (DuckDB's MIN(category)).
+    """
+    return category.lower()
+
+
+def merge_summary(snapshot_rows, live_rows):
+    """
+    Adds the live delta to the snapshot's category totals.
+
+    Args:
+        snapshot_rows (iterable[tuple]): (category, total) from the snapshot, changed dates excluded.
+        live_rows (iterable[dict]): Rollup rows of the changed dates ('category', 'total_amount').
+
+    Returns:
+        list[dict]: Rows shaped like db_helper.fetch_expense_summary() ('category', 'sum(amount)').
+    """
+    totals, names = defaultdict(Decimal), {}
+    rows = [(category, total) for category, total in snapshot_rows]
+    rows += [(row['category'], row['total_amount']) for row in live_rows]
+    for category, total in rows:
+        key = category_key(category)
+        totals[key] += _decimal(total)
+        names[key] = min(names.get(key, category), category)
+    return sorted(
+        ({"category": names[key], "sum(amount)": total} for key, total in totals.items()),
+        key=lambda row: row['category']
+    )
+
+
+def merge_trends(snapshot_rows, live_rows, granularity):
+    """
+    Adds the live delta to the snapshot's per-period totals.
+
+    Args:
+        snapshot_rows (iterable[tuple]): (period, category, total) from the snapshot.
+        live_rows (iterable[dict]): Rollup rows of the changed dates.
+        granularity (str): 'day', 'week' or 'month'.
+
+    Returns:
+        list[dict]: Rows shaped like db_helper.fetch_expense_trends() ('period', 'category', 'total').
+    """
+    totals, names = defaultdict(Decimal), {}
+    rows = [(period, category, total) for period, category, total in snapshot_rows]
+    rows += [
+        (period_start(row['expense_date'], granularity), row['category'], row['total_amount'])
+        for row in live_rows
+    ]
+    for period, category, total in rows:
+        key = (period, category_key(category))
+        totals[key] += _decimal(total)
+        names[key] = min(names.get(key, category), category)
+    return sorted(
+        ({"period": period, "category": names[(period, folded)], "total": total}
+         for (period, folded), total in totals.items()),
+        key=lambda row: (row['period'], row['category'])
+    )
+
+
+def _as_date(value):
+    """Accepts a date or an ISO string (the API passes dates, the CLI strings)."""
+    return value if isinstance(value, date) else date.fromisoformat(value)
+
+
+# ------------------------- SNAPSHOT STORE -------------------------
+class SnapshotStore:
+    """
+    Monthly Parquet snapshots of the daily rollup plus the queries over them.
+
+    Layout: '<directory>/month=YYYY-MM/rollup.parquet' and '<directory>/manifest.json'
+    ({"snapshot_time": ISO timestamp of the primary, "months": {"YYYY-MM": rows}}).
+    Files are replaced atomically and the manifest last, so readers never see a
+    partial month and an older manifest only makes the live delta larger.
+
+    Args:
+        directory (str): Where the snapshot lives.
+        margin_seconds (float): Safety margin applied to the snapshot time (see SNAPSHOT_CONFIG).
+    """
+
+    def __init__(self, directory, margin_seconds=300.0):
+        self.directory = directory
+        self.margin_seconds = margin_seconds
+        self._connection = None
+        self._lock = threading.Lock()
+        self._manifest_cache = (None, None)   # (file stamp, parsed manifest)
+
+    # ------------------------- FILES -------------------------
+    def _month_path(self, key):
+        return os.path.join(self.directory, f"month={key}", "rollup.parquet")
+
+    def manifest(self):
+        """
+        Returns the manifest, or None if no snapshot has been built.
+        It is parsed again only when the file changes (every analytics request asks).
+        """
+        path = os.path.join(self.directory, MANIFEST)
+        try:
+            info = os.stat(path)
+        except FileNotFoundError:
+            return None
+        stamp = (info.st_mtime_ns, info.st_size, info.st_ino)
+        cached_stamp, cached = self._manifest_cache
+        if cached_stamp == stamp:
+            return cached
+        try:
+            with open(path, encoding="utf-8") as handle:
+                manifest = json.load(handle)
+        except FileNotFoundError:
+            return None
+        self._manifest_cache = (stamp, manifest)
+        return manifest
+
+    def _write_manifest(self, manifest):
+        path = os.path.join(self.directory, MANIFEST)
+        with open(path + ".tmp", "w", encoding="utf-8") as handle:
+            json.dump(manifest, handle, indent=2, sort_keys=True)
+        os.replace(path + ".tmp", path)
+
+    def _write_month(self, key, rows):
+        """Writes (or, without rows, removes) the Parquet file of one month."""
+        path = self._month_path(key)
+        if not rows:
+            shutil.rmtree(os.path.dirname(path), ignore_errors=True)
+            return
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        table = pa.table(
+            {
+                "expense_date":  [row['expense_date'] for row in rows],
+                "category":      [row['category'] for row in rows],
+                "total_amount":  [row['total_amount'] for row in rows],
+                "expense_count": [row['expense_count'] for row in rows],
+            },
+            schema=pa.schema([
+                ("expense_date", pa.date32()),
+                ("category", pa.string()),
+                ("total_amount", pa.decimal128(14, 2)),
+                ("expense_count", pa.int64()),
+            ]),
+        )
+        pq.write_table(table, path + ".tmp")
+        os.replace(path + ".tmp", path)
+
+    def available(self):
+        """True if the optional dependencies are installed and a snapshot exists."""
+        return pa is not None and duckdb is not None and self.manifest() is not None
+
+    # ------------------------- BUILD -------------------------
+    def build(self, full=False):
+        """
+        Brings the snapshot up to date. Only months containing a date written
+        since the previous snapshot are rewritten, unless 'full' is set.
+
+        Args:
+            full (bool): Rewrite every month (first build, or after 'rollup.py rebuild').
+
+        Returns:
+            dict: 'snapshot_time', 'months' rewritten and 'rows' written.
+
+        Raises:
+            RuntimeError: If pyarrow or duckdb is not installed.
+        """
+        if pa is None or duckdb is None:
+            raise RuntimeError("Snapshots need pyarrow and duckdb: pip install pyarrow duckdb")
+
+        os.makedirs(self.directory, exist_ok=True)
+        # Taken before reading, so anything the read might miss is newer than it
+        snapshot_time = db_helper.fetch_db_time()
+        previous = None if full else self.manifest()
+        months = dict(previous['months']) if previous else {}
+
+        if previous is None:
+            ranges = [(date(1000, 1, 1), date(9999, 12, 31))]
+        else:
+            changed = db_helper.fetch_changed_dates(self._since(previous))
+            stale = sorted({month_key(day) for day in changed})
+            ranges = [month_range(key) for key in stale]
+            for key in stale:
+                months.pop(key, None)
+
+        rewritten, written = [], 0
+        for start, end in ranges:
+            found = False
+            # Rows arrive in date order, so each month is one consecutive group
+            rows_by_month = itertools.groupby(
+                db_helper.stream_rollup_between(start, end), key=lambda row: month_key(row['expense_date'])
+            )
+            for key, rows in rows_by_month:
+                rows = list(rows)
+                self._write_month(key, rows)
+                months[key] = len(rows)
+                rewritten.append(key)
+                written += len(rows)
+                found = True
+            if not found and previous is not None:
+                # The month lost all its rows since the last snapshot
+                self._write_month(month_key(start), [])
+                rewritten.append(month_key(start))
+
+        self._write_manifest({"snapshot_time": snapshot_time.isoformat(), "months": months})
+        if previous is None:
+            # Months left over from an older snapshot (now absent from the rollup)
+            for key in months_present(self.directory):
+                if key not in months:
+                    shutil.rmtree(os.path.join(self.directory, f"month={key}"), ignore_errors=True)
+        logger.info("snapshot: rewrote %s months (%s rows)", len(rewritten), written)
+        return {"snapshot_time": snapshot_time.isoformat(), "months": rewritten, "rows": written}
+
+    # ------------------------- QUERIES -------------------------
+    def _since(self, manifest):
+        return datetime.fromisoformat(manifest['snapshot_time']) - timedelta(seconds=self.margin_seconds)
+
+    def _cursor(self):
+        # One in-memory DuckDB database per store; each query gets its own cursor (thread-safe)
+        with self._lock:
+            if self._connection is None:
+                self._connection = duckdb.connect(":memory:")
+            return self._connection.cursor()
+
+    def _scan(self, manifest, start_date, end_date):
+        """
+        Prepares a snapshot query over a range.
+
+        Returns:
+            tuple: (FROM/WHERE clause or None if no month file exists, its parameters,
+                    live rollup rows of the changed dates, DuckDB cursor).
+        """
+        changed = db_helper.fetch_changed_dates(self._since(manifest), start_date, end_date)
+        live = db_helper.fetch_rollup_for_dates(changed) if changed else []
+
+        files = [
+            self._month_path(key) for key in months_between(start_date, end_date)
+            if key in manifest['months'] and os.path.exists(self._month_path(key))
+        ]
+        if not files:
+            return None, None, live, None
+
+        cursor = self._cursor()
+        # Paths are built by this module, quoting only guards against odd directory names
+        file_list = ", ".join("'" + path.replace("'", "''") + "'" for path in files)
+        clause = f"FROM read_parquet([{file_list}]) WHERE expense_date BETWEEN ? AND ?"
+        params = [start_date, end_date]
+        if changed:
+            cursor.register("changed_dates", pa.table({"expense_date": pa.array(changed, pa.date32())}))
+            clause += " AND expense_date NOT IN (SELECT expense_date FROM changed_dates)"
+        return clause, params, live, cursor
+
+    def summary(self, start_date, end_date):
+        """
+        Category totals of a range: snapshot for unchanged dates, MySQL rollup for the rest.
+
+        Args:
+            start_date (date | str): Start of the range.
+            end_date (date | str): End of the range.
+
+        Returns:
+            list[dict]: Same rows as db_helper.fetch_expense_summary().
+
+        Raises:
+            RuntimeError: If no snapshot exists.
+        """
+        manifest = self.manifest()
+        if manifest is None:
+            raise RuntimeError("No snapshot; run 'python snapshot.py build'")
+        start_date, end_date = _as_date(start_date), _as_date(end_date)
+
+        clause, params, live, cursor = self._scan(manifest, start_date, end_date)
+        snapshot_rows = []
+        if clause is not None:
+            # Case-insensitive like MySQL's collation (see category_key)
+            snapshot_rows = cursor.execute(
+                f"SELECT MIN(category), SUM(total_amount) {clause} GROUP BY lower(category)", params
+            ).fetchall()
+        return merge_summary(snapshot_rows, live)
+
+    def trends(self, start_date, end_date, granularity="month"):
+        """
+        Per-period, per-category totals of a range (see summary()).
+
+        Args:
+            start_date (date | str): Start of the range.
+            end_date (date | str): End of the range.
+            granularity (str): 'day', 'week' (starting Monday) or 'month'.
+
+        Returns:
+            list[dict]: Same rows as db_helper.fetch_expense_trends().
+
+        Raises:
+            ValueError: If 'granularity' is not supported.
+            RuntimeError: If no snapshot exists.
+        """
+        if granularity not in TREND_PERIOD_DUCKDB:
+            raise ValueError(f"Unsupported granularity: {granularity}")
+        manifest = self.manifest()
+        if manifest is None:
+            raise RuntimeError("No snapshot; run 'python snapshot.py build'")
+        start_date, end_date = _as_date(start_date), _as_date(end_date)
+
+        clause, params, live, cursor = self._scan(manifest, start_date, end_date)
+        snapshot_rows = []
+        if clause is not None:
+            snapshot_rows = cursor.execute(
+                f"SELECT {TREND_PERIOD_DUCKDB[granularity]} AS period, MIN(category), SUM(total_amount) "
+                f"{clause} GROUP BY period, lower(category)",
+                params
+            ).fetchall()
+        return merge_trends(snapshot_rows, live, granularity)
+
+    def status(self):
+        """
+        Describes the snapshot.
+
+        Returns:
+            dict: 'available', 'snapshot_time', 'months', 'rows' and 'stale_dates'
+                  (dates written since the snapshot, i.e. the current live delta).
+        """
+        manifest = self.manifest()
+        if manifest is None:
+            return {"available": False, "snapshot_time": None, "months": 0, "rows": 0, "stale_dates": 0}
+        return {
+            "available": self.available(),
+            "snapshot_time": manifest['snapshot_time'],
+            "months": len(manifest['months']),
+            "rows": sum(manifest['months'].values()),
+            "stale_dates": len(db_helper.fetch_changed_dates(self._since(manifest))),
+        }
+
+
+def months_present(directory):
+    """Lists the 'YYYY-MM' month directories found in a snapshot directory."""
+    if not os.path.isdir(directory):
+        return []
+    return sorted(name[len("month="):] for name in os.listdir(directory) if name.startswith("month="))
+
+
+# Store used by the API (one per process)
+store = SnapshotStore(SNAPSHOT_CONFIG["directory"], SNAPSHOT_CONFIG["margin_seconds"])
+
+
+# ------------------------- ENGINE SELECTION -------------------------
+def use_snapshot(start_date, end_date):
+    """True if a range should be answered from the snapshot."""
+    return (
+        SNAPSHOT_CONFIG["engine"] == "snapshot"
+        and (_as_date(end_date) - _as_date(start_date)).days + 1 >= SNAPSHOT_CONFIG["min_days"]
+        and store.available()
+    )
+
+
+@timed_query
+def snapshot_summary(start_date, end_date):
+    """Timed wrapper of store.summary() (labelled 'snapshot_summary' in the query histogram)."""
+    return store.summary(start_date, end_date)
+
+
+@timed_query
+def snapshot_trends(start_date, end_date, granularity):
+    """Timed wrapper of store.trends() (labelled 'snapshot_trends' in the query histogram)."""
+    return store.trends(start_date, end_date, granularity)
+
+
+def fetch_expense_summary(start_date, end_date):
+    """
+    Category totals for the analytics endpoints from the configured engine.
+    Falls back to db_helper.fetch_expense_summary() for short ranges, when the
+    snapshot is unavailable, or if the snapshot query fails.
+
+    Args:
+        start_date (date): Start of the range.
+        end_date (date): End of the range.
+
+    Returns:
+        list[dict]: Rows with 'category' and 'sum(amount)'.
+    """
+    if use_snapshot(start_date, end_date):
+        try:
+            return snapshot_summary(start_date, end_date)
+        except Exception:
+            logger.warning("snapshot summary failed, using MySQL", exc_info=True)
+    return db_helper.fetch_expense_summary(start_date, end_date)
+
+
+def fetch_expense_trends(start_date, end_date, granularity="month"):
+    """
+    Per-period totals for the trends endpoint from the configured engine
+    (same fallback rules as fetch_expense_summary()).
+
+    Args:
+        start_date (date): Start of the range.
+        end_date (date): End of the range.
+        granularity (str): 'day', 'week' or 'month'.
+
+    Returns:
+        list[dict]: Rows with 'period', 'category' and 'total'.
+    """
+    if use_snapshot(start_date, end_date):
+        try:
+            return snapshot_trends(start_date, end_date, granularity)
+        except Exception:
+            logger.warning("snapshot trends failed, using MySQL", exc_info=True)
+    return db_helper.fetch_expense_trends(start_date, end_date, granularity)
+
+
+# ------------------------- PERIODIC REFRESH -------------------------
+_refresh_stop = threading.Event()
+_refresh_thread = None
+
+
+def _refresh_loop(interval):
+    while not _refresh_stop.wait(interval):
+        try:
+            store.build()
+        except Exception:
+            logger.exception("snapshot refresh failed")
+
+
+def start_refresher():
+    """
+    Starts the in-server refresh thread when the snapshot engine is selected
+    and EXPENSE_SNAPSHOT_INTERVAL is set. With several server processes,
+    prefer a single cron job running 'python snapshot.py build' instead.
+    """
+    global _refresh_thread
+    if SNAPSHOT_CONFIG["engine"] != "snapshot" or SNAPSHOT_CONFIG["interval"] <= 0 or pa is None or duckdb is None:
+        return
+    if _refresh_thread is not None and _refresh_thread.is_alive():
+        return
+    _refresh_stop.clear()
+    _refresh_thread = threading.Thread(
+        target=_refresh_loop, args=(SNAPSHOT_CONFIG["interval"],), name="expense-snapshot-refresh", daemon=True
+    )
+    _refresh_thread.start()
+
+
+def stop_refresher(timeout=10.0):
+    """Stops the refresh thread (waits for a running build up to 'timeout' seconds)."""
+    _refresh_stop.set()
+    if _refresh_thread is not None:
+        _refresh_thread.join(timeout)
+
+
+# ---------------------- MAIN BLOCK: COMMAND LINE ----------------------
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build and inspect the columnar analytics snapshot.")
+    parser.add_argument("command", choices=["build", "status", "query"])
+    parser.add_argument("start_date", nargs="?", help="Start of the range (query)")
+    parser.add_argument("end_date", nargs="?", help="End of the range (query)")
+    parser.add_argument("--full", action="store_true", help="Rewrite every month (build)")
+    args = parser.parse_args()
+
+    if args.command == "build":
+        report = store.build(full=args.full)
+        print(f"Snapshot at {report['snapshot_time']}: rewrote {len(report['months'])} months ({report['rows']} rows)")
+    elif args.command == "status":
+        for key, value in store.status().items():
+            print(f"{key:<14} {value}")
+    else:
+        if not (args.start_date and args.end_date):
+            parser.error("query requires START_DATE and END_DATE")
+        for row in store.summary(args.start_date, args.end_date):
+            print(f"{row['category']:<15} {row['sum(amount)']}")
@@ -0,0 +1,247 @@
+# Import necessary modules
+import math                            # Square root for the standard deviation
+
+# -------------------------------------------------------------------------
+# Single-pass, constant-memory statistics.
+#
+# POST /analytics/stats streams the (category, amount) pairs of a range from
+# a server-side cursor and feeds each amount into two sketches per category:
+#
+#   - RunningStats: Welford's algorithm for count, mean and variance (plus
+#     min, max and total), numerically stable and O(1) memory.
+#   - TDigest: a merging t-digest for approximate quantiles. Values are
+#     clustered into centroids that are small near the tails and larger in
+#     the middle, so p99 stays accurate while the number of centroids is
+#     bounded by the compression factor, not by the number of rows.
+#
+# Both sketches can be merged, e.g. to combine per-partition results.
+# -------------------------------------------------------------------------
+
+DEFAULT_QUANTILES = {"median": 0.5, "p90": 0.9, "p99": 0.99}
+
+
+class RunningStats:
+    """Count, total, mean, sample standard deviation, min and max of a stream (Welford)."""
+
+    __slots__ = ("count", "total", "mean", "_m2", "min", "max")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.mean = 0.0
+        self._m2 = 0.0          # Sum of squared deviations from the running mean
+        self.min = None
+        self.max = None
+
+    def add(self, value):
+        """Adds one observation."""
+        self.count += 1
+        self.total += value
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (value - self.mean)
+        self.min = value if self.min is None or value < self.min else self.min
+        self.max = value if self.max is None or value > self.max else self.max
+
+    def merge(self, other):
+        """Folds another accumulator into this one (Chan et al. parallel update)."""
+        if not other.count:
+            return
+        if not self.count:
+            self.count, self.total, self.mean, self._m2 = other.count, other.total, other.mean, other._m2
+            self.min, self.max = other.min, other.max
+            return
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / count
+        self._m2 += other._m2 + delta * delta * self.count * other.count / count
+        self.count = count
+        self.total += other.total
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+
+    @property
+    def stddev(self):
+        """Sample standard deviation (0.0 for fewer than two observations)."""
+        return math.sqrt(self._m2 / (self.count - 1)) if self.count > 1 else 0.0
+
+
+class TDigest:
+    """
+    Merging t-digest for approximate quantiles.
+
+    Args:
+        compression (float): Accuracy/size trade-off; the digest keeps a few times
+            'compression' centroids however many values it has seen.
+    """
+
+    def __init__(self, compression=100.0):
+        self.compression = compression
+        self.count = 0
+        self.min = None
+        self.max = None
+        self._means = []        # Centroid means, ascending
+        self._weights = []      # Matching centroid weights
+        self._buffer = []       # Values not yet merged into the centroids
+        self._buffer_size = int(compression * 5)
+
+    def add(self, value, weight=1):
+        """Adds one observation (or a centroid of 'weight' observations)."""
+        self._buffer.append((value, weight))
+        self.count += weight
+        self.min = value if self.min is None or value < self.min else self.min
+        self.max = value if self.max is None or value > self.max else self.max
+        if len(self._buffer) >= self._buffer_size:
+            self._compress()
+
+    def merge(self, other):
+        """Folds another digest into this one."""
+        other._compress()
+        for mean, weight in zip(other._means, other._weights):
+            self.add(mean, weight)
+        if other.count:
+            self.min = other.min if self.min is None else min(self.min, other.min)
+            self.max = other.max if self.max is None else max(self.max, other.max)
+
+    def _compress(self):
+        """Merges the buffer into the centroids, respecting the size bound at each quantile."""
+        if not self._buffer:
+            return
+        # The centroids are already sorted, so this sort is mostly a merge of two runs
+        items = sorted(list(zip(self._means, self._weights)) + self._buffer)
+        self._buffer = []
+
+        means, weights = [], []
+        before = 0.0                          # Weight of the centroids already emitted
+        mean, weight = items[0]
+        for next_mean, next_weight in items[1:]:
+            proposed = weight + next_weight
+            q = (before + proposed / 2) / self.count
+            # Centroids may hold ~4*n*q*(1-q)/compression values: tiny at the tails, large in the middle
+            if proposed <= max(1.0, 4 * self.count * q * (1 - q) / self.compression):
+                mean += (next_mean - mean) * next_weight / proposed
+                weight = proposed
+            else:
+                means.append(mean)
+                weights.append(weight)
+                before += weight
+                mean, weight = next_mean, next_weight
+        means.append(mean)
+        weights.append(weight)
+        self._means, self._weights = means, weights
+
+    def quantile(self, q):
+        """
+        Estimates a quantile by interpolating between centroid centres.
+
+        Args:
+            q (float): Quantile between 0 and 1.
+
+        Returns:
+            float | None: The estimate, or None if the digest is empty.
+        """
+        self._compress()
+        if not self._means:
+            return None
+        target = q * self.count
+        previous_center, previous_mean = 0.0, self.min
+        before = 0.0
+        for mean, weight in zip(self._means, self._weights):
+            center = before + weight / 2
+            if target < center:
+                span = center - previous_center
+                return previous_mean + (mean - previous_mean) * ((target - previous_center) / span if span else 0.0)
+            previous_center, previous_mean = center, mean
+            before += weight
+        span = self.count - previous_center
+        return previous_mean + (self.max - previous_mean) * ((target - previous_center) / span if span else 0.0)
+
+    def centroid_count(self):
+        """Number of centroids after compression (bounded by the compression factor)."""
+        self._compress()
+        return len(self._means)
+
+
+class CategoryStats:
+    """
+    Per-category RunningStats and TDigest fed from one stream of (category, amount) pairs.
+    Categories are grouped case-insensitively like MySQL and snapshot.category_key()
+    ('food' and 'Food' are one category); the smallest spelling names the group.
+
+    Args:
+        compression (float): t-digest compression used for every category.
+    """
+
+    def __init__(self, compression=100.0):
+        self.compression = compression
+        self._stats = {}   # Lower-cased category -> (RunningStats, TDigest)
+        self._names = {}   # Lower-cased category -> smallest spelling seen
+
+    def _sketches(self, category):
+        key = category.lower()
+        sketches = self._stats.get(key)
+        if sketches is None:
+            sketches = self._stats[key] = (RunningStats(), TDigest(self.compression))
+            self._names[key] = category
+        elif category < self._names[key]:
+            self._names[key] = category
+        return sketches
+
+    def add(self, category, amount):
+        """Adds one expense amount."""
+        sketches = self._sketches(category)
+        value = float(amount)
+        sketches[0].add(value)
+        sketches[1].add(value)
+
+    def merge(self, other):
+        """Folds another CategoryStats into this one."""
+        for key, (running, digest) in other._stats.items():
+            mine = self._sketches(other._names[key])
+            mine[0].merge(running)
+            mine[1].merge(digest)
+
+    def report(self, quantiles=None):
+        """
+        Returns the statistics of every category.
+
+        Args:
+            quantiles (dict): Output name -> quantile (defaults to median, p90 and p99).
+
+        Returns:
+            dict: Category -> count, total, mean, stddev, min, max and one entry per quantile.
+                  Example:
+                  {"Food": {"count": 3, "total": 60.0, "mean": 20.0, "stddev": 10.0,
+                            "min": 10.0, "max": 30.0, "median": 20.0, "p90": 30.0, "p99": 30.0}}
+        """
+        quantiles = quantiles or DEFAULT_QUANTILES
+        report = {}
+        for key in sorted(self._stats, key=self._names.get):
+            running, digest = self._stats[key]
+            report[self._names[key]] = {
+                "count":  running.count,
+                "total":  round(running.total, 2),
+                "mean":   round(running.mean, 2),
+                "stddev": round(running.stddev, 2),
+                "min":    running.min,
+                "max":    running.max,
+                **{name: round(digest.quantile(q), 2) for name, q in quantiles.items()},
+            }
+        return report
+
+
+def summarize(pairs, compression=100.0):
+    """
+    Computes per-category statistics in one pass over (category, amount) pairs.
+
+    Args:
+        pairs (iterable[tuple]): e.g. db_helper.stream_amounts_between(); consumed once.
+        compression (float): t-digest compression.
+
+    Returns:
+        dict: See CategoryStats.report().
+    """
+    stats = CategoryStats(compression)
+    for category, amount in pairs:
+        stats.add(category, amount)
+    return stats.report()
@@ -0,0 +1,106 @@
+# Import necessary modules
+import numpy as np      # NaN/inf handling for the vectorized ratios
+import pandas as pd     # Vectorized post-processing of the grouped trend rows
+
+# pandas frequency aliases matching db_helper.TREND_PERIOD_SQL (period = first day)
+PERIOD_FREQUENCIES = {
+    "day":   "D",
+    "week":  "W-MON",
+    "month": "MS",
+}
+
+
+def period_start(value, granularity):
+    """
+    Returns the first day of the period containing 'value' (weeks start on Monday).
+
+    Args:
+        value (date): Any date inside the period.
+        granularity (str): 'day', 'week' or 'month'.
+
+    Returns:
+        pandas.Timestamp: Start of the period.
+    """
+    timestamp = pd.Timestamp(value)
+    if granularity == "week":
+        return timestamp - pd.Timedelta(days=timestamp.weekday())
+    if granularity == "month":
+        return timestamp.replace(day=1)
+    return timestamp
+
+
+def _as_list(series):
+    """Converts a numeric Series to a JSON-friendly list (rounded to cents, NaN becomes None)."""
+    rounded = series.round(2)
+    return rounded.astype(object).where(rounded.notna(), None).tolist()
+
+
+def build_trend_report(rows, start_date, end_date, granularity):
+    """
+    Turns grouped (period, category, total) rows into chart-ready series.
+    All arithmetic is done on whole DataFrame columns (no per-row Python loops):
+    empty periods are filled with 0, then percentages of each period's total,
+    running totals and period-over-period changes are derived per category.
+
+    Args:
+        rows (list[dict]): Output of db_helper.fetch_expense_trends().
+        start_date (date): Start of the requested range (inclusive).
+        end_date (date): End of the requested range (inclusive).
+        granularity (str): 'day', 'week' or 'month'.
+
+    Returns:
+        dict: Example for granularity='month':
+              {
+                  "granularity": "month",
+                  "periods": ["2024-07-01", "2024-08-01"],
+                  "period_totals": [300.0, 450.0],
+                  "categories": {
+                      "Food": {
+                          "total":         [100.0, 150.0],
+                          "percentage":    [33.33, 33.33],
+                          "running_total": [100.0, 250.0],
+                          "change":        [None, 50.0],
+                          "change_pct":    [None, 50.0]
+                      }
+                  }
+              }
+    """
+    # Every period of the range, so gaps show up as zero instead of disappearing
+    periods = pd.date_range(
+        period_start(start_date, granularity),
+        period_start(end_date, granularity),
+        freq=PERIOD_FREQUENCIES[granularity]
+    )
+
+    frame = pd.DataFrame(rows, columns=["period", "category", "total"])
+    frame["period"] = pd.to_datetime(frame["period"])
+    frame["total"] = frame["total"].astype(float)
+
+    # periods x categories matrix of totals
+    totals = (
+        frame.pivot_table(index="period", columns="category", values="total", aggfunc="sum")
+        .reindex(periods)
+        .fillna(0.0)
+    )
+
+    period_totals = totals.sum(axis=1)
+    percentage = totals.div(period_totals.replace(0.0, np.nan), axis=0).mul(100).fillna(0.0)
+    running_total = totals.cumsum()
+    change = totals.diff()
+    change_pct = change.div(totals.shift(1).replace(0.0, np.nan)).mul(100)
+
+    return {
+        "granularity": granularity,
+        "periods": [period.date().isoformat() for period in periods],
+        "period_totals": _as_list(period_totals),
+        "categories": {
+            category: {
+                "total":         _as_list(totals[category]),
+                "percentage":    _as_list(percentage[category]),
+                "running_total": _as_list(running_total[category]),
+                "change":        _as_list(change[category]),
+                "change_pct":    _as_list(change_pct[category]),
+            }
+            for category in totals.columns
+        },
+    }
@@ -12,10 +12,8 @@
 # -------------------------------------------------------------------------
 import streamlit as st            # Streamlit: for building the web-based data UI
 from datetime import datetime     # For handling date inputs
-import requests                   # To communicate with the FastAPI backend via HTTP
-
-# Base URL for the FastAPI server (backend API)
-API_URL = "http://localhost:8000"
+import requests                   # Exception types raised by the API client
+import api_client                 # Shared, pooled and cached client for the FastAPI backend
 
 
 # -------------------------------------------------------------------------
@@ -30,11 +28,12 @@ def add_update_tab():
     2. Fetches existing expenses for that date from the backend (FastAPI).
     3. Displays the expenses in an editable table format (Amount, Category, Notes).
     4. Allows the user to modify or add new entries.
-    5. Submits the updated list of expenses back to the backend via a POST request.
+    5. Sends only the changed rows (inserts, updates, deletes by id) back to the
+       backend via a PATCH request.
 
     API Endpoints Used:
-        - GET  /expenses/{date}     → Fetch existing expenses
-        - POST /expenses/{date}     → Update/replace expenses for a given date
+        - GET   /expenses/{date}    → Fetch existing expenses (with their ids)
+        - PATCH /expenses/{date}    → Apply row-level changes for a given date
     """
 
     # Default date shown in the UI (hard-coded)
@@ -47,14 +46,13 @@ def add_update_tab():
 
     # ---------------------------------------------------------------------
     # Step 1: Fetch existing expenses for the selected date from FastAPI
+    # (cached per date, so edits and other reruns do not hit the backend)
     # ---------------------------------------------------------------------
-    response = requests.get(f"{API_URL}/expenses/{selected_date}")
-
-    if response.status_code == 200:
-        # Convert the JSON response to Python objects (list of dicts)
-        existing_expenses = response.json()
+    try:
+        # List of dicts with 'id', 'amount', 'category' and 'notes'
+        existing_expenses = api_client.fetch_expenses(str(selected_date))
         # st.write(existing_expenses)  # Debug line (optional)
-    else:
+    except requests.RequestException:
         # Display error message on the Streamlit UI if the request fails
         st.error("Failed to retrieve expenses")
         existing_expenses = []
@@ -88,11 +86,13 @@ def add_update_tab():
                 amount = existing_expenses[i]['amount']
                 category = existing_expenses[i]['category']
                 notes = existing_expenses[i]['notes']
+                expense_id = existing_expenses[i]['id']
             else:
                 # Default blank row for adding new data
                 amount = 0.0
                 category = "Shopping"
                 notes = ""
+                expense_id = None
 
             # --- Three-column layout for each row (Amount | Category | Notes) ---
             col1, col2, col3 = st.columns(3)
@@ -127,8 +127,9 @@ def add_update_tab():
                     label_visibility="collapsed"
                 )
 
-            # Append row data to the expenses list
+            # Append row data to the expenses list (stored rows keep their id)
             expenses.append({
+                'id': expense_id,
                 'amount': amount_input,
                 'category': category_input,
                 'notes': notes_input
@@ -140,19 +141,21 @@ def add_update_tab():
         submit_button = st.form_submit_button()
 
         if submit_button:
-            # Filter out expenses with zero amount before sending to backend
-            filtered_expenses = [
-                expense for expense in expenses if expense['amount'] > 0.0
-            ]
-
-            # Send filtered expense data as JSON to the FastAPI POST endpoint
-            response = requests.post(
-                f"{API_URL}/expenses/{selected_date}",
-                json=filtered_expenses
-            )
-
-            # Display result based on response status
-            if response.status_code == 200:
+            # Only the rows that changed are sent; a stored row set to zero is deleted
+            changes = api_client.diff_expenses(existing_expenses, expenses)
+
+            # Send the changes to the FastAPI PATCH endpoint
+            # (also drops the cached copy of this date and the cached analytics)
+            try:
+                alerts = []
+                if any(changes.values()):
+                    _, alerts = api_client.apply_changes(str(selected_date), changes)
                 st.success("Expenses updated successfully")
-            else:
+                # Budgets this save pushed over their monthly limit
+                for alert in alerts:
+                    st.warning(
+                        f"{alert['category']} is over its monthly budget: "
+                        f"{alert['total']:.2f} of {alert['monthly_limit']:.2f} spent in {alert['month'][:7]}"
+                    )
+            except requests.RequestException:
                 st.error("Failed to update expenses")
@@ -12,14 +12,9 @@
 # -------------------------------------------------------------------------
 import streamlit as st             # Streamlit for building interactive web apps
 from datetime import datetime      # Used to work with and format date inputs
-import requests                    # Used for making HTTP requests to the backend API
+import requests                    # Exception types raised by the API client
 import pandas as pd                # Used for data manipulation and visualization in table/chart form
-
-
-# -------------------------------------------------------------------------
-# Backend API base URL (FastAPI server)
-# -------------------------------------------------------------------------
-API_URL = "http://localhost:8000"
+import api_client                  # Shared, pooled and cached client for the FastAPI backend
 
 
 # -------------------------------------------------------------------------
@@ -31,12 +26,12 @@ def analytics_tab():
 
     Workflow:
     1. Allows the user to select a start and end date.
-    2. Sends these dates to the FastAPI backend (`/analytics/` endpoint) via POST request.
+    2. Sends these dates to the FastAPI backend (`/analytics/` endpoint) via the shared API client.
     3. Receives category-wise total and percentage breakdown of expenses.
     4. Displays the data visually using a bar chart and a formatted summary table.
 
     API Endpoint Used:
-        - POST /analytics/
+        - GET /analytics/?start_date=...&end_date=...  (same body as POST /analytics/, revalidated with ETags)
           Payload: {"start_date": "YYYY-MM-DD", "end_date": "YYYY-MM-DD"}
           Response: {
               "Rent": {"total": 1200, "percentage": 30.0},
@@ -60,23 +55,16 @@ def analytics_tab():
     # Step 2: On button click, send request to backend to fetch analytics
     # ---------------------------------------------------------------------
     if st.button("Get Analytics"):
-        # The payload must match backend's expected date format (ISO 8601)
-        payload = {
-            "start_date": start_date.strftime("%Y-%m-%d"),
-            "end_date": end_date.strftime("%Y-%m-%d")
-        }
-
-        # POST request to the FastAPI analytics endpoint
-        response = requests.post(f"{API_URL}/analytics/", json=payload)
-
         # -----------------------------------------------------------------
-        # Step 3: Handle backend response (success or failure)
+        # Step 3: Fetch the breakdown (dates must be ISO 8601; repeated ranges are cached)
         # -----------------------------------------------------------------
-        if response.status_code == 200:
-            # Convert response JSON (dict) into a Python object
-            response = response.json()
+        try:
+            response = api_client.fetch_analytics(
+                start_date.strftime("%Y-%m-%d"),
+                end_date.strftime("%Y-%m-%d")
+            )
             # st.write(response)  # Optional: uncomment to debug API response
-        else:
+        except requests.RequestException:
             # Show error message if request fails
             st.error("Failed to retrieve results for these dates")
             return  # Exit early if request fails
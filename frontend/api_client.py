@@ -0,0 +1,238 @@
+'''
+Shared client for the FastAPI backend, used by every Streamlit tab.
+
+- One pooled keep-alive `requests.Session` per Streamlit server process
+  (`st.cache_resource`), instead of a new TCP connection per request.
+- Reads are cached for a short time (`st.cache_data`), so widget interactions
+  and reruns do not turn into backend round trips.
+- When a cached read expires it is revalidated with the ETag of the last
+  response (If-None-Match); unchanged data comes back as an empty
+  '304 Not Modified' and the stored body is reused.
+- Every request carries an X-Client-Id unique to the browser session, so the
+  backend can send this user's reads to the primary database right after
+  they saved (read-your-writes with replicas).
+- Saving a day sends only the rows that changed (PATCH, by row id) and clears
+  that day's cached read and the cached analytics, so the user sees their own
+  write immediately.
+'''
+
+# -------------------------------------------------------------------------
+# Imports
+# -------------------------------------------------------------------------
+import json                        # Decodes the X-Budget-Alerts header of saves
+import os                          # Reads the backend URL and cache TTL from environment variables
+import threading                   # Guards the validator store shared by all sessions
+import uuid                        # Per-session client id
+from collections import OrderedDict  # LRU order for the validator store
+import streamlit as st             # Resource/data caching primitives
+import requests                    # HTTP client for the backend API
+from requests.adapters import HTTPAdapter
+
+
+# -------------------------------------------------------------------------
+# Settings
+# -------------------------------------------------------------------------
+API_URL = os.getenv("EXPENSE_API_URL", "http://localhost:8000")   # Backend API base URL (FastAPI server)
+CACHE_TTL = int(os.getenv("EXPENSE_UI_CACHE_TTL", "60"))          # Seconds a cached read stays valid
+REQUEST_TIMEOUT = float(os.getenv("EXPENSE_UI_TIMEOUT", "10"))    # Seconds before a request is abandoned
+MAX_VALIDATORS = 256                                              # Responses kept for ETag revalidation
+
+
+# -------------------------------------------------------------------------
+# Connection reuse
+# -------------------------------------------------------------------------
+@st.cache_resource
+def get_session():
+    """
+    Returns the process-wide HTTP session (kept alive between reruns and users).
+
+    Returns:
+        requests.Session: Session with a pooled keep-alive connection adapter.
+    """
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=16)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+    return session
+
+
+def client_id():
+    """Identifies this browser session to the backend (read-your-writes pinning)."""
+    if "expense_client_id" not in st.session_state:
+        st.session_state["expense_client_id"] = uuid.uuid4().hex
+    return st.session_state["expense_client_id"]
+
+
+def _request(method, path, headers=None, **kwargs):
+    """Sends one request through the shared session; raises requests.HTTPError on a non-2xx status."""
+    headers = {"X-Client-Id": client_id(), **(headers or {})}
+    response = get_session().request(method, f"{API_URL}{path}", headers=headers, timeout=REQUEST_TIMEOUT, **kwargs)
+    response.raise_for_status()
+    return response
+
+
+# -------------------------------------------------------------------------
+# Conditional GET (ETag revalidation)
+# -------------------------------------------------------------------------
+class ValidatorStore:
+    """Bounded LRU map of request -> (ETag, decoded body) of the last 200 response."""
+
+    def __init__(self, max_entries=MAX_VALIDATORS):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def put(self, key, etag, body):
+        with self._lock:
+            self._entries[key] = (etag, body)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+@st.cache_resource
+def get_validator_store():
+    """Returns the process-wide ValidatorStore."""
+    return ValidatorStore()
+
+
+def _conditional_get(path, params=None):
+    """
+    GET that sends the stored ETag and reuses the stored body on '304 Not Modified'.
+
+    Args:
+        path (str): API path, e.g. '/expenses/2024-08-01'.
+        params (dict): Optional query parameters.
+
+    Returns:
+        The decoded JSON body.
+    """
+    store = get_validator_store()
+    key = (path, tuple(sorted((params or {}).items())))
+    stored = store.get(key)
+    headers = {"If-None-Match": stored[0]} if stored else {}
+
+    response = _request("GET", path, params=params, headers=headers)
+    if response.status_code == 304 and stored:
+        return stored[1]
+
+    body = response.json()
+    etag = response.headers.get("ETag")
+    if etag:
+        store.put(key, etag, body)
+    return body
+
+
+# -------------------------------------------------------------------------
+# Cached reads (errors are raised, never cached)
+# -------------------------------------------------------------------------
+@st.cache_data(ttl=CACHE_TTL, show_spinner=False)
+def fetch_expenses(expense_date):
+    """
+    GET /expenses/{date}
+
+    Args:
+        expense_date (str): Date in 'YYYY-MM-DD' format.
+
+    Returns:
+        list[dict]: The day's expenses (id, amount, category, notes).
+    """
+    return _conditional_get(f"/expenses/{expense_date}")
+
+
+@st.cache_data(ttl=CACHE_TTL, show_spinner=False)
+def fetch_analytics(start_date, end_date):
+    """
+    GET /analytics/ (the conditional-GET form of POST /analytics/)
+
+    Args:
+        start_date (str): Start of the range, 'YYYY-MM-DD'.
+        end_date (str): End of the range, 'YYYY-MM-DD'.
+
+    Returns:
+        dict: Category -> {"total": ..., "percentage": ...}.
+    """
+    return _conditional_get("/analytics/", params={"start_date": start_date, "end_date": end_date})
+
+
+@st.cache_data(ttl=CACHE_TTL, show_spinner=False)
+def fetch_trends(start_date, end_date, granularity):
+    """
+    POST /analytics/trends
+
+    Args:
+        start_date (str): Start of the range, 'YYYY-MM-DD'.
+        end_date (str): End of the range, 'YYYY-MM-DD'.
+        granularity (str): 'day', 'week' or 'month'.
+
+    Returns:
+        dict: Chart-ready trend series.
+    """
+    payload = {"start_date": start_date, "end_date": end_date, "granularity": granularity}
+    return _request("POST", "/analytics/trends", json=payload).json()
+
+
+# -------------------------------------------------------------------------
+# Writes
+# -------------------------------------------------------------------------
+def diff_expenses(existing, edited):
+    """
+    Computes the row-level changes between the stored rows and the edited ones.
+
+    Args:
+        existing (list[dict]): Rows as returned by fetch_expenses() (with 'id').
+        edited (list[dict]): Rows from the form; stored rows keep their 'id',
+            new rows have none. A row with a zero amount counts as removed.
+
+    Returns:
+        dict: {"inserts": [...], "updates": [...], "deletes": [...]} for PATCH /expenses/{date}.
+    """
+    stored = {row['id']: row for row in existing}
+    changes = {"inserts": [], "updates": [], "deletes": []}
+
+    for row in edited:
+        expense_id = row.get('id')
+        if expense_id is None:
+            if row['amount'] > 0.0:
+                changes["inserts"].append({field: row[field] for field in ("amount", "category", "notes")})
+        elif row['amount'] <= 0.0:
+            changes["deletes"].append(expense_id)
+        else:
+            # Send only the fields that differ from the stored row
+            update = {
+                field: row[field]
+                for field in ("amount", "category", "notes")
+                if row[field] != stored[expense_id][field]
+            }
+            if update:
+                changes["updates"].append({"id": expense_id, **update})
+    return changes
+
+
+def apply_changes(expense_date, changes):
+    """
+    PATCH /expenses/{date} — applies inserts, updates and deletes by id in one
+    transaction, then drops the cached reads that could now be stale.
+
+    Args:
+        expense_date (str): Date in 'YYYY-MM-DD' format.
+        changes (dict): Output of diff_expenses().
+
+    Returns:
+        tuple[list[dict], list[dict]]: The day's expenses after the change (with their ids),
+            and the budgets the change pushed over their monthly limit.
+    """
+    response = _request("PATCH", f"/expenses/{expense_date}", json=changes)
+    alerts = json.loads(response.headers.get("X-Budget-Alerts", "[]"))
+
+    fetch_expenses.clear(expense_date)
+    fetch_analytics.clear()
+    fetch_trends.clear()
+    return response.json(), alerts
@@ -15,12 +15,7 @@
 import streamlit as st                   # Streamlit for interactive frontend
 from add_update_ui import add_update_tab # Custom module for Add/Update Expense UI
 from analytics_ui import analytics_tab   # Custom module for Analytics/Reports UI
-
-
-# -------------------------------------------------------------------------
-# Backend API base URL (FastAPI server)
-# -------------------------------------------------------------------------
-API_URL = "http://localhost:8000"
+from trends_ui import trends_tab         # Custom module for Trends (analytics by month/week/day) UI
 
 
 # -------------------------------------------------------------------------
@@ -32,10 +27,11 @@ st.title("Expense Management System")  # Displayed prominently at the top of the
 # -------------------------------------------------------------------------
 # Tab Layout Configuration
 # -------------------------------------------------------------------------
-# Create two tabs within the Streamlit UI:
+# Create three tabs within the Streamlit UI:
 #   1. "Add/Update" → for recording or modifying daily expenses
 #   2. "Analytics"  → for visualizing expenses and category-wise analysis
-tab1, tab2 = st.tabs(["Add/Update", "Analytics"])
+#   3. "Trends"     → for spending per month/week/day over a date range
+tab1, tab2, tab3 = st.tabs(["Add/Update", "Analytics", "Trends"])
 
 
 # -------------------------------------------------------------------------
@@ -62,3 +58,17 @@ with tab2:
     - Visualize data using charts and tables
     """
     analytics_tab()  # Render the Analytics view from analytics_ui.py
+
+
+
+# -------------------------------------------------------------------------
+# Tab 3: Expense Trends
+# -------------------------------------------------------------------------
+with tab3:
+    """
+    The 'Trends' tab allows users to:
+    - Select a date range and a bucket size (month/week/day)
+    - Retrieve every bucket from the backend in a single request
+    - Visualize category totals over time
+    """
+    trends_tab()  # Render the Trends view from trends_ui.py
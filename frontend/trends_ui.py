@@ -0,0 +1,84 @@
+'''
+- Website: https://streamlit.io/
+- To run this Streamlit UI, navigate to the frontend folder in your terminal, then execute:
+
+      streamlit run ./app.py
+
+  This will launch a local Streamlit web interface in your default browser.
+'''
+
+# -------------------------------------------------------------------------
+# Imports
+# -------------------------------------------------------------------------
+import streamlit as st             # Streamlit for building interactive web apps
+from datetime import datetime      # Used to work with and format date inputs
+import requests                    # Exception types raised by the API client
+import pandas as pd                # Used to shape the trend series for charts and tables
+import api_client                  # Shared, pooled and cached client for the FastAPI backend
+
+
+# -------------------------------------------------------------------------
+# Function: trends_tab
+# -------------------------------------------------------------------------
+def trends_tab():
+    """
+    Streamlit UI function for spending trends over time (e.g. analytics by month).
+
+    Workflow:
+    1. Allows the user to select a date range and a bucket size (day/week/month).
+    2. Sends ONE request to the FastAPI backend (`/analytics/trends` endpoint).
+    3. Displays per-category totals as a line chart and a per-period summary table.
+
+    API Endpoint Used:
+        - POST /analytics/trends
+          Payload: {"start_date": "YYYY-MM-DD", "end_date": "YYYY-MM-DD", "granularity": "month"}
+          Response: {"periods": [...], "period_totals": [...], "categories": {"Food": {"total": [...], ...}}}
+    """
+
+    # ---------------------------------------------------------------------
+    # Step 1: Date range and granularity inputs
+    # ---------------------------------------------------------------------
+    col1, col2, col3 = st.columns(3)
+
+    with col1:
+        start_date = st.date_input("Start date", datetime(2024, 1, 1), key="trends_start")
+    with col2:
+        end_date = st.date_input("End date", datetime(2024, 12, 31), key="trends_end")
+    with col3:
+        granularity = st.selectbox("Group by", ["month", "week", "day"], key="trends_granularity")
+
+    # ---------------------------------------------------------------------
+    # Step 2: On button click, fetch every bucket in a single request
+    # ---------------------------------------------------------------------
+    if st.button("Get Trends"):
+        try:
+            report = api_client.fetch_trends(
+                start_date.strftime("%Y-%m-%d"),
+                end_date.strftime("%Y-%m-%d"),
+                granularity
+            )
+        except requests.RequestException:
+            st.error("Failed to retrieve trends for these dates")
+            return
+
+        # -----------------------------------------------------------------
+        # Step 3: Chart of totals per category over time
+        # -----------------------------------------------------------------
+        periods = pd.to_datetime(report["periods"])
+        totals = pd.DataFrame(
+            {category: series["total"] for category, series in report["categories"].items()},
+            index=periods
+        )
+
+        st.title(f"Expenses by {granularity.capitalize()}")
+        st.line_chart(totals)
+
+        # -----------------------------------------------------------------
+        # Step 4: Per-period summary table
+        # -----------------------------------------------------------------
+        summary = pd.DataFrame({"period": report["periods"], "total": report["period_totals"]})
+        summary["change"] = summary["total"].diff()
+        summary["total"] = summary["total"].map("{:.2f}".format)
+        summary["change"] = summary["change"].map(lambda value: "" if pd.isna(value) else f"{value:+.2f}")
+
+        st.table(summary)
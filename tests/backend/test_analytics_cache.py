@@ -0,0 +1,83 @@
+"""
+=========================================================================================
+TEST MODULE: analytics_cache.py
+-----------------------------------------------------------------------------------------
+PURPOSE:
+    Verifies the range-keyed LRU cache that serves repeated `POST /analytics/` requests:
+    hit/miss accounting, LRU and TTL bounds, and write invalidation by overlapping date.
+=========================================================================================
+"""
+
+from datetime import date
+
+from backend.analytics_cache import RangeCache
+
+
+# --------------------------------------------------------------------------------------
+# TEST CASE 1: A stored range is served from the cache and counted as a hit
+# --------------------------------------------------------------------------------------
+def test_hit_and_miss_counters():
+    cache = RangeCache(max_entries=4, ttl=0)
+
+    assert cache.get(date(2024, 8, 1), date(2024, 8, 5)) is None
+    cache.put(date(2024, 8, 1), date(2024, 8, 5), {"Food": {"total": 10, "percentage": 100.0}})
+
+    assert cache.get(date(2024, 8, 1), date(2024, 8, 5)) == {"Food": {"total": 10, "percentage": 100.0}}
+    stats = cache.stats()
+    assert stats["hits"] == 1 and stats["misses"] == 1 and stats["size"] == 1
+
+
+# --------------------------------------------------------------------------------------
+# TEST CASE 2: The least recently used range is evicted when the cache is full
+# --------------------------------------------------------------------------------------
+def test_lru_eviction():
+    cache = RangeCache(max_entries=2, ttl=0)
+    cache.put(date(2024, 1, 1), date(2024, 1, 31), "jan")
+    cache.put(date(2024, 2, 1), date(2024, 2, 29), "feb")
+    cache.get(date(2024, 1, 1), date(2024, 1, 31))          # January becomes most recent
+    cache.put(date(2024, 3, 1), date(2024, 3, 31), "mar")   # February is evicted
+
+    assert cache.get(date(2024, 2, 1), date(2024, 2, 29)) is None
+    assert cache.get(date(2024, 1, 1), date(2024, 1, 31)) == "jan"
+    assert cache.stats()["evictions"] == 1
+
+
+# --------------------------------------------------------------------------------------
+# TEST CASE 3: Entries older than the TTL are not served
+# --------------------------------------------------------------------------------------
+def test_ttl_expiry(monkeypatch):
+    clock = [100.0]
+    monkeypatch.setattr("backend.analytics_cache.time.monotonic", lambda: clock[0])
+    cache = RangeCache(max_entries=4, ttl=10)
+    cache.put(date(2024, 8, 1), date(2024, 8, 5), "value")
+
+    clock[0] += 11
+    assert cache.get(date(2024, 8, 1), date(2024, 8, 5)) is None
+    assert cache.stats()["expirations"] == 1
+
+
+# --------------------------------------------------------------------------------------
+# TEST CASE 4: A write evicts only the ranges that contain the written date
+# --------------------------------------------------------------------------------------
+def test_invalidate_overlapping_ranges_only():
+    cache = RangeCache(max_entries=8, ttl=0)
+    cache.put(date(2024, 7, 1), date(2024, 7, 31), "july")
+    cache.put(date(2024, 8, 1), date(2024, 8, 31), "august")
+    cache.put(date(2024, 1, 1), date(2024, 12, 31), "year")
+
+    assert cache.invalidate_dates(date(2024, 8, 15)) == 2
+    assert cache.get(date(2024, 7, 1), date(2024, 7, 31)) == "july"
+    assert cache.get(date(2024, 8, 1), date(2024, 8, 31)) is None
+    assert cache.get(date(2024, 1, 1), date(2024, 12, 31)) is None
+
+
+# --------------------------------------------------------------------------------------
+# TEST CASE 5: A result computed before a concurrent write is not cached
+# --------------------------------------------------------------------------------------
+def test_put_skipped_after_concurrent_invalidation():
+    cache = RangeCache(max_entries=8, ttl=0)
+    generation = cache.generation()
+    cache.invalidate_dates(date(2024, 8, 2))                 # A write lands mid-query
+
+    cache.put(date(2024, 8, 1), date(2024, 8, 5), "stale", generation)
+    assert cache.get(date(2024, 8, 1), date(2024, 8, 5)) is None
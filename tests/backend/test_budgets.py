@@ -0,0 +1,137 @@
+"""
+=========================================================================================
+TEST MODULE: category budgets
+-----------------------------------------------------------------------------------------
+PURPOSE:
+    Verifies the incremental month-to-date totals kept by db_helper (rollup deltas and
+    crossed-budget detection) and the budget endpoints, including the X-Budget-Alerts
+    header on POST/PATCH /expenses/{date}.
+
+NOTES:
+    - The incremental update is checked against a recording cursor (no database).
+    - The endpoints run against the seeded SQLite stand-in used by the benchmarks.
+=========================================================================================
+"""
+
+import json
+from datetime import date
+from decimal import Decimal
+
+import pytest
+from fastapi.testclient import TestClient
+
+import db_helper
+import server
+from analytics_cache import summary_cache
+from tests.benchmarks.fake_db import SQLiteExpenseStore
+
+
+def rollup_row(day, category, total, count):
+    return {"expense_date": day, "category": category, "total_amount": Decimal(total), "expense_count": count}
+
+
+class RecordingCursor:
+    """Records statements and answers the budget check with preset rows."""
+
+    def __init__(self, rows):
+        self.statements = []
+        self.rows = rows
+
+    def execute(self, sql, params=()):
+        self.statements.append((sql, list(params)))
+
+    def executemany(self, sql, params):
+        self.statements.append((sql, list(params)))
+
+    def fetchall(self):
+        return self.rows
+
+
+# --------------------------------------------------------------------------------------
+# TEST CASE 1: A day's rollup refresh becomes per-month deltas; only crossings alert
+# --------------------------------------------------------------------------------------
+def test_monthly_deltas_and_crossings():
+    day = date(2024, 8, 14)
+    old = [rollup_row(day, "Food", "20.00", 2), rollup_row(day, "Rent", "700.00", 1)]
+    new = [rollup_row(day, "Food", "65.00", 3), rollup_row(day, "Rent", "700.00", 1), rollup_row(day, "Travel", "10.00", 1)]
+
+    deltas = db_helper.monthly_deltas(old, new)
+    assert deltas == {
+        (date(2024, 8, 1), "Food"): (Decimal("45.00"), 1),
+        (date(2024, 8, 1), "Travel"): (Decimal("10.00"), 1),
+    }
+
+    after = [
+        {"month": date(2024, 8, 1), "category": "Food", "total_amount": Decimal("310.00"), "monthly_limit": Decimal("300.00")},
+        {"month": date(2024, 8, 1), "category": "Travel", "total_amount": Decimal("520.00"), "monthly_limit": Decimal("500.00")},
+    ]
+    # Food went 265 -> 310 over a 300 limit; Travel was already over (510 -> 520)
+    assert db_helper.crossed_budgets(deltas, after) == [
+        {"category": "Food", "month": date(2024, 8, 1), "monthly_limit": Decimal("300.00"), "total": Decimal("310.00")},
+    ]
+
+
+# --------------------------------------------------------------------------------------
+# TEST CASE 2: Totals are updated by delta; budgets are only looked up for growing totals
+# --------------------------------------------------------------------------------------
+def test_update_monthly_totals_statements():
+    cursor = RecordingCursor(rows=[])
+    deltas = {
+        (date(2024, 8, 1), "Food"): (Decimal("-5.00"), -1),
+        (date(2024, 8, 1), "Rent"): (Decimal("100.00"), 1),
+    }
+    assert db_helper.update_monthly_totals(cursor, deltas) == []
+
+    (upsert, upsert_params), (check, check_params) = cursor.statements
+    assert upsert == db_helper.MONTHLY_TOTAL_UPSERT_SQL
+    assert upsert_params == [
+        (date(2024, 8, 1), "Food", Decimal("-5.00"), -1),
+        (date(2024, 8, 1), "Rent", Decimal("100.00"), 1),
+    ]
+    assert check == db_helper.budget_check_sql(1) and check_params == [date(2024, 8, 1), "Rent"]
+
+    shrinking = RecordingCursor(rows=[])
+    db_helper.update_monthly_totals(shrinking, {(date(2024, 8, 1), "Food"): (Decimal("-5.00"), -1)})
+    assert len(shrinking.statements) == 1
+    assert db_helper.update_monthly_totals(shrinking, {}) == []
+
+
+# --------------------------------------------------------------------------------------
+# TEST CASE 3: Budget endpoints and the X-Budget-Alerts header on writes
+# --------------------------------------------------------------------------------------
+@pytest.fixture
+def client():
+    store = SQLiteExpenseStore(rows=0, days=30, seed=7)
+    restore = store.install(db_helper)
+    summary_cache.clear()
+    try:
+        yield TestClient(server.app)
+    finally:
+        restore()
+        store.close()
+        summary_cache.clear()
+
+
+def test_budget_endpoints(client):
+    assert client.put("/budgets/Food", json={"monthly_limit": 100}).json() == {"category": "Food", "monthly_limit": 100.0}
+    assert client.put("/budgets/Food", json={"monthly_limit": 0}).status_code == 422
+
+    first = client.post("/expenses/2022-01-05", json=[{"amount": 60, "category": "Food", "notes": ""}])
+    assert first.status_code == 200 and "X-Budget-Alerts" not in first.headers
+
+    crossing = client.patch("/expenses/2022-01-20", json={"inserts": [{"amount": 50, "category": "Food", "notes": ""}]})
+    assert json.loads(crossing.headers["X-Budget-Alerts"]) == [
+        {"category": "Food", "month": "2022-01-01", "monthly_limit": 100.0, "total": 110.0}
+    ]
+
+    # Already over: no new alert
+    again = client.post("/expenses/2022-01-21", json=[{"amount": 5, "category": "Food", "notes": ""}])
+    assert "X-Budget-Alerts" not in again.headers
+
+    [status] = client.get("/budgets", params={"month": "2022-01-15"}).json()
+    assert status["category"] == "Food" and status["total"] == 115.0 and status["expense_count"] == 3
+    assert status["over"] is True and status["remaining"] == -15.0 and status["percentage"] == 115.0
+
+    assert client.delete("/budgets/Food").status_code == 204
+    assert client.delete("/budgets/Food").status_code == 404
+    assert client.get("/budgets").json() == []
@@ -0,0 +1,113 @@
+"""
+=========================================================================================
+TEST MODULE: bulk_import.py
+-----------------------------------------------------------------------------------------
+PURPOSE:
+    Verifies CSV validation, chunking and error reporting of the bulk import pipeline.
+
+NOTES:
+    - `db_helper.insert_expenses_batch` is replaced with a recorder, so no rows are written,
+      and the archive watermark is stubbed (nothing archived unless a test sets it).
+=========================================================================================
+"""
+
+import io
+from datetime import date
+
+import pytest
+
+from backend import bulk_import
+
+
+@pytest.fixture
+def watermark(monkeypatch):
+    current = {"value": None}
+    monkeypatch.setattr(bulk_import.db_helper, "archive_watermark", lambda refresh=False: current["value"])
+    return current
+
+
+@pytest.fixture
+def batches(monkeypatch, watermark):
+    written = []
+
+    def insert_expenses_batch(rows):
+        written.append(list(rows))
+        return {row[0] for row in rows}
+
+    monkeypatch.setattr(bulk_import.db_helper, "insert_expenses_batch", insert_expenses_batch)
+    return written
+
+
+# --------------------------------------------------------------------------------------
+# TEST CASE 1: Valid rows are written in chunks and invalid rows are reported by line
+# --------------------------------------------------------------------------------------
+def test_import_chunks_and_reports_errors(batches):
+    csv_text = (
+        "expense_date,amount,category,notes\n"
+        "2024-08-01,10,Food,Lunch\n"
+        "2024-08-01,abc,Food,Broken amount\n"
+        "2024-08-02,5.5,Rent,\n"
+        "2024-13-01,3,Other,Bad month\n"
+        "2024-08-03,7,Shopping,Socks\n"
+    )
+    progress = []
+
+    report = bulk_import.import_csv(io.StringIO(csv_text), chunk_size=2, on_progress=lambda r: progress.append(r["chunks"]))
+
+    assert report["rows_read"] == 5
+    assert report["rows_imported"] == 3
+    assert report["rows_rejected"] == 2
+    assert [problem["line"] for problem in report["errors"]] == [3, 5]
+    assert report["dates"] == [date(2024, 8, 1), date(2024, 8, 2), date(2024, 8, 3)]
+    assert sum(len(batch) for batch in batches) == 3
+    assert progress == list(range(1, len(batches) + 1))
+
+
+# --------------------------------------------------------------------------------------
+# TEST CASE 2: A header without the required columns is rejected before any write
+# --------------------------------------------------------------------------------------
+def test_missing_columns_rejected(batches):
+    with pytest.raises(ValueError):
+        bulk_import.import_csv(io.StringIO("date,amount\n2024-08-01,10\n"))
+    assert batches == []
+
+
+# --------------------------------------------------------------------------------------
+# TEST CASE 3: Rows dated before the archive watermark are rejected as read-only
+# --------------------------------------------------------------------------------------
+def test_archived_dates_rejected(batches, watermark):
+    watermark["value"] = date(2024, 8, 1)
+    csv_text = (
+        "expense_date,amount,category,notes\n"
+        "2024-07-31,10,Food,Archived month\n"
+        "2024-08-01,5,Food,Live month\n"
+    )
+
+    report = bulk_import.import_csv(io.StringIO(csv_text))
+
+    assert report["rows_imported"] == 1 and report["dates"] == [date(2024, 8, 1)]
+    assert report["errors"][0]["line"] == 2 and "archived" in report["errors"][0]["error"]
+
+
+# --------------------------------------------------------------------------------------
+# TEST CASE 4: A failure after a committed chunk reports what was already imported
+# --------------------------------------------------------------------------------------
+def test_abort_keeps_partial_report(monkeypatch, watermark):
+    def insert_expenses_batch(rows):
+        if rows[0][0] >= date(2024, 8, 2):
+            raise bulk_import.db_helper.ArchivedDateError("2024-08 has been archived")
+        return {row[0] for row in rows}
+
+    monkeypatch.setattr(bulk_import.db_helper, "insert_expenses_batch", insert_expenses_batch)
+    csv_text = (
+        "expense_date,amount,category,notes\n"
+        "2024-08-01,10,Food,First chunk\n"
+        "2024-08-02,5,Food,Archived meanwhile\n"
+    )
+
+    with pytest.raises(bulk_import.ImportAbortedError) as aborted:
+        bulk_import.import_csv(io.StringIO(csv_text), chunk_size=1)
+
+    assert isinstance(aborted.value.cause, bulk_import.db_helper.ArchivedDateError)
+    assert aborted.value.report["rows_imported"] == 1
+    assert aborted.value.report["dates"] == [date(2024, 8, 1)]
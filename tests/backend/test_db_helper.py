@@ -83,3 +83,119 @@ def test_fetch_expense_summary_invalid_range():
 
     # The database should return no grouped summary entries for this empty range
     assert len(expenses) == 0
+
+
+# --------------------------------------------------------------------------------------
+# TEST CASE 4: Replace all expenses of a date in one transaction
+# --------------------------------------------------------------------------------------
+def test_replace_expenses_for_date():
+    """
+    Verifies that replacing a day's expenses removes the old rows and inserts the new ones.
+
+    Expected behavior:
+        - After two consecutive replaces on '2099-01-15', only the rows of the second call remain.
+        - Replacing with an empty list leaves the date empty (cleanup).
+    """
+    db_helper.replace_expenses_for_date("2099-01-15", [
+        {"amount": 5, "category": "Food", "notes": "Tea"},
+        {"amount": 7, "category": "Other", "notes": "Stamps"},
+    ])
+    db_helper.replace_expenses_for_date("2099-01-15", [
+        {"amount": 12, "category": "Shopping", "notes": "Socks"},
+    ])
+
+    expenses = db_helper.retrieve_expenses_by_date(expense_date="2099-01-15")
+    assert len(expenses) == 1
+    assert expenses[0]['amount']   == 12
+    assert expenses[0]['category'] == "Shopping"
+
+    db_helper.replace_expenses_for_date("2099-01-15", [])
+    assert len(db_helper.retrieve_expenses_by_date(expense_date="2099-01-15")) == 0
+
+
+# --------------------------------------------------------------------------------------
+# TEST CASE 5: The daily rollup follows writes and matches the raw expenses
+# --------------------------------------------------------------------------------------
+def test_summary_reads_rollup_updated_by_writes():
+    """
+    Verifies that the category summary (served from the daily rollup) reflects a write
+    immediately, and that the rollup agrees with the raw table afterwards.
+
+    Expected behavior:
+        - After replacing '2099-02-10', the summary for that day shows the new totals.
+        - rollup.verify() reports no mismatches for that day.
+    """
+    from backend import rollup
+
+    db_helper.replace_expenses_for_date("2099-02-10", [
+        {"amount": 4, "category": "Food", "notes": "Bread"},
+        {"amount": 6, "category": "Food", "notes": "Milk"},
+        {"amount": 9, "category": "Other", "notes": "Batteries"},
+    ])
+    summary = {row['category']: row['sum(amount)'] for row in db_helper.fetch_expense_summary("2099-02-10", "2099-02-10")}
+    assert summary == {"Food": 10, "Other": 9}
+    assert rollup.verify("2099-02-10", "2099-02-10") == []
+
+    db_helper.replace_expenses_for_date("2099-02-10", [])
+    assert len(db_helper.fetch_expense_summary("2099-02-10", "2099-02-10")) == 0
+
+
+# --------------------------------------------------------------------------------------
+# TEST CASE 6: Stream every expense of a date range
+# --------------------------------------------------------------------------------------
+def test_stream_expenses_between():
+    """
+    Verifies that the streaming range read returns the rows of every day in the range,
+    in date order, even when they are fetched in several small batches.
+
+    Expected behavior:
+        - Three rows written on two dates come back in date order with batch_size=1.
+    """
+    db_helper.replace_expenses_for_date("2099-03-01", [{"amount": 1, "category": "Food", "notes": "A"}])
+    db_helper.replace_expenses_for_date("2099-03-02", [
+        {"amount": 2, "category": "Food", "notes": "B"},
+        {"amount": 3, "category": "Rent", "notes": "C"},
+    ])
+
+    rows = list(db_helper.stream_expenses_between("2099-03-01", "2099-03-02", batch_size=1))
+    assert [row['notes'] for row in rows] == ["A", "B", "C"]
+
+    db_helper.replace_expenses_for_date("2099-03-01", [])
+    db_helper.replace_expenses_for_date("2099-03-02", [])
+
+
+# --------------------------------------------------------------------------------------
+# TEST CASE 7: Row-level changes keep the ids of untouched rows and refresh the rollup
+# --------------------------------------------------------------------------------------
+def test_apply_expense_changes():
+    """
+    Verifies that apply_expense_changes() inserts, updates and deletes single rows.
+
+    Expected behavior:
+        - The untouched row keeps its id and values; the updated row keeps its id.
+        - The rollup reflects the new amounts; unknown ids raise LookupError.
+    """
+    db_helper.replace_expenses_for_date("2099-01-16", [
+        {"amount": 5, "category": "Food", "notes": "Tea"},
+        {"amount": 7, "category": "Other", "notes": "Stamps"},
+    ])
+    tea, stamps = sorted(db_helper.retrieve_expenses_by_date("2099-01-16"), key=lambda row: row['notes'] != "Tea")
+
+    rows = db_helper.apply_expense_changes(
+        "2099-01-16",
+        inserts=[{"amount": 3, "category": "Food", "notes": "Biscuits"}],
+        updates=[{"id": tea['id'], "amount": 6}],
+        deletes=[stamps['id']],
+    )
+
+    by_id = {row['id']: row for row in rows}
+    assert len(rows) == 2 and by_id[tea['id']]['amount'] == 6
+    assert {row['category']: row['sum(amount)'] for row in db_helper.fetch_expense_summary("2099-01-16", "2099-01-16")} == {"Food": 9}
+
+    try:
+        db_helper.apply_expense_changes("2099-01-16", deletes=[stamps['id']])
+        assert False, "deleting an unknown id must fail"
+    except LookupError:
+        pass
+
+    db_helper.replace_expenses_for_date("2099-01-16", [])
@@ -0,0 +1,113 @@
+"""
+=========================================================================================
+TEST MODULE: db_pool.py
+-----------------------------------------------------------------------------------------
+PURPOSE:
+    Verifies the connection pool used by `db_helper.py`: connection reuse, the
+    overflow limit, checkout timeouts, replacement of dead connections and shutdown.
+
+NOTES:
+    - `mysql.connector.connect` is replaced with a fake so no database is needed.
+=========================================================================================
+"""
+
+import pytest
+
+from backend import db_pool
+
+
+class FakeConnection:
+    """Minimal stand-in for a mysql.connector connection."""
+
+    def __init__(self):
+        self.alive = True
+        self.closed = False
+        self.autocommit = False
+
+    def ping(self, reconnect=False):
+        if not self.alive:
+            raise RuntimeError("MySQL server has gone away")
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def fake_connect(monkeypatch):
+    created = []
+
+    def connect(**kwargs):
+        connection = FakeConnection()
+        created.append(connection)
+        return connection
+
+    monkeypatch.setattr(db_pool.mysql.connector, "connect", connect)
+    return created
+
+
+# --------------------------------------------------------------------------------------
+# TEST CASE 1: Released connections are reused instead of reconnecting
+# --------------------------------------------------------------------------------------
+def test_connections_are_reused(fake_connect):
+    pool = db_pool.ConnectionPool({}, pool_size=2, max_overflow=0)
+
+    first = pool.acquire()
+    pool.release(first)
+    second = pool.acquire()
+
+    assert second is first
+    assert len(fake_connect) == 1
+    assert pool.stats()["checkouts"] == 2
+
+
+# --------------------------------------------------------------------------------------
+# TEST CASE 2: Overflow connections are closed on release and the cap is enforced
+# --------------------------------------------------------------------------------------
+def test_overflow_and_timeout(fake_connect):
+    pool = db_pool.ConnectionPool({}, pool_size=1, max_overflow=1, timeout=0.05)
+
+    base = pool.acquire()
+    extra = pool.acquire()
+    assert pool.stats()["in_use"] == 2
+
+    with pytest.raises(db_pool.PoolTimeoutError):
+        pool.acquire()
+
+    pool.release(extra)
+    pool.release(base)
+    stats = pool.stats()
+    assert extra.connection.closed
+    assert stats["open"] == 1 and stats["idle"] == 1 and stats["timeouts"] == 1
+
+
+# --------------------------------------------------------------------------------------
+# TEST CASE 3: A connection dropped by the server is replaced on checkout (pre-ping)
+# --------------------------------------------------------------------------------------
+def test_dead_connection_is_replaced(fake_connect):
+    pool = db_pool.ConnectionPool({}, pool_size=1, max_overflow=0, pre_ping=True)
+
+    pooled = pool.acquire()
+    pool.release(pooled)
+    pooled.connection.alive = False
+
+    fresh = pool.acquire()
+    assert fresh.connection is not pooled.connection
+    assert fresh.connection.alive
+    assert pool.stats()["reconnects"] == 1
+
+
+# --------------------------------------------------------------------------------------
+# TEST CASE 4: close_all() closes idle connections now and in-use ones when released
+# --------------------------------------------------------------------------------------
+def test_close_all_closes_in_use_on_release(fake_connect):
+    pool = db_pool.ConnectionPool({}, pool_size=2, max_overflow=0)
+
+    idle = pool.acquire()
+    busy = pool.acquire()
+    pool.release(idle)
+    pool.close_all()
+    assert idle.connection.closed and not busy.connection.closed
+
+    pool.release(busy)
+    assert busy.connection.closed
+    assert pool.stats()["open"] == 0 and pool.stats()["idle"] == 0
@@ -0,0 +1,138 @@
+"""
+=========================================================================================
+TEST MODULE: db_router.py
+-----------------------------------------------------------------------------------------
+PURPOSE:
+    Verifies read/write splitting: replica selection, one replica per request,
+    read-your-writes pinning after a write, and routing inside db_helper.get_db_cursor().
+
+NOTES:
+    - Fake pools stand in for the primary and the replicas; no database is needed.
+=========================================================================================
+"""
+
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+import db_helper
+from db_router import CURRENT_ROUTE, ReadRouter, ReadRoutingMiddleware, parse_hosts, route_scope
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class FakeConnection:
+    in_transaction = False
+
+    def __init__(self, server):
+        self.server = server
+
+    def start_transaction(self):
+        pass
+
+    def commit(self):
+        pass
+
+    def cursor(self, dictionary=False):
+        server = self.server
+
+        class Cursor:
+            def execute(self, sql, params=None):
+                pass
+
+            def fetchall(self):
+                return [{"server": server}]
+
+            def close(self):
+                pass
+
+        return Cursor()
+
+
+class FakePool:
+    def __init__(self, server):
+        self.server = server
+
+    def acquire(self):
+        return type("Pooled", (), {"connection": FakeConnection(self.server)})()
+
+    def release(self, pooled, discard=False):
+        pass
+
+
+# --------------------------------------------------------------------------------------
+# TEST CASE 1: Replicas are used in turn, but one request always stays on one replica
+# --------------------------------------------------------------------------------------
+def test_round_robin_is_sticky_per_request():
+    assert parse_hosts("replica1, replica2:3307", 3306) == [("replica1", 3306), ("replica2", 3307)]
+    router = ReadRouter(replica_count=2)
+
+    with route_scope("a"):
+        assert [router.choose_replica() for _ in range(3)] == [0, 0, 0]
+    with route_scope("b"):
+        assert router.choose_replica() == 1
+    assert ReadRouter(replica_count=2, policy="primary").choose_replica() is None
+
+
+# --------------------------------------------------------------------------------------
+# TEST CASE 2: A writer reads from the primary until the pin window has passed
+# --------------------------------------------------------------------------------------
+def test_read_your_writes_pin():
+    clock = FakeClock()
+    router = ReadRouter(replica_count=1, pin_seconds=5, clock=clock)
+
+    with route_scope("writer"):
+        router.note_write()
+        assert router.choose_replica() is None
+    with route_scope("other"):
+        assert router.choose_replica() == 0
+        assert not router.cache_safe()
+
+    clock.now = 6
+    with route_scope("writer"):
+        assert router.choose_replica() == 0 and router.cache_safe()
+    assert router.stats()["pinned_reads"] == 1
+
+
+# --------------------------------------------------------------------------------------
+# TEST CASE 3: get_db_cursor() sends read-only blocks to replicas and writes to the primary
+# --------------------------------------------------------------------------------------
+def test_get_db_cursor_routing(monkeypatch):
+    monkeypatch.setattr(db_helper, "get_pool", lambda: FakePool("primary"))
+    monkeypatch.setattr(db_helper, "get_replica_pools", lambda: [FakePool("replica-0")])
+    monkeypatch.setattr(db_helper, "router", ReadRouter(replica_count=1, pin_seconds=60))
+
+    def read():
+        with db_helper.get_db_cursor(readonly=True) as cursor:
+            cursor.execute("SELECT 1")
+            return cursor.fetchall()[0]["server"]
+
+    with route_scope("ui-session"):
+        assert read() == "replica-0"
+        with db_helper.get_db_cursor(commit=True) as cursor:
+            cursor.execute("UPDATE expenses SET notes = ''")
+    with route_scope("ui-session"):
+        assert read() == "primary"
+    with route_scope("someone-else"):
+        assert read() == "replica-0"
+
+
+# --------------------------------------------------------------------------------------
+# TEST CASE 4: The middleware identifies clients by X-Client-Id for sync endpoints too
+# --------------------------------------------------------------------------------------
+def test_middleware_sets_route():
+    app = FastAPI()
+    app.add_middleware(ReadRoutingMiddleware)
+
+    @app.get("/route")
+    def route():
+        return CURRENT_ROUTE.get()
+
+    client = TestClient(app)
+    assert client.get("/route", headers={"X-Client-Id": "abc"}).json() == {"client": "abc", "replica": None}
+    assert client.get("/route").json()["client"] == "testclient"
@@ -0,0 +1,79 @@
+"""
+=========================================================================================
+TEST MODULE: server.py (row-level PATCH /expenses/{date})
+-----------------------------------------------------------------------------------------
+PURPOSE:
+    Verifies that expenses expose stable ids and that PATCH applies inserts, partial
+    updates and deletes by id without touching the other rows of the date.
+
+NOTES:
+    - db_helper is backed by the seeded SQLite stand-in used by the benchmarks.
+=========================================================================================
+"""
+
+import pytest
+from fastapi.testclient import TestClient
+
+import db_helper
+import server
+from analytics_cache import summary_cache
+from tests.benchmarks.fake_db import SQLiteExpenseStore
+
+
+@pytest.fixture
+def client():
+    store = SQLiteExpenseStore(rows=0, days=30, seed=7)
+    restore = store.install(db_helper)
+    summary_cache.clear()
+    try:
+        client = TestClient(server.app)
+        client.post("/expenses/2024-08-01", json=[
+            {"amount": 10.0, "category": "Food", "notes": "breakfast"},
+            {"amount": 20.0, "category": "Rent", "notes": "garage"},
+            {"amount": 30.0, "category": "Other", "notes": "gift"},
+        ])
+        yield client
+    finally:
+        restore()
+        store.close()
+        summary_cache.clear()
+
+
+# --------------------------------------------------------------------------------------
+# TEST CASE 1: Inserts, updates and deletes keep the ids of untouched rows
+# --------------------------------------------------------------------------------------
+def test_patch_applies_row_changes(client):
+    before = {row["notes"]: row for row in client.get("/expenses/2024-08-01").json()}
+    etag = client.get("/expenses/2024-08-01").headers["ETag"]
+
+    response = client.patch("/expenses/2024-08-01", json={
+        "inserts": [{"amount": 5.0, "category": "Food", "notes": "coffee"}],
+        "updates": [{"id": before["breakfast"]["id"], "notes": "brunch"}],
+        "deletes": [before["gift"]["id"]],
+    })
+
+    assert response.status_code == 200
+    after = {row["notes"]: row for row in response.json()}
+    assert set(after) == {"brunch", "garage", "coffee"}
+    assert after["brunch"] == {**before["breakfast"], "notes": "brunch"}
+    assert after["garage"] == before["garage"]
+    assert client.get("/expenses/2024-08-01").json() == response.json()
+    assert client.get("/expenses/2024-08-01", headers={"If-None-Match": etag}).status_code == 200
+
+
+# --------------------------------------------------------------------------------------
+# TEST CASE 2: Unknown or repeated ids reject the whole change set
+# --------------------------------------------------------------------------------------
+def test_patch_rejects_bad_ids(client):
+    rows = client.get("/expenses/2024-08-01").json()
+    first_id = rows[0]["id"]
+
+    missing = client.patch("/expenses/2024-08-02", json={"deletes": [first_id]})
+    assert missing.status_code == 404
+
+    repeated = client.patch("/expenses/2024-08-01", json={
+        "updates": [{"id": first_id, "amount": 1.0}], "deletes": [first_id],
+    })
+    assert repeated.status_code == 400
+
+    assert client.get("/expenses/2024-08-01").json() == rows
@@ -0,0 +1,93 @@
+"""
+=========================================================================================
+TEST MODULE: fast_responses.py
+-----------------------------------------------------------------------------------------
+PURPOSE:
+    Verifies the fast JSON encoder, Accept-Encoding negotiation and the compression
+    middleware (threshold, streaming bodies and weak ETags on compressed responses).
+=========================================================================================
+"""
+
+import gzip
+import json
+from datetime import date
+from decimal import Decimal
+
+from fastapi import FastAPI
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+
+from backend import fast_responses
+from backend.fast_responses import CompressionMiddleware, FastJSONResponse, choose_encoding, dumps
+
+
+def build_app():
+    app = FastAPI(default_response_class=FastJSONResponse)
+    app.add_middleware(CompressionMiddleware, minimum_size=1024)
+
+    @app.get("/small")
+    def small():
+        return FastJSONResponse({"ok": True}, headers={"ETag": '"s1"'})
+
+    @app.get("/large")
+    def large():
+        rows = [{"amount": Decimal("10.50"), "category": "Food", "notes": "x" * 20} for _ in range(200)]
+        return FastJSONResponse(rows, headers={"ETag": '"l1"'})
+
+    @app.get("/stream")
+    def stream():
+        return StreamingResponse((f'{{"line": {index}}}\n' for index in range(2000)), media_type="application/x-ndjson")
+
+    return app
+
+
+# --------------------------------------------------------------------------------------
+# TEST CASE 1: DB types (Decimal sums, dates) are encoded without jsonable_encoder
+# --------------------------------------------------------------------------------------
+def test_dumps_handles_db_types():
+    encoded = dumps({"total": Decimal("12.30"), "day": date(2024, 8, 1), "notes": "café"})
+
+    assert json.loads(encoded) == {"total": 12.3, "day": "2024-08-01", "notes": "café"}
+
+
+# --------------------------------------------------------------------------------------
+# TEST CASE 2: Encoding negotiation honours q-values and available codecs
+# --------------------------------------------------------------------------------------
+def test_choose_encoding():
+    assert choose_encoding("") is None
+    assert choose_encoding("gzip, deflate") == "gzip"
+    assert choose_encoding("gzip;q=0, identity") is None
+    assert choose_encoding("br, gzip") == ("br" if fast_responses.brotli is not None else "gzip")
+
+
+# --------------------------------------------------------------------------------------
+# TEST CASE 3: Only bodies above the threshold are compressed; their ETag becomes weak
+# --------------------------------------------------------------------------------------
+def test_compression_threshold_and_weak_etag():
+    client = TestClient(build_app())
+
+    small = client.get("/small", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in small.headers and small.headers["etag"] == '"s1"'
+
+    large = client.get("/large", headers={"Accept-Encoding": "gzip"})
+    assert large.headers["content-encoding"] == "gzip"
+    assert large.headers["etag"] == 'W/"l1"'
+    assert int(large.headers["content-length"]) < len(dumps(large.json()))
+    assert large.json()[0] == {"amount": 10.5, "category": "Food", "notes": "x" * 20}
+
+    plain = client.get("/large", headers={"Accept-Encoding": "identity"})
+    assert "content-encoding" not in plain.headers and plain.headers["etag"] == '"l1"'
+
+
+# --------------------------------------------------------------------------------------
+# TEST CASE 4: Streaming responses are compressed chunk by chunk
+# --------------------------------------------------------------------------------------
+def test_streaming_compression():
+    client = TestClient(build_app())
+
+    with client.stream("GET", "/stream", headers={"Accept-Encoding": "gzip"}) as response:
+        raw = b"".join(response.iter_raw())
+
+    assert response.headers["content-encoding"] == "gzip"
+    lines = gzip.decompress(raw).decode().splitlines()
+    assert len(lines) == 2000 and lines[-1] == '{"line": 1999}'
@@ -0,0 +1,169 @@
+"""
+=========================================================================================
+TEST MODULE: ingest_buffer.py
+-----------------------------------------------------------------------------------------
+PURPOSE:
+    Verifies batching by size and by time, backpressure when the buffer is full
+    (429 from POST /ingest/expenses), retries of failed batches, dropping only rejected dates,
+    deadlines of leftover rows and draining on close.
+
+NOTES:
+    - The batch writer is a recorder; no database is needed.
+=========================================================================================
+"""
+
+import threading
+import time
+from datetime import date
+
+from fastapi.testclient import TestClient
+
+import db_helper
+import server
+from ingest_buffer import BufferClosedError, IngestBuffer
+
+
+class Recorder:
+    """Batch writer that records batches and can be made to block or fail."""
+
+    def __init__(self, failures=0):
+        self.batches = []
+        self.failures = failures
+        self.release = threading.Event()
+        self.release.set()
+
+    def __call__(self, rows):
+        self.release.wait(5)
+        if self.failures:
+            self.failures -= 1
+            raise ConnectionError("database unavailable")
+        self.batches.append(list(rows))
+        return {row[0] for row in rows}
+
+
+def row(index):
+    return (date(2024, 8, 1), float(index), "Food", f"receipt {index}")
+
+
+# --------------------------------------------------------------------------------------
+# TEST CASE 1: Full batches are written as they fill; close() drains the remainder
+# --------------------------------------------------------------------------------------
+def test_batches_by_size_and_drain_on_close():
+    writer = Recorder()
+    flushed = []
+    buffer = IngestBuffer(writer, on_flush=flushed.append, batch_rows=3, flush_ms=60_000)
+
+    for index in range(7):
+        assert buffer.submit([row(index)])
+    buffer.close()
+
+    assert [len(batch) for batch in writer.batches] == [3, 3, 1]
+    assert [entry[1] for batch in writer.batches for entry in batch] == [float(i) for i in range(7)]
+    assert flushed == [{date(2024, 8, 1)}] * 3
+    assert buffer.stats()["written"] == 7 and buffer.stats()["batches"] == 3
+
+
+# --------------------------------------------------------------------------------------
+# TEST CASE 2: A partial batch is written once its oldest row has waited flush_ms
+# --------------------------------------------------------------------------------------
+def test_partial_batch_flushed_after_deadline():
+    writer = Recorder()
+    buffer = IngestBuffer(writer, batch_rows=100, flush_ms=20)
+
+    buffer.submit([row(1), row(2)])
+    assert buffer.flush(timeout=5)
+
+    assert writer.batches == [[row(1), row(2)]]
+    buffer.close()
+
+
+# --------------------------------------------------------------------------------------
+# TEST CASE 3: Failed batches are retried; a closed buffer refuses new rows
+# --------------------------------------------------------------------------------------
+def test_retry_and_closed_buffer():
+    writer = Recorder(failures=1)
+    buffer = IngestBuffer(writer, batch_rows=10, flush_ms=1, retries=2)
+
+    buffer.submit([row(1)])
+    buffer.close()
+
+    assert writer.batches == [[row(1)]] and buffer.stats()["failed"] == 0
+    try:
+        buffer.submit([row(2)])
+        assert False, "a closed buffer must refuse rows"
+    except BufferClosedError:
+        pass
+
+
+# --------------------------------------------------------------------------------------
+# TEST CASE 4: The endpoint accepts with 202, 429 when the buffer is full, 413 when it never fits
+# --------------------------------------------------------------------------------------
+def test_ingest_endpoint_backpressure(monkeypatch):
+    writer = Recorder()
+    writer.release.clear()   # Hold the first batch so the buffer fills up
+    buffer = IngestBuffer(writer, max_rows=2, batch_rows=1, flush_ms=1)
+    monkeypatch.setattr(server, "ingest_buffer", buffer)
+    monkeypatch.setattr(db_helper, "archive_watermark", lambda refresh=False: None)
+    client = TestClient(server.app)
+    expense = {"expense_date": "2024-08-01", "amount": 4.5, "category": "Food", "notes": "scan"}
+
+    first = client.post("/ingest/expenses", json=[expense])
+    assert first.status_code == 202 and first.json()["accepted"] == 1
+    assert buffer.flush(timeout=0.2) is False          # First row is now in flight, blocked
+    assert client.post("/ingest/expenses", json=[expense, expense]).status_code == 202
+
+    full = client.post("/ingest/expenses", json=[expense])
+    assert full.status_code == 429 and full.headers["Retry-After"] == "1"
+
+    # More rows than the buffer can ever hold: 413, not a retry that can never succeed
+    rejected = buffer.stats()["rejected"]
+    too_large = client.post("/ingest/expenses", json=[expense] * 3)
+    assert too_large.status_code == 413 and "Retry-After" not in too_large.headers
+    assert buffer.stats()["rejected"] == rejected
+
+    writer.release.set()
+    buffer.close()
+    assert sum(len(batch) for batch in writer.batches) == 3
+
+
+# --------------------------------------------------------------------------------------
+# TEST CASE 5: Rejected data drops only the rows of the rejected date
+# --------------------------------------------------------------------------------------
+def test_rejected_date_keeps_other_rows():
+    archived = date(2024, 7, 31)
+    written = []
+
+    def writer(rows):
+        if any(entry[0] == archived for entry in rows):
+            raise db_helper.ArchivedDateError("2024-07 has been archived")
+        written.extend(rows)
+        return {entry[0] for entry in rows}
+
+    buffer = IngestBuffer(writer, batch_rows=10, flush_ms=60_000)
+    buffer.submit([row(1), (archived, 2.0, "Food", "late receipt"), row(3)])
+    buffer.close()
+
+    assert written == [row(1), row(3)]
+    assert buffer.stats()["written"] == 2 and buffer.stats()["failed"] == 1
+
+
+# --------------------------------------------------------------------------------------
+# TEST CASE 6: Rows left over from a batch keep their arrival time as deadline
+# --------------------------------------------------------------------------------------
+def test_leftover_rows_keep_their_deadline():
+    written_at = []
+
+    def slow_writer(rows):
+        time.sleep(0.2)
+        written_at.append(time.monotonic())
+        return {entry[0] for entry in rows}
+
+    buffer = IngestBuffer(slow_writer, batch_rows=2, flush_ms=1000)
+    started = time.monotonic()
+    buffer.submit([row(index) for index in range(9)])
+    while len(written_at) < 5 and time.monotonic() - started < 5:
+        time.sleep(0.01)
+    buffer.close()
+
+    # The last row is due 1 s after it arrived, not 1 s after the fourth batch was taken (~1.8 s)
+    assert len(written_at) == 5 and written_at[-1] - started < 1.5
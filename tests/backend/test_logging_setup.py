@@ -0,0 +1,112 @@
+"""
+=========================================================================================
+TEST MODULE: logging_setup.py
+-----------------------------------------------------------------------------------------
+PURPOSE:
+    Verifies the queued logging subsystem: one handler per logger no matter how often
+    setup_logger() is called, JSON output, sampling of low-severity records,
+    size-based rotation and the count of records dropped on a full queue.
+
+NOTES:
+    - Every test logs to its own file under pytest's tmp_path and stops that file's
+      writer thread (which flushes the queue) before reading it.
+=========================================================================================
+"""
+
+import json
+import logging
+import queue
+import threading
+
+from backend import logging_setup
+
+
+def read_lines(log_file):
+    logging_setup.shutdown_logging(str(log_file))
+    return log_file.read_text(encoding="utf-8").splitlines()
+
+
+# --------------------------------------------------------------------------------------
+# TEST CASE 1: Repeated setup returns the same logger without duplicate handlers
+# --------------------------------------------------------------------------------------
+def test_setup_is_idempotent(tmp_path):
+    log_file = tmp_path / "app.log"
+    first = logging_setup.setup_logger("test_idempotent", log_file=str(log_file))
+    second = logging_setup.setup_logger("test_idempotent", log_file=str(log_file))
+
+    assert first is second
+    assert len(first.handlers) == 1
+
+    first.info("saved %s rows", 3)
+    lines = read_lines(log_file)
+    assert len(lines) == 1 and lines[0].endswith("test_idempotent - INFO - saved 3 rows")
+
+
+# --------------------------------------------------------------------------------------
+# TEST CASE 2: JSON output writes one object per line, including exceptions
+# --------------------------------------------------------------------------------------
+def test_json_format(tmp_path):
+    log_file = tmp_path / "app.jsonl"
+    logger = logging_setup.setup_logger("test_json", log_file=str(log_file), format="json")
+
+    try:
+        raise ValueError("bad amount")
+    except ValueError:
+        logger.exception("import failed for %s", "2024-08-01")
+
+    entry = json.loads(read_lines(log_file)[0])
+    assert entry["level"] == "ERROR" and entry["logger"] == "test_json"
+    assert entry["message"] == "import failed for 2024-08-01"
+    assert "ValueError: bad amount" in entry["exception"]
+
+
+# --------------------------------------------------------------------------------------
+# TEST CASE 3: Sampling drops INFO records but never warnings
+# --------------------------------------------------------------------------------------
+def test_sampling_keeps_warnings(tmp_path):
+    log_file = tmp_path / "sampled.log"
+    logger = logging_setup.setup_logger("test_sampling", log_file=str(log_file), sample_rate=0.0)
+
+    for _ in range(50):
+        logger.info("hot path")
+    logger.warning("pool exhausted")
+
+    lines = read_lines(log_file)
+    assert len(lines) == 1 and lines[0].endswith("WARNING - pool exhausted")
+
+
+# --------------------------------------------------------------------------------------
+# TEST CASE 4: Size-based rotation keeps the configured number of backups
+# --------------------------------------------------------------------------------------
+def test_size_rotation(tmp_path):
+    log_file = tmp_path / "rotating.log"
+    logger = logging_setup.setup_logger("test_rotation", log_file=str(log_file), max_bytes=500, backups=2)
+
+    for index in range(100):
+        logger.log(logging.INFO, "line %s %s", index, "x" * 40)
+    read_lines(log_file)
+
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["rotating.log", "rotating.log.1", "rotating.log.2"]
+
+
+# --------------------------------------------------------------------------------------
+# TEST CASE 5: Records dropped concurrently on a full queue are all counted
+# --------------------------------------------------------------------------------------
+def test_dropped_records_counted_across_threads():
+    full = queue.Queue(maxsize=1)
+    full.put_nowait(None)
+    handler = logging_setup.NonBlockingQueueHandler(full)
+    record = logging.makeLogRecord({"msg": "overflow"})
+    before = logging_setup.NonBlockingQueueHandler.dropped
+
+    def drop_many():
+        for _ in range(2000):
+            handler.enqueue(record)
+
+    threads = [threading.Thread(target=drop_many) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert logging_setup.NonBlockingQueueHandler.dropped - before == 8 * 2000
@@ -0,0 +1,108 @@
+"""
+=========================================================================================
+TEST MODULE: metrics.py
+-----------------------------------------------------------------------------------------
+PURPOSE:
+    Verifies the Prometheus text rendering of histograms and gauges, the per-route
+    request timing middleware and the db_helper query timing decorator.
+=========================================================================================
+"""
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from backend import metrics
+
+
+# --------------------------------------------------------------------------------------
+# TEST CASE 1: Histogram buckets are cumulative and end with +Inf, _sum and _count
+# --------------------------------------------------------------------------------------
+def test_histogram_render():
+    histogram = metrics.Histogram("demo_seconds", "Demo.", ("route",), buckets=(0.1, 1.0))
+    histogram.observe(("/a",), 0.05)
+    histogram.observe(("/a",), 0.5)
+    histogram.observe(("/a",), 5.0)
+
+    text = histogram.render()
+
+    assert "# TYPE demo_seconds histogram" in text
+    assert 'demo_seconds_bucket{route="/a",le="0.1"} 1' in text
+    assert 'demo_seconds_bucket{route="/a",le="1.0"} 2' in text
+    assert 'demo_seconds_bucket{route="/a",le="+Inf"} 3' in text
+    assert 'demo_seconds_sum{route="/a"} 5.55' in text
+    assert 'demo_seconds_count{route="/a"} 3' in text
+
+
+# --------------------------------------------------------------------------------------
+# TEST CASE 2: Requests are labelled by route template, method and status code
+# --------------------------------------------------------------------------------------
+def test_middleware_labels_route_template():
+    app = FastAPI()
+    app.add_middleware(metrics.RequestMetricsMiddleware)
+
+    @app.get("/items/{item_date}")
+    def read_item(item_date: str):
+        return {"date": item_date}
+
+    client = TestClient(app)
+    client.get("/items/2024-08-01")
+    client.get("/items/2024-08-02")
+    client.get("/missing")
+
+    text = metrics.REQUEST_DURATION.render()
+    assert 'expense_http_request_duration_seconds_count{method="GET",route="/items/{item_date}",status="200"} 2' in text
+    assert 'route="unmatched",status="404"' in text
+    assert "2024-08-01" not in text
+
+
+# --------------------------------------------------------------------------------------
+# TEST CASE 3: Query timing records the function name and whether it raised
+# --------------------------------------------------------------------------------------
+def test_timed_query_outcomes():
+    @metrics.timed_query
+    def failing_lookup():
+        raise RuntimeError("db down")
+
+    @metrics.timed_query
+    def working_lookup():
+        return [1]
+
+    assert working_lookup() == [1]
+    with pytest.raises(RuntimeError):
+        failing_lookup()
+
+    text = metrics.QUERY_DURATION.render()
+    assert 'expense_db_query_duration_seconds_count{function="working_lookup",outcome="ok"} 1' in text
+    assert 'expense_db_query_duration_seconds_count{function="failing_lookup",outcome="error"} 1' in text
+
+
+# --------------------------------------------------------------------------------------
+# TEST CASE 4: Gauge callbacks render numeric values only
+# --------------------------------------------------------------------------------------
+def test_callback_gauges():
+    gauges = metrics.CallbackGauges("demo_pool", "Demo pool", lambda: {"open": 3, "pre_ping": True, "mode": "x"})
+
+    assert gauges.render().splitlines()[-1] == "demo_pool_open 3"
+    assert "pre_ping" not in gauges.render()
+
+
+# --------------------------------------------------------------------------------------
+# TEST CASE 5: A request failing after its headers were sent is observed once
+# --------------------------------------------------------------------------------------
+def test_middleware_observes_failed_stream_once():
+    import asyncio
+
+    async def failing_stream(scope, receive, send):
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+        raise RuntimeError("stream broke")
+
+    async def send(message):
+        pass
+
+    middleware = metrics.RequestMetricsMiddleware(failing_stream)
+    with pytest.raises(RuntimeError):
+        asyncio.run(middleware({"type": "http", "method": "TRACE"}, None, send))
+
+    text = metrics.REQUEST_DURATION.render()
+    assert 'expense_http_request_duration_seconds_count{method="TRACE",route="unmatched",status="200"} 1' in text
@@ -0,0 +1,101 @@
+"""
+=========================================================================================
+TEST MODULE: note search
+-----------------------------------------------------------------------------------------
+PURPOSE:
+    Verifies the full-text search over expense notes: the BOOLEAN MODE query built from
+    user text, the statements that keep 'expense_notes_fts' in step with writes, and
+    the GET /search/expenses endpoint.
+
+NOTES:
+    - No database is needed: statements are checked against a recording cursor and the
+      endpoint runs with db_helper.search_expense_notes replaced.
+=========================================================================================
+"""
+
+from datetime import date
+
+import pytest
+from fastapi.testclient import TestClient
+
+import db_helper
+import server
+
+
+class RecordingCursor:
+    """Records the statements executed through it."""
+
+    def __init__(self):
+        self.statements = []
+
+    def execute(self, sql, params=()):
+        self.statements.append((sql, list(params)))
+
+
+# --------------------------------------------------------------------------------------
+# TEST CASE 1: User text becomes required prefix terms; operators cannot be injected
+# --------------------------------------------------------------------------------------
+def test_build_fulltext_query():
+    assert db_helper.build_fulltext_query("Star coffee") == "+Star* +coffee*"
+    assert db_helper.build_fulltext_query('-rent "taxi" (uber)* @2') == "+rent* +taxi* +uber* +2*"
+    assert db_helper.build_fulltext_query("  ~<>* ") == ""
+    assert db_helper.build_fulltext_query(None) == ""
+    words = " ".join(f"w{n}" for n in range(20))
+    assert db_helper.build_fulltext_query(words).count("+") == db_helper.SEARCH_MAX_TERMS
+
+    with pytest.raises(ValueError):
+        db_helper.search_expense_notes("%%")
+
+
+# --------------------------------------------------------------------------------------
+# TEST CASE 2: Writes re-index their dates; batched appends only add rows
+# --------------------------------------------------------------------------------------
+def test_index_notes_statements():
+    cursor = RecordingCursor()
+    db_helper.index_notes(cursor, ["2024-08-02", "2024-08-01", "2024-08-02"])
+    (delete, delete_params), (insert, insert_params) = cursor.statements
+    assert delete.startswith("DELETE FROM expense_notes_fts") and delete.count("%s") == 2
+    assert insert.startswith("INSERT INTO expense_notes_fts") and "notes <> ''" in insert
+    assert delete_params == insert_params == ["2024-08-01", "2024-08-02"]
+
+    appended = RecordingCursor()
+    db_helper.index_notes(appended, ["2024-08-01"], append_only=True)
+    [(insert, _)] = appended.statements
+    assert insert.startswith("INSERT IGNORE INTO expense_notes_fts")
+
+    db_helper.index_notes(appended, [])
+    assert len(appended.statements) == 1
+    assert "LIKE" not in db_helper.NOTES_SEARCH_SQL and "MATCH(notes)" in db_helper.NOTES_SEARCH_SQL
+
+
+# --------------------------------------------------------------------------------------
+# TEST CASE 3: GET /search/expenses passes its filters through and rejects bad input
+# --------------------------------------------------------------------------------------
+def test_search_endpoint(monkeypatch):
+    calls = []
+
+    def fake_search(text, start_date=None, end_date=None, category=None, limit=20, offset=0):
+        calls.append((text, start_date, end_date, category, limit, offset))
+        if not db_helper.build_fulltext_query(text):
+            raise ValueError("Search text must contain at least one letter or digit")
+        return {
+            "query": db_helper.build_fulltext_query(text), "total_matches": 1, "total_amount": 4.5,
+            "limit": limit, "offset": offset,
+            "results": [{"id": 7, "expense_date": date(2024, 8, 1), "category": "Food",
+                         "amount": 4.5, "notes": "Starbucks latte", "score": 1.2}],
+        }
+
+    monkeypatch.setattr(db_helper, "search_expense_notes", fake_search)
+    client = TestClient(server.app)
+
+    response = client.get("/search/expenses", params={
+        "q": "starbucks", "start_date": "2024-08-01", "end_date": "2024-08-31", "category": "Food", "limit": 5,
+    })
+    assert response.status_code == 200
+    assert response.json()["results"][0]["expense_date"] == "2024-08-01"
+    assert calls == [("starbucks", date(2024, 8, 1), date(2024, 8, 31), "Food", 5, 0)]
+
+    assert client.get("/search/expenses", params={"q": "!!"}).status_code == 400
+    assert client.get("/search/expenses", params={"q": "x", "start_date": "2024-09-01", "end_date": "2024-08-01"}).status_code == 400
+    assert client.get("/search/expenses", params={"q": "x", "limit": 0}).status_code == 422
+    assert client.get("/search/expenses").status_code == 422
@@ -0,0 +1,122 @@
+"""
+=========================================================================================
+TEST MODULE: partitions.py
+-----------------------------------------------------------------------------------------
+PURPOSE:
+    Verifies the monthly partition planning (which partitions 'ensure' creates and which
+    ones 'archive' removes) and the read-only guard for archived dates in db_helper.
+
+NOTES:
+    - Only the pure planning functions are exercised; no database is needed. The
+      in-transaction guard runs against a scripted cursor.
+=========================================================================================
+"""
+
+from contextlib import contextmanager
+from datetime import date
+
+import pytest
+
+import db_helper
+from partitions import add_months, parse_bound, plan_archive, plan_new_partitions
+
+
+def partition(name, bound):
+    return {"name": name, "bound": bound}
+
+
+# --------------------------------------------------------------------------------------
+# TEST CASE 1: 'ensure' plans one partition per month and continues after the last bound
+# --------------------------------------------------------------------------------------
+def test_plan_new_partitions():
+    assert add_months(date(2024, 11, 1), 3) == date(2025, 2, 1)
+    assert parse_bound("'2024-09-01'") == date(2024, 9, 1) and parse_bound("MAXVALUE") is None
+
+    fresh = plan_new_partitions([partition("p_future", None)], date(2024, 10, 17), date(2025, 1, 1))
+    assert fresh == [
+        ("p202410", date(2024, 11, 1)), ("p202411", date(2024, 12, 1)),
+        ("p202412", date(2025, 1, 1)), ("p202501", date(2025, 2, 1)),
+    ]
+
+    existing = [partition("p202412", date(2025, 1, 1)), partition("p202501", date(2025, 2, 1)), partition("p_future", None)]
+    assert plan_new_partitions(existing, date(2024, 10, 1), date(2025, 2, 1)) == [("p202502", date(2025, 3, 1))]
+    assert plan_new_partitions(existing, date(2024, 10, 1), date(2025, 1, 1)) == []
+
+
+# --------------------------------------------------------------------------------------
+# TEST CASE 2: 'archive' only selects whole months before the cutoff, oldest first
+# --------------------------------------------------------------------------------------
+def test_plan_archive():
+    existing = [
+        partition("p202101", date(2021, 2, 1)),
+        partition("p202102", date(2021, 3, 1)),
+        partition("p202103", date(2021, 4, 1)),
+        partition("p_future", None),
+    ]
+
+    assert plan_archive(existing, date(2021, 3, 15)) == [
+        {"name": "p202101", "range_start": None, "range_end": date(2021, 2, 1)},
+        {"name": "p202102", "range_start": date(2021, 2, 1), "range_end": date(2021, 3, 1)},
+    ]
+    assert plan_archive(existing, date(2021, 1, 31)) == []
+
+
+# --------------------------------------------------------------------------------------
+# TEST CASE 3: Writes before the archive watermark are rejected
+# --------------------------------------------------------------------------------------
+def test_archived_dates_are_read_only():
+    db_helper.raise_if_archived(["2024-08-01"], None)
+    db_helper.raise_if_archived([date(2024, 8, 1), "2024-09-30"], date(2024, 8, 1))
+
+    with pytest.raises(db_helper.ArchivedDateError, match="2024-07-31"):
+        db_helper.raise_if_archived(["2024-07-31", "2024-08-01"], date(2024, 8, 1))
+
+
+# --------------------------------------------------------------------------------------
+# TEST CASE 4: A write after 'archive' is refused inside its transaction, even with a warm cache
+# --------------------------------------------------------------------------------------
+class ScriptedCursor:
+    """Answers the locking watermark read; records every statement."""
+
+    def __init__(self, watermark):
+        self.watermark = watermark
+        self.statements = []
+
+    def execute(self, sql, params=()):
+        self.statements.append(sql)
+
+    def executemany(self, sql, params):
+        self.statements.append(sql)
+
+    def fetchone(self):
+        assert self.statements[-1] == db_helper.ARCHIVE_WATERMARK_LOCK_SQL
+        return {"watermark": self.watermark}
+
+
+def test_write_after_archive_with_warm_cache(monkeypatch):
+    monkeypatch.setattr(db_helper, "_archive_watermark", {"value": None, "loaded_at": None})
+    # This process cached "nothing archived" just before another process archived August
+    db_helper.store_archive_watermark(None)
+    cursor = ScriptedCursor(watermark=date(2024, 9, 1))
+    outcome = {}
+
+    @contextmanager
+    def fake_cursor(commit=False, readonly=False, dictionary=True):
+        try:
+            yield cursor
+            outcome["committed"] = commit
+        except Exception:
+            outcome["rolled_back"] = True
+            raise
+
+    monkeypatch.setattr(db_helper, "get_db_cursor", fake_cursor)
+
+    with pytest.raises(db_helper.ArchivedDateError, match="2024-08-15"):
+        db_helper.replace_expenses_for_date("2024-08-15", [{"amount": 5, "category": "Food", "notes": ""}])
+
+    assert outcome == {"rolled_back": True}
+    assert not any("expense_daily_rollup" in sql for sql in cursor.statements)
+    # The locked read also refreshed the cache, so the next write is rejected up front
+    assert db_helper.cached_archive_watermark() == (True, date(2024, 9, 1))
+    with pytest.raises(db_helper.ArchivedDateError):
+        db_helper.check_writable(["2024-08-16"])
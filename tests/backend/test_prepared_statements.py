@@ -0,0 +1,154 @@
+"""
+=========================================================================================
+TEST MODULE: prepared_statements.py
+-----------------------------------------------------------------------------------------
+PURPOSE:
+    Verifies the prepared-statement mode of db_helper.get_db_cursor(): hot statements
+    reuse one prepared cursor per connection, other statements use a regular cursor,
+    FLOAT values read like the text protocol, and the tuple-row fast path of GET /expenses/{date}.
+
+NOTES:
+    - A fake connection records the cursors it hands out; no database is needed.
+=========================================================================================
+"""
+
+import pytest
+from mysql.connector import FieldType
+
+import db_helper
+import prepared_statements
+from db_pool import PooledConnection
+from prepared_statements import PreparedCursor, StatementCache, float32_text
+
+HOT_SQL = "SELECT amount FROM expenses WHERE expense_date = %s"
+
+
+class FakeCursor:
+    def __init__(self, prepared, dictionary, rows):
+        self.prepared = prepared
+        self.dictionary = dictionary
+        self.table = rows
+        self.rows = rows
+        self.executed = []
+        self.closed = False
+        self.description = [("amount", FieldType.FLOAT), ("notes", FieldType.VAR_STRING)]
+
+    def execute(self, sql, params=None):
+        self.executed.append(sql)
+        if sql == db_helper.DATE_VERSION_SQL:
+            self.rows, self.description = [(3,)], [("version", FieldType.LONGLONG)]
+        elif sql == db_helper.SELECT_ROWS_BY_DATE_SQL:
+            self.rows = self.table
+            self.description = [(field, FieldType.FLOAT if field == "amount" else FieldType.VAR_STRING)
+                                for field in db_helper.EXPENSE_ROW_FIELDS]
+
+    def executemany(self, sql, params):
+        self.executed.append(sql)
+
+    def fetchone(self):
+        return self.fetchall()[0]
+
+    def fetchall(self):
+        if self.dictionary:
+            return [dict(zip((column[0] for column in self.description), row)) for row in self.rows]
+        return list(self.rows)
+
+    def close(self):
+        self.closed = True
+
+
+class FakeConnection:
+    in_transaction = False
+    unread_result = False
+
+    def __init__(self, rows=()):
+        self.rows = list(rows)
+        self.cursors = []
+
+    def cursor(self, prepared=False, dictionary=False):
+        cursor = FakeCursor(prepared, dictionary, self.rows)
+        self.cursors.append(cursor)
+        return cursor
+
+
+# --------------------------------------------------------------------------------------
+# TEST CASE 1: FLOAT values from the binary protocol read back as their shortest decimal
+# --------------------------------------------------------------------------------------
+def test_float32_text():
+    import struct
+    for text in ("12.3", "0.1", "4.99", "1234.56", "100", "-7.25"):
+        single = struct.unpack("f", struct.pack("f", float(text)))[0]
+        assert float32_text(single) == float(text)
+
+
+# --------------------------------------------------------------------------------------
+# TEST CASE 2: Hot statements reuse one prepared cursor each; the rest use a plain cursor
+# --------------------------------------------------------------------------------------
+def test_prepared_cursor_routing():
+    connection = FakeConnection(rows=[(12.300000190734863, "lunch")])
+    cache = StatementCache(connection, max_statements=2)
+    cursor = PreparedCursor(cache, frozenset({HOT_SQL, "DELETE FROM t", "SELECT 2"}))
+
+    # An equal string that is not the same object still reuses the prepared handle
+    cursor.execute("".join(["SELECT amount ", "FROM expenses WHERE expense_date = %s"]), ("2024-08-01",))
+    assert cursor.fetchall() == [{"amount": 12.3, "notes": "lunch"}]
+    cursor.execute(HOT_SQL, ("2024-08-02",))
+    [prepared] = [c for c in connection.cursors if c.prepared]
+    assert prepared.executed[0] is prepared.executed[1] and len(cache) == 1
+
+    cursor.execute("SELECT NOW()")
+    cursor.executemany("INSERT INTO t VALUES (%s)", [(1,), (2,)])
+    plain = [c for c in connection.cursors if not c.prepared]
+    assert len(plain) == 1 and plain[0].executed == ["SELECT NOW()", "INSERT INTO t VALUES (%s)"]
+
+    # Tuple rows from another facade share the cache under their own key
+    tuples = PreparedCursor(cache, frozenset({HOT_SQL}), dictionary=False)
+    tuples.execute(HOT_SQL, ("2024-08-01",))
+    assert tuples.fetchall() == [(12.3, "lunch")]
+
+    # Beyond 'max_statements' the least recently used statement is closed
+    cursor.execute("DELETE FROM t")
+    assert len(cache) == 2 and prepared.closed
+
+    cursor.close()
+    assert plain[0].closed
+    connection.unread_result = True
+    with pytest.raises(RuntimeError):
+        cursor.close()
+
+
+# --------------------------------------------------------------------------------------
+# TEST CASE 3: get_db_cursor() keeps the statements with the pooled connection
+# --------------------------------------------------------------------------------------
+class FakePool:
+    def __init__(self, connection):
+        self.pooled = PooledConnection(connection)
+        self.released = []
+
+    def acquire(self):
+        return self.pooled
+
+    def release(self, pooled, discard=False):
+        self.released.append(discard)
+
+
+def test_get_db_cursor_prepared_mode(monkeypatch):
+    connection = FakeConnection(rows=[(7, 4.5, "Food", "")])
+    pool = FakePool(connection)
+    monkeypatch.setattr(db_helper, "get_pool", lambda: pool)
+    monkeypatch.setitem(db_helper.PREPARED_CONFIG, "enabled", True)
+    monkeypatch.setattr(db_helper.profiler, "enabled", False)
+    before = prepared_statements.statement_stats()
+
+    for _ in range(3):
+        assert db_helper.retrieve_expenses_with_version("2024-08-01") == (3, [
+            {"id": 7, "amount": 4.5, "category": "Food", "notes": ""}
+        ])
+
+    # One checkout per call; the version and row statements are prepared once each
+    assert [c.prepared for c in connection.cursors] == [True, True]
+    assert pool.pooled.statements is not None and pool.released == [False] * 3
+    after = db_helper.get_statement_stats()
+    assert after["enabled"] is True
+    assert after["prepares"] - before["prepares"] == 2
+    assert after["executions"] - before["executions"] == 6
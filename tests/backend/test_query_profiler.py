@@ -0,0 +1,119 @@
+"""
+=========================================================================================
+TEST MODULE: query_profiler.py
+-----------------------------------------------------------------------------------------
+PURPOSE:
+    Verifies statement timing through the profiled cursor, aggregation by statement
+    shape, the slow-query log (with EXPLAIN capture) and the log summary used by the CLI.
+
+NOTES:
+    - A scripted fake cursor stands in for mysql.connector; no database is needed.
+=========================================================================================
+"""
+
+import json
+from datetime import date
+
+import logging_setup        # The same module object query_profiler writes through
+from backend.query_profiler import QueryProfiler, normalize_sql, param_shape, summarize_log
+
+
+class FakeCursor:
+    """Returns 'rows' for every SELECT and reports 'rowcount' for other statements."""
+
+    def __init__(self, rows=(), rowcount=-1):
+        self.rows = list(rows)
+        self.rowcount = rowcount
+        self.executed = []
+
+    def execute(self, sql, params=None):
+        self.executed.append((sql, params))
+
+    def executemany(self, sql, seq_params):
+        self.executed.append((sql, seq_params))
+
+    def fetchall(self):
+        return list(self.rows)
+
+    def close(self):
+        pass
+
+
+class FakeConnection:
+    def __init__(self):
+        self.explained = []
+
+    def cursor(self, dictionary=False):
+        connection = self
+
+        class ExplainCursor(FakeCursor):
+            def execute(self, sql, params=None):
+                connection.explained.append(sql)
+
+        return ExplainCursor(rows=[{"table": "expenses", "type": "ref", "key": "idx_expenses_date_category"}])
+
+
+# --------------------------------------------------------------------------------------
+# TEST CASE 1: SQL with placeholder lists of any length shares one aggregation key
+# --------------------------------------------------------------------------------------
+def test_normalize_sql_and_param_shape():
+    assert normalize_sql("DELETE FROM t WHERE d IN (%s, %s)") == normalize_sql("DELETE  FROM t\nWHERE d IN (%s,%s,%s)")
+    assert param_shape((date(2024, 8, 1), 10.5)) == "(date, float)"
+    assert param_shape(("2024-08-01", 1.0, "Food", ""), 3) == "(str, float, str, str) x 3"
+
+
+# --------------------------------------------------------------------------------------
+# TEST CASE 2: Statements are aggregated with call counts and fetched rows
+# --------------------------------------------------------------------------------------
+def test_statements_are_aggregated():
+    profiler = QueryProfiler(threshold_ms=10_000)
+    cursor = profiler.wrap(FakeCursor(rows=[{"id": 1}, {"id": 2}]))
+
+    for _ in range(3):
+        cursor.execute("SELECT * FROM expenses WHERE expense_date = %s", ("2024-08-01",))
+        cursor.fetchall()
+    cursor.close()
+
+    [statement] = profiler.top(5)
+    assert statement["sql"] == "SELECT * FROM expenses WHERE expense_date = %s"
+    assert statement["calls"] == 3 and statement["rows"] == 6 and statement["slow"] == 0
+
+
+# --------------------------------------------------------------------------------------
+# TEST CASE 3: Slow statements go to the slow-query log with their EXPLAIN plan
+# --------------------------------------------------------------------------------------
+def test_slow_statement_logged_with_explain(tmp_path):
+    log_file = tmp_path / "slow.log"
+    profiler = QueryProfiler(threshold_ms=0, log_file=str(log_file), explain=True)
+    cursor = profiler.wrap(FakeCursor(rowcount=4))
+
+    cursor.execute("DELETE FROM expenses WHERE expense_date = %s", ("2024-08-01",))
+    cursor.close()
+    connection = FakeConnection()
+    profiler.flush(cursor, connection)
+    logging_setup.shutdown_logging(str(log_file))
+
+    entry = json.loads(log_file.read_text(encoding="utf-8").splitlines()[0])
+    assert entry["sql"] == "DELETE FROM expenses WHERE expense_date = %s"
+    assert entry["params"] == "(str)" and entry["rows"] == 4
+    assert entry["explain"][0]["key"] == "idx_expenses_date_category"
+    assert connection.explained == ["EXPLAIN DELETE FROM expenses WHERE expense_date = %s"]
+
+
+# --------------------------------------------------------------------------------------
+# TEST CASE 4: The CLI summary ranks statements by total time
+# --------------------------------------------------------------------------------------
+def test_summarize_log():
+    lines = [
+        json.dumps({"function": "fetch_expense_summary", "sql": "SELECT a", "duration_ms": 150.0}),
+        json.dumps({"function": "retrieve_expenses_by_date", "sql": "SELECT b", "duration_ms": 120.0}),
+        json.dumps({"function": "retrieve_expenses_by_date", "sql": "SELECT b", "duration_ms": 130.0}),
+        "not json",
+    ]
+
+    report = summarize_log(lines, n=1)
+
+    assert report == [{
+        "function": "retrieve_expenses_by_date", "sql": "SELECT b", "calls": 2,
+        "total_ms": 250.0, "avg_ms": 125.0, "max_ms": 130.0,
+    }]
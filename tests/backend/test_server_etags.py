@@ -0,0 +1,82 @@
+"""
+=========================================================================================
+TEST MODULE: server.py (conditional GET)
+-----------------------------------------------------------------------------------------
+PURPOSE:
+    Verifies that GET /expenses/{date} and GET /analytics/ return ETags, answer a
+    matching If-None-Match with 304 Not Modified, and change the ETag after a write.
+
+NOTES:
+    - db_helper is backed by the seeded SQLite stand-in used by the benchmarks.
+=========================================================================================
+"""
+
+import pytest
+from fastapi.testclient import TestClient
+
+import db_helper
+import server
+from analytics_cache import summary_cache
+from tests.benchmarks.fake_db import SQLiteExpenseStore
+
+
+@pytest.fixture
+def client():
+    store = SQLiteExpenseStore(rows=500, days=30, seed=7)
+    restore = store.install(db_helper)
+    summary_cache.clear()
+    try:
+        yield TestClient(server.app)
+    finally:
+        restore()
+        store.close()
+        summary_cache.clear()
+
+
+# --------------------------------------------------------------------------------------
+# TEST CASE 1: A day's ETag validates until that day is written
+# --------------------------------------------------------------------------------------
+def test_expenses_etag(client):
+    first = client.get("/expenses/2022-01-05")
+    etag = first.headers["ETag"]
+    assert first.status_code == 200 and first.json()
+
+    cached = client.get("/expenses/2022-01-05", headers={"If-None-Match": etag})
+    assert cached.status_code == 304 and cached.content == b""
+    assert cached.headers["ETag"] == etag
+
+    client.post("/expenses/2022-01-05", json=[{"amount": 12.5, "category": "Food", "notes": "lunch"}])
+
+    changed = client.get("/expenses/2022-01-05", headers={"If-None-Match": etag})
+    assert changed.status_code == 200 and changed.headers["ETag"] != etag
+    [row] = changed.json()
+    assert row.pop("id") and row == {"amount": 12.5, "category": "Food", "notes": "lunch"}
+
+    # Without a validator the version comes from the same read as the rows
+    def separate_version_read(expense_date):
+        raise AssertionError("unconditional GET must not read the version separately")
+    db_helper.fetch_date_version = separate_version_read
+    plain = client.get("/expenses/2022-01-05")
+    assert plain.status_code == 200 and plain.headers["ETag"] == changed.headers["ETag"]
+
+
+# --------------------------------------------------------------------------------------
+# TEST CASE 2: A range's ETag changes when any date inside it is written
+# --------------------------------------------------------------------------------------
+def test_analytics_etag(client):
+    params = {"start_date": "2022-01-01", "end_date": "2022-01-10"}
+    first = client.get("/analytics/", params=params)
+    etag = first.headers["ETag"]
+
+    # Served from the summary cache, then (after a cache clear) from the version lookup alone
+    assert client.get("/analytics/", params=params, headers={"If-None-Match": etag}).status_code == 304
+    summary_cache.clear()
+    assert client.get("/analytics/", params=params, headers={"If-None-Match": etag.removeprefix("W/")}).status_code == 304
+
+    client.post("/expenses/2022-01-20", json=[{"amount": 1.0, "category": "Food", "notes": ""}])
+    assert client.get("/analytics/", params=params, headers={"If-None-Match": etag}).status_code == 304
+
+    client.post("/expenses/2022-01-03", json=[{"amount": 1.0, "category": "Food", "notes": ""}])
+    changed = client.get("/analytics/", params=params, headers={"If-None-Match": etag})
+    assert changed.status_code == 200 and changed.headers["ETag"] != etag
+    assert changed.json() == client.post("/analytics/", json=params).json()
@@ -0,0 +1,167 @@
+"""
+=========================================================================================
+TEST MODULE: snapshot.py
+-----------------------------------------------------------------------------------------
+PURPOSE:
+    Verifies that snapshot and live-delta totals are merged exactly, that the analytics
+    endpoints fall back to MySQL when the snapshot engine cannot answer, and (when
+    pyarrow and duckdb are installed) that a built snapshot plus the live delta matches
+    the rollup it was taken from.
+
+NOTES:
+    - The end-to-end case replaces the db_helper snapshot sources with in-memory rows.
+=========================================================================================
+"""
+
+from datetime import date, datetime
+from decimal import Decimal
+
+import pytest
+from fastapi.testclient import TestClient
+
+import db_helper
+import server
+import snapshot
+from analytics_cache import summary_cache
+from tests.benchmarks.fake_db import SQLiteExpenseStore
+
+
+# --------------------------------------------------------------------------------------
+# TEST CASE 1: Snapshot totals and the live delta add up per category and per period
+# --------------------------------------------------------------------------------------
+def test_merge_helpers():
+    assert snapshot.months_between(date(2023, 11, 5), date(2024, 2, 1)) == ["2023-11", "2023-12", "2024-01", "2024-02"]
+    assert snapshot.month_range("2024-02") == (date(2024, 2, 1), date(2024, 2, 29))
+    assert snapshot.period_start(date(2024, 8, 15), "week") == date(2024, 8, 12)
+
+    live = [
+        {"expense_date": date(2024, 8, 15), "category": "Food", "total_amount": Decimal("2.50")},
+        {"expense_date": date(2024, 9, 1), "category": "Rent", "total_amount": Decimal("100.00")},
+    ]
+    assert snapshot.merge_summary([("Food", Decimal("10.00"))], live) == [
+        {"category": "Food", "sum(amount)": Decimal("12.50")},
+        {"category": "Rent", "sum(amount)": Decimal("100.00")},
+    ]
+    assert snapshot.merge_trends([(date(2024, 8, 1), "Food", Decimal("10.00"))], live, "month") == [
+        {"period": date(2024, 8, 1), "category": "Food", "total": Decimal("12.50")},
+        {"period": date(2024, 9, 1), "category": "Rent", "total": Decimal("100.00")},
+    ]
+
+
+    # Categories are grouped case-insensitively, as MySQL's collation does
+    mixed = [{"expense_date": date(2024, 8, 15), "category": "food", "total_amount": Decimal("1.00")}]
+    assert snapshot.merge_summary([("Food", Decimal("10.00"))], mixed) == [
+        {"category": "Food", "sum(amount)": Decimal("11.00")},
+    ]
+    assert snapshot.merge_trends([(date(2024, 8, 1), "FOOD", Decimal("10.00"))], mixed, "month") == [
+        {"period": date(2024, 8, 1), "category": "FOOD", "total": Decimal("11.00")},
+    ]
+
+
+# --------------------------------------------------------------------------------------
+# TEST CASE 2: The manifest is parsed again only when its file changes
+# --------------------------------------------------------------------------------------
+def test_manifest_cache(tmp_path, monkeypatch):
+    store = snapshot.SnapshotStore(str(tmp_path))
+    assert store.manifest() is None
+
+    store._write_manifest({"snapshot_time": "2024-08-01T00:00:00", "months": {"2024-07": 3}})
+    loads = []
+    real_load = snapshot.json.load
+    monkeypatch.setattr(snapshot.json, "load", lambda handle: loads.append(1) or real_load(handle))
+    assert store.manifest()["months"] == {"2024-07": 3}
+    assert store.manifest()["months"] == {"2024-07": 3}
+    assert len(loads) == 1
+
+    store._write_manifest({"snapshot_time": "2024-08-02T00:00:00", "months": {"2024-07": 3, "2024-08": 1}})
+    assert store.manifest()["months"] == {"2024-07": 3, "2024-08": 1}
+    assert len(loads) == 2
+
+# --------------------------------------------------------------------------------------
+# TEST CASE 3: The analytics endpoints fall back to MySQL when the snapshot cannot answer
+# --------------------------------------------------------------------------------------
+def test_fallback_to_mysql(monkeypatch, tmp_path):
+    store = SQLiteExpenseStore(rows=500, days=30, seed=7)
+    restore = store.install(db_helper)
+    summary_cache.clear()
+    monkeypatch.setitem(snapshot.SNAPSHOT_CONFIG, "engine", "snapshot")
+    monkeypatch.setitem(snapshot.SNAPSHOT_CONFIG, "min_days", 1)
+    monkeypatch.setattr(snapshot, "store", snapshot.SnapshotStore(str(tmp_path)))
+    try:
+        client = TestClient(server.app)
+        params = {"start_date": "2022-01-01", "end_date": "2022-01-30"}
+        expected = db_helper.fetch_expense_summary(date(2022, 1, 1), date(2022, 1, 30))
+
+        # No snapshot built yet
+        assert not snapshot.use_snapshot(date(2022, 1, 1), date(2022, 1, 30))
+        assert client.post("/analytics/", json=params).status_code == 200
+
+        # A snapshot that fails to answer is logged and bypassed
+        def broken(*args):
+            raise RuntimeError("corrupt snapshot")
+        monkeypatch.setattr(snapshot.store, "available", lambda: True)
+        monkeypatch.setattr(snapshot.store, "summary", broken)
+        assert snapshot.fetch_expense_summary(date(2022, 1, 1), date(2022, 1, 30)) == expected
+    finally:
+        restore()
+        store.close()
+        summary_cache.clear()
+
+
+# --------------------------------------------------------------------------------------
+# TEST CASE 4: A snapshot plus the live delta matches the current rollup
+# --------------------------------------------------------------------------------------
+def test_snapshot_with_live_delta(monkeypatch, tmp_path):
+    pytest.importorskip("pyarrow")
+    pytest.importorskip("duckdb")
+
+    rollup = {
+        (date(2024, 7, 30), "Food"): Decimal("10.00"),
+        (date(2024, 8, 2), "Food"): Decimal("5.00"),
+        (date(2024, 8, 2), "Rent"): Decimal("700.00"),
+        (date(2024, 9, 10), "Shopping"): Decimal("42.00"),
+    }
+    changed = {}   # date -> updated_at
+    clock = [datetime(2024, 10, 1, 12, 0)]
+
+    def rows(predicate):
+        return [
+            {"expense_date": day, "category": category, "total_amount": total, "expense_count": 1}
+            for (day, category), total in sorted(rollup.items()) if predicate(day)
+        ]
+
+    monkeypatch.setattr(db_helper, "fetch_db_time", lambda: clock[0])
+    monkeypatch.setattr(db_helper, "stream_rollup_between", lambda start, end: iter(rows(lambda day: start <= day <= end)))
+    monkeypatch.setattr(db_helper, "fetch_rollup_for_dates", lambda dates: rows(lambda day: day in set(dates)))
+    monkeypatch.setattr(
+        db_helper, "fetch_changed_dates",
+        lambda since, start=date(1000, 1, 1), end=date(9999, 12, 31): sorted(
+            day for day, stamp in changed.items() if stamp > since and str(start) <= str(day) <= str(end)
+        ),
+    )
+
+    store = snapshot.SnapshotStore(str(tmp_path), margin_seconds=0)
+    assert store.build()["months"] == ["2024-07", "2024-08", "2024-09"]
+
+    # Written after the snapshot: answered from the live rollup, not the stale file
+    rollup[(date(2024, 8, 2), "Food")] = Decimal("6.00")
+    rollup[(date(2024, 8, 20), "Travel")] = Decimal("99.00")
+    changed.update({date(2024, 8, 2): datetime(2024, 10, 1, 12, 5), date(2024, 8, 20): datetime(2024, 10, 1, 12, 5)})
+
+    assert store.summary(date(2024, 7, 1), date(2024, 9, 30)) == [
+        {"category": "Food", "sum(amount)": Decimal("16.00")},
+        {"category": "Rent", "sum(amount)": Decimal("700.00")},
+        {"category": "Shopping", "sum(amount)": Decimal("42.00")},
+        {"category": "Travel", "sum(amount)": Decimal("99.00")},
+    ]
+    assert store.trends(date(2024, 8, 1), date(2024, 8, 31), "month") == [
+        {"period": date(2024, 8, 1), "category": "Food", "total": Decimal("6.00")},
+        {"period": date(2024, 8, 1), "category": "Rent", "total": Decimal("700.00")},
+        {"period": date(2024, 8, 1), "category": "Travel", "total": Decimal("99.00")},
+    ]
+
+    # An incremental build rewrites only the changed month and empties the live delta
+    clock[0] = datetime(2024, 10, 1, 13, 0)
+    assert store.build()["months"] == ["2024-08"]
+    changed.clear()
+    assert store.status()["stale_dates"] == 0
@@ -0,0 +1,104 @@
+"""
+=========================================================================================
+TEST MODULE: streaming_stats.py
+-----------------------------------------------------------------------------------------
+PURPOSE:
+    Verifies the single-pass statistics sketches (Welford accumulators and t-digest
+    quantiles), including merging, case-insensitive category
+    grouping and the POST /analytics/stats endpoint.
+
+NOTES:
+    - Exact results are compared with the statistics module; quantiles within 1 %.
+    - The endpoint runs against the seeded SQLite stand-in used by the benchmarks.
+=========================================================================================
+"""
+
+import random
+import statistics
+
+import pytest
+from fastapi.testclient import TestClient
+
+import db_helper
+import server
+from streaming_stats import CategoryStats, RunningStats, TDigest, summarize
+from tests.benchmarks.fake_db import SQLiteExpenseStore
+
+
+# --------------------------------------------------------------------------------------
+# TEST CASE 1: Welford accumulators match the exact statistics, also after merging
+# --------------------------------------------------------------------------------------
+def test_running_stats():
+    rng = random.Random(3)
+    values = [rng.uniform(1, 500) for _ in range(5000)]
+
+    whole, left, right = RunningStats(), RunningStats(), RunningStats()
+    for index, value in enumerate(values):
+        whole.add(value)
+        (left if index % 3 else right).add(value)
+    left.merge(right)
+
+    for stats in (whole, left):
+        assert stats.count == len(values)
+        assert stats.mean == pytest.approx(statistics.fmean(values))
+        assert stats.stddev == pytest.approx(statistics.stdev(values))
+        assert (stats.min, stats.max) == (min(values), max(values))
+
+
+# --------------------------------------------------------------------------------------
+# TEST CASE 2: t-digest quantiles are close while the number of centroids stays bounded
+# --------------------------------------------------------------------------------------
+def test_tdigest_quantiles():
+    rng = random.Random(5)
+    values = [rng.lognormvariate(3, 1) for _ in range(100_000)]
+    ordered = sorted(values)
+
+    first, second = TDigest(), TDigest()
+    for index, value in enumerate(values):
+        (first if index < 50_000 else second).add(value)
+    assert first.centroid_count() < 1000
+
+    first.merge(second)
+    for q in (0.5, 0.9, 0.99):
+        assert first.quantile(q) == pytest.approx(ordered[int(q * len(ordered))], rel=0.01)
+    assert first.quantile(0.0) == ordered[0] and first.quantile(1.0) == ordered[-1]
+    assert TDigest().quantile(0.5) is None
+
+
+# --------------------------------------------------------------------------------------
+# TEST CASE 3: POST /analytics/stats summarises the streamed rows per category
+# --------------------------------------------------------------------------------------
+def test_stats_endpoint():
+    store = SQLiteExpenseStore(rows=500, days=30, seed=7)
+    restore = store.install(db_helper)
+    try:
+        client = TestClient(server.app)
+        params = {"start_date": "2022-01-01", "end_date": "2022-01-30"}
+        body = client.post("/analytics/stats", json=params).json()
+
+        assert body == summarize(db_helper.stream_amounts_between("2022-01-01", "2022-01-30"))
+        assert sum(stats["count"] for stats in body.values()) == 500
+        for stats in body.values():
+            assert stats["min"] <= stats["median"] <= stats["p90"] <= stats["p99"] <= stats["max"]
+
+        assert client.post("/analytics/stats", json={"start_date": "2022-02-01", "end_date": "2022-01-01"}).status_code == 400
+    finally:
+        restore()
+        store.close()
+
+
+# --------------------------------------------------------------------------------------
+# TEST CASE 4: Categories differing only in case are one group, named by the smallest spelling
+# --------------------------------------------------------------------------------------
+def test_categories_grouped_case_insensitively():
+    report = summarize([("food", 10), ("Food", 20), ("FOOD", 30), ("Rent", 5)])
+
+    assert list(report) == ["FOOD", "Rent"]
+    assert report["FOOD"]["count"] == 3 and report["FOOD"]["total"] == 60.0
+
+    left, right = CategoryStats(), CategoryStats()
+    left.add("rent", 5)
+    right.add("Rent", 7)
+    left.merge(right)
+    merged = left.report()
+    assert list(merged) == ["Rent"] and merged["Rent"]["count"] == 2
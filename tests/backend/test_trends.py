@@ -0,0 +1,46 @@
+"""
+=========================================================================================
+TEST MODULE: trends.py
+-----------------------------------------------------------------------------------------
+PURPOSE:
+    Verifies the vectorized post-processing behind `POST /analytics/trends`: empty
+    periods are filled, and percentages, running totals and changes line up per period.
+=========================================================================================
+"""
+
+from datetime import date
+from decimal import Decimal
+
+from backend import trends
+
+
+# --------------------------------------------------------------------------------------
+# TEST CASE 1: Monthly buckets, including a month without any expenses
+# --------------------------------------------------------------------------------------
+def test_monthly_report_fills_gaps_and_derives_series():
+    rows = [
+        {"period": date(2024, 7, 1), "category": "Food", "total": Decimal("100")},
+        {"period": date(2024, 7, 1), "category": "Rent", "total": Decimal("300")},
+        {"period": date(2024, 9, 1), "category": "Food", "total": Decimal("150")},
+    ]
+
+    report = trends.build_trend_report(rows, date(2024, 7, 15), date(2024, 9, 30), "month")
+
+    assert report["periods"] == ["2024-07-01", "2024-08-01", "2024-09-01"]
+    assert report["period_totals"] == [400.0, 0.0, 150.0]
+    food = report["categories"]["Food"]
+    assert food["total"] == [100.0, 0.0, 150.0]
+    assert food["percentage"] == [25.0, 0.0, 100.0]
+    assert food["running_total"] == [100.0, 100.0, 250.0]
+    assert food["change"] == [None, -100.0, 150.0]
+    assert food["change_pct"] == [None, -100.0, None]     # No percentage change from zero
+
+
+# --------------------------------------------------------------------------------------
+# TEST CASE 2: Weekly buckets start on Monday even with no data
+# --------------------------------------------------------------------------------------
+def test_weekly_periods_without_rows():
+    report = trends.build_trend_report([], date(2024, 7, 3), date(2024, 7, 16), "week")
+
+    assert report["periods"] == ["2024-07-01", "2024-07-08", "2024-07-15"]
+    assert report["categories"] == {}
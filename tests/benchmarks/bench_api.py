@@ -0,0 +1,218 @@
+"""
+=========================================================================================
+BENCHMARK: bench_api.py
+-----------------------------------------------------------------------------------------
+PURPOSE:
+    Reproducible load test for the three hot API endpoints:
+
+        GET  /expenses/{date}
+        POST /expenses/{date}
+        POST /analytics/
+
+    The FastAPI app from `backend/server.py` is driven in-process at a fixed
+    concurrency against a seeded SQLite stand-in for MySQL (see fake_db.py), and
+    throughput plus p50/p95/p99 latency are reported per endpoint. Results can be
+    saved as a baseline and later runs compared against it to catch regressions.
+
+USAGE (from the project root):
+
+    python tests/benchmarks/bench_api.py                          # Run and print results
+    python tests/benchmarks/bench_api.py --save-baseline          # ...and store them
+    python tests/benchmarks/bench_api.py --compare                # Exit 1 on regression
+
+    Scale/concurrency: --rows 200000 --days 1095 --concurrency 16 --requests 2000
+    Baselines are machine specific; keep them out of version control.
+
+NOTES:
+    - The same --seed always generates the same data and the same request sequence.
+    - POST /analytics/ requests draw from a fixed set of "dashboard" ranges, so the
+      analytics cache is exercised the way real dashboards use it.
+=========================================================================================
+"""
+
+import argparse
+import json
+import logging
+import os
+import random
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+
+# Make the backend modules importable when run as a script (pytest uses conftest.py)
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.abspath(os.path.join(BENCH_DIR, "..", ".."))
+for path in (PROJECT_ROOT, os.path.join(PROJECT_ROOT, "backend"), BENCH_DIR):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+from fastapi.testclient import TestClient   # noqa: E402  (after sys.path setup)
+import db_helper                            # noqa: E402
+import server                               # noqa: E402
+from analytics_cache import summary_cache   # noqa: E402
+from fake_db import SQLiteExpenseStore, CATEGORIES  # noqa: E402
+
+DEFAULT_BASELINE = os.path.join(BENCH_DIR, "baseline.json")
+
+# The test client logs every request at INFO; that would dominate the measurements
+logging.getLogger("httpx").setLevel(logging.WARNING)
+
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list (fraction in [0, 1])."""
+    if not sorted_values:
+        return 0.0
+    index = min(len(sorted_values) - 1, max(0, int(round(fraction * len(sorted_values) + 0.5)) - 1))
+    return sorted_values[index]
+
+
+def build_workload(store, requests_per_endpoint, seed):
+    """
+    Pre-generates the request sequence for every endpoint (method, path, JSON body).
+
+    Returns:
+        dict: endpoint name -> list of (method, path, body) tuples.
+    """
+    rng = random.Random(seed)
+    dashboards = []
+    for _ in range(20):
+        start = store.random_date(rng)
+        dashboards.append((start, start + timedelta(days=rng.choice([7, 30, 90, 365]))))
+
+    def expenses_body():
+        return [
+            {"amount": round(rng.uniform(1, 200), 2), "category": rng.choice(CATEGORIES), "notes": "bench"}
+            for _ in range(rng.randint(1, 5))
+        ]
+
+    return {
+        "GET /expenses/{date}": [
+            ("GET", f"/expenses/{store.random_date(rng)}", None) for _ in range(requests_per_endpoint)
+        ],
+        "POST /expenses/{date}": [
+            ("POST", f"/expenses/{store.random_date(rng)}", expenses_body()) for _ in range(requests_per_endpoint)
+        ],
+        "POST /analytics/": [
+            ("POST", "/analytics/", {"start_date": str(start), "end_date": str(end)})
+            for start, end in (rng.choice(dashboards) for _ in range(requests_per_endpoint))
+        ],
+    }
+
+
+def drive(requests, concurrency):
+    """
+    Sends the requests with 'concurrency' worker threads (one TestClient each).
+
+    Returns:
+        dict: Request count, error count, throughput and latency percentiles in ms.
+    """
+    local = threading.local()
+
+    def send(request):
+        client = getattr(local, "client", None)
+        if client is None:
+            client = local.client = TestClient(server.app)
+        method, path, body = request
+        started = time.perf_counter()
+        response = client.request(method, path, json=body)
+        return time.perf_counter() - started, response.status_code
+
+    wall_started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        outcomes = list(executor.map(send, requests))
+    wall = time.perf_counter() - wall_started
+
+    latencies = sorted(1000 * elapsed for elapsed, _ in outcomes)
+    return {
+        "requests": len(outcomes),
+        "errors": sum(1 for _, status in outcomes if status >= 400),
+        "throughput_rps": round(len(outcomes) / wall, 1) if wall else 0.0,
+        "mean_ms": round(sum(latencies) / len(latencies), 3) if latencies else 0.0,
+        "p50_ms": round(percentile(latencies, 0.50), 3),
+        "p95_ms": round(percentile(latencies, 0.95), 3),
+        "p99_ms": round(percentile(latencies, 0.99), 3),
+    }
+
+
+def run_benchmark(rows=50_000, days=730, concurrency=8, requests_per_endpoint=1000, seed=42):
+    """
+    Seeds the stand-in database, runs every endpoint phase and returns the results.
+
+    Returns:
+        dict: {'config': {...}, 'endpoints': {name: metrics}}
+    """
+    store = SQLiteExpenseStore(rows=rows, days=days, seed=seed)
+    restore = store.install(db_helper)
+    try:
+        summary_cache.clear()
+        workload = build_workload(store, requests_per_endpoint, seed)
+        endpoints = {name: drive(requests, concurrency) for name, requests in workload.items()}
+    finally:
+        restore()
+        store.close()
+
+    return {
+        "config": {
+            "rows": rows, "days": days, "concurrency": concurrency,
+            "requests_per_endpoint": requests_per_endpoint, "seed": seed,
+        },
+        "endpoints": endpoints,
+    }
+
+
+def compare(results, baseline, tolerance):
+    """
+    Lists regressions against a baseline: p95 latency above, or throughput below,
+    the baseline by more than 'tolerance' (a fraction, e.g. 0.2 for 20%).
+
+    Returns:
+        list[str]: Human-readable regression messages (empty if none).
+    """
+    problems = []
+    if results["config"] != baseline.get("config"):
+        problems.append(f"config differs from baseline: {baseline.get('config')}")
+    for name, current in results["endpoints"].items():
+        previous = baseline.get("endpoints", {}).get(name)
+        if previous is None:
+            continue
+        if current["p95_ms"] > previous["p95_ms"] * (1 + tolerance):
+            problems.append(f"{name}: p95 {current['p95_ms']}ms vs baseline {previous['p95_ms']}ms")
+        if current["throughput_rps"] < previous["throughput_rps"] * (1 - tolerance):
+            problems.append(f"{name}: {current['throughput_rps']} req/s vs baseline {previous['throughput_rps']} req/s")
+    return problems
+
+
+# ---------------------- MAIN BLOCK: COMMAND LINE ----------------------
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the hot API endpoints locally.")
+    parser.add_argument("--rows", type=int, default=50_000, help="Synthetic expenses to generate")
+    parser.add_argument("--days", type=int, default=730, help="Days the expenses are spread over")
+    parser.add_argument("--concurrency", type=int, default=8, help="Concurrent client threads")
+    parser.add_argument("--requests", type=int, default=1000, help="Requests per endpoint")
+    parser.add_argument("--seed", type=int, default=42, help="Seed for data and request generation")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="Baseline JSON file")
+    parser.add_argument("--save-baseline", action="store_true", help="Write these results as the baseline")
+    parser.add_argument("--compare", action="store_true", help="Compare with the baseline; exit 1 on regression")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="Allowed regression fraction (default 0.2)")
+    args = parser.parse_args()
+
+    results = run_benchmark(args.rows, args.days, args.concurrency, args.requests, args.seed)
+
+    print(f"{'endpoint':<24}{'req/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'errors':>8}")
+    for name, metrics in results["endpoints"].items():
+        print(f"{name:<24}{metrics['throughput_rps']:>10}{metrics['p50_ms']:>10}"
+              f"{metrics['p95_ms']:>10}{metrics['p99_ms']:>10}{metrics['errors']:>8}")
+
+    if args.save_baseline:
+        with open(args.baseline, "w", encoding="utf-8") as handle:
+            json.dump(results, handle, indent=2)
+        print(f"Baseline saved to {args.baseline}")
+
+    if args.compare:
+        with open(args.baseline, encoding="utf-8") as handle:
+            regressions = compare(results, json.load(handle), args.tolerance)
+        for message in regressions:
+            print(f"REGRESSION {message}")
+        sys.exit(1 if regressions else 0)
@@ -0,0 +1,281 @@
+"""
+=========================================================================================
+BENCHMARK SUPPORT: fake_db.py
+-----------------------------------------------------------------------------------------
+PURPOSE:
+    A seeded, SQLite-backed stand-in for the `db_helper` functions used by the hot API
+    endpoints, so the benchmark suite runs fully locally without a MySQL server.
+
+    The stand-in returns rows in the same shape as `db_helper` (dictionaries with the
+    same keys) and keeps the same indexes, so relative timings between code changes in
+    `server.py` remain meaningful. Absolute numbers are NOT comparable with MySQL.
+
+USAGE:
+    store = SQLiteExpenseStore(rows=50_000, days=730, seed=42)
+    restore = store.install(db_helper)   # Patch db_helper's hot functions
+    ...
+    restore()                            # Put the real functions back
+=========================================================================================
+"""
+
+import os
+import random
+import sqlite3
+import tempfile
+import threading
+from datetime import date, timedelta
+
+CATEGORIES = ["Food", "Shopping", "Rent", "Entertainment", "Other"]
+FIRST_DATE = date(2022, 1, 1)
+
+
+class SQLiteExpenseStore:
+    """
+    Synthetic expense database with the db_helper read/write API.
+
+    Args:
+        rows (int): Number of synthetic expenses to generate.
+        days (int): Number of consecutive days (from FIRST_DATE) the rows are spread over.
+        seed (int): Random seed; the same seed always produces the same data.
+    """
+
+    def __init__(self, rows=50_000, days=730, seed=42):
+        self.days = days
+        self.seed = seed
+        handle, self.path = tempfile.mkstemp(prefix="expense_bench_", suffix=".sqlite3")
+        os.close(handle)
+        self._local = threading.local()
+        self._seed(rows, days, seed)
+
+    # ------------------------- CONNECTIONS -------------------------
+    def _connection(self):
+        """One SQLite connection per thread (the benchmark drives the API concurrently)."""
+        connection = getattr(self._local, "connection", None)
+        if connection is None:
+            connection = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            connection.row_factory = sqlite3.Row
+            connection.execute("PRAGMA journal_mode=WAL")
+            self._local.connection = connection
+        return connection
+
+    def _seed(self, rows, days, seed):
+        rng = random.Random(seed)
+        connection = self._connection()
+        connection.executescript(
+            """
+            CREATE TABLE expenses (
+                id           INTEGER PRIMARY KEY AUTOINCREMENT,
+                expense_date TEXT NOT NULL,
+                amount       REAL NOT NULL,
+                category     TEXT NOT NULL,
+                notes        TEXT
+            );
+            CREATE INDEX idx_expenses_date_category ON expenses (expense_date, category);
+            CREATE TABLE expense_date_versions (
+                expense_date TEXT PRIMARY KEY,
+                version      INTEGER NOT NULL
+            );
+            CREATE TABLE category_budgets (
+                category      TEXT PRIMARY KEY,
+                monthly_limit REAL NOT NULL
+            );
+            """
+        )
+        connection.executemany(
+            "INSERT INTO expenses (expense_date, amount, category, notes) VALUES (?, ?, ?, ?)",
+            (
+                (
+                    (FIRST_DATE + timedelta(days=rng.randrange(days))).isoformat(),
+                    round(rng.uniform(1, 500), 2),
+                    rng.choice(CATEGORIES),
+                    f"synthetic expense {index}",
+                )
+                for index in range(rows)
+            )
+        )
+        connection.execute(
+            "INSERT INTO expense_date_versions (expense_date, version) SELECT DISTINCT expense_date, 1 FROM expenses"
+        )
+        connection.commit()
+
+    def random_date(self, rng):
+        """Returns a date inside the seeded range."""
+        return FIRST_DATE + timedelta(days=rng.randrange(self.days))
+
+    # ------------------------- db_helper API -------------------------
+    def retrieve_expenses_by_date(self, expense_date):
+        cursor = self._connection().execute(
+            "SELECT * FROM expenses WHERE expense_date = ?", (str(expense_date),)
+        )
+        return [dict(row) for row in cursor.fetchall()]
+
+    def retrieve_expenses_with_version(self, expense_date):
+        cursor = self._connection().execute(
+            "SELECT id, amount, category, notes FROM expenses WHERE expense_date = ?", (str(expense_date),)
+        )
+        return self.fetch_date_version(expense_date), [dict(row) for row in cursor.fetchall()]
+
+    def _month_totals(self, connection, expense_date):
+        """Category totals of the month of 'expense_date' (aggregated; MySQL keeps them incrementally)."""
+        month = date.fromisoformat(str(expense_date)).replace(day=1)
+        rows = connection.execute(
+            "SELECT category, SUM(amount) AS total FROM expenses WHERE expense_date BETWEEN ? AND ? GROUP BY category",
+            (month.isoformat(), month.isoformat()[:8] + "31")
+        )
+        return month, {row["category"]: row["total"] for row in rows}
+
+    def _crossed_budgets(self, connection, expense_date, before):
+        month, after = self._month_totals(connection, expense_date)
+        alerts = []
+        for row in connection.execute("SELECT category, monthly_limit FROM category_budgets ORDER BY category"):
+            old, new = before.get(row["category"], 0), after.get(row["category"], 0)
+            if old <= row["monthly_limit"] < new:
+                alerts.append({"category": row["category"], "month": month,
+                               "monthly_limit": row["monthly_limit"], "total": new})
+        return alerts
+
+    def replace_expenses_for_date(self, expense_date, expenses):
+        connection = self._connection()
+        with connection:
+            _, before = self._month_totals(connection, expense_date)
+            connection.execute("DELETE FROM expenses WHERE expense_date = ?", (str(expense_date),))
+            connection.executemany(
+                "INSERT INTO expenses (expense_date, amount, category, notes) VALUES (?, ?, ?, ?)",
+                [(str(expense_date), e['amount'], e['category'], e['notes']) for e in expenses]
+            )
+            connection.execute(
+                "INSERT INTO expense_date_versions (expense_date, version) VALUES (?, 1) "
+                "ON CONFLICT (expense_date) DO UPDATE SET version = version + 1",
+                (str(expense_date),)
+            )
+            return self._crossed_budgets(connection, expense_date, before)
+
+    def apply_expense_changes(self, expense_date, inserts=(), updates=(), deletes=(), budget_alerts=None):
+        ids = [update['id'] for update in updates] + list(deletes)
+        if len(ids) != len(set(ids)):
+            raise ValueError("Each expense id may be updated or deleted only once per request")
+        connection = self._connection()
+        with connection:
+            _, before = self._month_totals(connection, expense_date)
+            placeholders = ", ".join("?" * len(ids))
+            found = {
+                row["id"] for row in connection.execute(
+                    f"SELECT id FROM expenses WHERE expense_date = ? AND id IN ({placeholders})",
+                    [str(expense_date), *ids]
+                )
+            }
+            missing = set(ids) - found
+            if missing:
+                raise LookupError(f"Expense ids not found on {expense_date}: {sorted(missing)}")
+            connection.executemany("DELETE FROM expenses WHERE id = ?", [(expense_id,) for expense_id in deletes])
+            for update in updates:
+                fields = [field for field in ("amount", "category", "notes") if field in update]
+                if fields:
+                    connection.execute(
+                        f"UPDATE expenses SET {', '.join(f'{field} = ?' for field in fields)} WHERE id = ?",
+                        [update[field] for field in fields] + [update['id']]
+                    )
+            connection.executemany(
+                "INSERT INTO expenses (expense_date, amount, category, notes) VALUES (?, ?, ?, ?)",
+                [(str(expense_date), e['amount'], e['category'], e['notes']) for e in inserts]
+            )
+            if inserts or updates or deletes:
+                connection.execute(
+                    "INSERT INTO expense_date_versions (expense_date, version) VALUES (?, 1) "
+                    "ON CONFLICT (expense_date) DO UPDATE SET version = version + 1",
+                    (str(expense_date),)
+                )
+            if budget_alerts is not None:
+                budget_alerts.extend(self._crossed_budgets(connection, expense_date, before))
+        return self.retrieve_expenses_by_date(expense_date)
+
+    def fetch_date_version(self, expense_date):
+        row = self._connection().execute(
+            "SELECT version FROM expense_date_versions WHERE expense_date = ?", (str(expense_date),)
+        ).fetchone()
+        return row["version"] if row else 0
+
+    def fetch_range_version(self, start_date, end_date):
+        row = self._connection().execute(
+            "SELECT COUNT(*) AS dates, COALESCE(SUM(version), 0) AS version "
+            "FROM expense_date_versions WHERE expense_date BETWEEN ? AND ?",
+            (str(start_date), str(end_date))
+        ).fetchone()
+        return row["dates"], row["version"]
+
+    def fetch_expense_summary(self, start_date, end_date):
+        cursor = self._connection().execute(
+            "SELECT category, SUM(amount) AS \"sum(amount)\" FROM expenses "
+            "WHERE expense_date BETWEEN ? AND ? GROUP BY category",
+            (str(start_date), str(end_date))
+        )
+        return [dict(row) for row in cursor.fetchall()]
+
+    def stream_amounts_between(self, start_date, end_date):
+        cursor = self._connection().execute(
+            "SELECT category, amount FROM expenses WHERE expense_date BETWEEN ? AND ?",
+            (str(start_date), str(end_date))
+        )
+        for row in cursor:
+            yield row["category"], row["amount"]
+
+    def set_category_budget(self, category, monthly_limit):
+        with self._connection() as connection:
+            connection.execute(
+                "INSERT INTO category_budgets (category, monthly_limit) VALUES (?, ?) "
+                "ON CONFLICT (category) DO UPDATE SET monthly_limit = excluded.monthly_limit",
+                (category, monthly_limit)
+            )
+
+    def delete_category_budget(self, category):
+        with self._connection() as connection:
+            return connection.execute("DELETE FROM category_budgets WHERE category = ?", (category,)).rowcount > 0
+
+    def fetch_budget_status(self, month):
+        connection = self._connection()
+        _, totals = self._month_totals(connection, month)
+        counts = {
+            row["category"]: row["n"] for row in connection.execute(
+                "SELECT category, COUNT(*) AS n FROM expenses WHERE expense_date BETWEEN ? AND ? GROUP BY category",
+                (month.isoformat(), month.isoformat()[:8] + "31")
+            )
+        }
+        return [
+            {"category": row["category"], "monthly_limit": row["monthly_limit"],
+             "total": totals.get(row["category"], 0.0), "expense_count": counts.get(row["category"], 0)}
+            for row in connection.execute("SELECT category, monthly_limit FROM category_budgets ORDER BY category")
+        ]
+
+    # ------------------------- PATCHING -------------------------
+    def install(self, db_helper):
+        """
+        Replaces db_helper's hot functions with this store's versions.
+
+        Args:
+            db_helper (module): The imported db_helper module.
+
+        Returns:
+            callable: Restores the original functions when called.
+        """
+        names = [
+            "retrieve_expenses_by_date", "retrieve_expenses_with_version", "replace_expenses_for_date", "fetch_expense_summary",
+            "fetch_date_version", "fetch_range_version", "apply_expense_changes",
+            "stream_amounts_between", "set_category_budget", "delete_category_budget", "fetch_budget_status",
+        ]
+        originals = {name: getattr(db_helper, name) for name in names}
+        for name in names:
+            setattr(db_helper, name, getattr(self, name))
+
+        def restore():
+            for name, function in originals.items():
+                setattr(db_helper, name, function)
+        return restore
+
+    def close(self):
+        """Deletes the temporary database file."""
+        connection = getattr(self._local, "connection", None)
+        if connection is not None:
+            connection.close()
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(self.path + suffix):
+                os.remove(self.path + suffix)
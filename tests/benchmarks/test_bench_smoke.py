@@ -0,0 +1,22 @@
+"""
+=========================================================================================
+TEST MODULE: benchmark smoke test
+-----------------------------------------------------------------------------------------
+PURPOSE:
+    Runs the benchmark suite at a tiny scale so it keeps working as `server.py` and
+    `db_helper.py` change. Performance numbers are not asserted here.
+=========================================================================================
+"""
+
+from tests.benchmarks import bench_api
+
+
+def test_benchmark_runs_without_errors():
+    results = bench_api.run_benchmark(rows=500, days=30, concurrency=2, requests_per_endpoint=20, seed=1)
+
+    assert set(results["endpoints"]) == {"GET /expenses/{date}", "POST /expenses/{date}", "POST /analytics/"}
+    for metrics in results["endpoints"].values():
+        assert metrics["requests"] == 20
+        assert metrics["errors"] == 0
+        assert metrics["p50_ms"] <= metrics["p95_ms"] <= metrics["p99_ms"]
+    assert bench_api.compare(results, results, tolerance=0.2) == []
@@ -47,3 +47,11 @@ project_root = os.path.abspath(os.path.join(os.path.dirname(__file__), ".."))
 # Without this, pytest may not recognize imports like `from backend import db_helper`.
 # --------------------------------------------------------------------------------------
 sys.path.insert(0, project_root)
+
+
+# --------------------------------------------------------------------------------------
+# The backend modules import each other by plain name (e.g. `import db_helper`,
+# `from logging_setup import setup_logger`) because the server is started from the
+# backend/ folder. Adding that folder as well lets those imports resolve under pytest.
+# --------------------------------------------------------------------------------------
+sys.path.insert(1, os.path.join(project_root, "backend"))